@@ -6,10 +6,12 @@ import random
 import logging
 
 import utils.kmong_checker.dbLib as dbLib
-import utils.kmong_checker.kmongLib as kmongLib
 import utils.kmong_manager.kmong_manger as kmongManager
 import utils.kmong_manager.db_account as db_account
 import utils.kmong_manager.db_message as db_message
+from utils.kmong_manager.kmong_poller import KmongPoller
+from utils.selenium_manager.outbox_worker import OutboxWorker
+from utils.telegram_manager.telegram_sender import TelegramSender
 from static.js.service.settings_service import SettingsService
 
 
@@ -17,6 +19,7 @@ import threading
 from routes.account_routes import account_bp
 from routes.message_routes import message_bp
 from routes.settings_routes import settings_bp
+from routes.telegram_routes import telegram_bp
 
 from utils.telegram_manager.legacy_telegram_manager import LegacyTelegramManager
 
@@ -33,9 +36,10 @@ app = Flask(__name__, static_folder='static')
 app.register_blueprint(account_bp)
 app.register_blueprint(message_bp)
 app.register_blueprint(settings_bp)
+app.register_blueprint(telegram_bp)
 
 kmongManager = kmongManager.KmongManager()
-kmong_message = kmongLib.KmongMessage()
+kmong_poller = KmongPoller.get_instance()
 settings_service = SettingsService()
 
 # 텔레그램 매니저 인스턴스 (전역 변수)
@@ -73,26 +77,14 @@ def init_telegram():
     return telegram
 
 
-# 크몽에서 새로운 메세지 받아오기
+# 적응형 주기에서 차례가 된 계정을 확인하기 위한 스케줄러 틱 간격(초)
+KMONG_POLL_TICK_SECONDS = 5
+
+# 크몽에서 새로운 메세지 받아오기 (확인 주기가 돌아온 계정만 동시 확인)
 def getMessageListFromKmongWeb():
     try:
-        row_list = dbLib.select_message_list()
-
-        for row in row_list:
-            userid = row.get("userid", "")
-            passwd = row.get("passwd", "")
-            login_cookie = row.get("login_cookie", "")
-
-            ret = kmong_message.check_unread_message(userid, passwd, login_cookie).get("message_content", "") != ""
-            if not ret:
-                logger.info("app.py, getMessageListFromKmongWeb // ⛔ 쿠키로 로그인 실패, 새로 로그인 시도")
-                ret, login_cookie = kmong_message.login(userid, passwd)
-                if ret:
-                    dto = kmong_message.check_unread_message(userid, passwd, login_cookie)
-                    kmongManager.parsingUnreadMessage(email=userid, pw=passwd, cookie=login_cookie, data=dto)
-                else:
-                    logger.error("app.py, refreshgetMessageListFromKmongWeb_scheduler // ⛔ 크몽 로그인 실패")
-        return ret
+        kmong_poller.poll_due()
+        return True
     except Exception as e:
         logger.error(f"app.py, getMessageListFromKmongWeb // ⛔ 크몽 메시지 확인 중 오류: {str(e)}")
         return False
@@ -128,12 +120,18 @@ def refresh_scheduler():
         
         # 텔레그램 관련 스케줄 설정
         schedule.every(send_interval).seconds.do(telegram.sendNewMessageByTelegram)
-        schedule.every(reply_interval).seconds.do(telegram.replyByTelegram)
-        logger.info(f"app.py, refresh_scheduler // 텔레그램 스케줄 설정: send={send_interval}s, reply={reply_interval}s")
+        if telegram.webhook_mode:
+            # 답장은 /api/telegram/webhook 으로 바로 들어옴
+            logger.info(f"app.py, refresh_scheduler // 텔레그램 스케줄 설정: send={send_interval}s, reply=webhook")
+        else:
+            schedule.every(reply_interval).seconds.do(telegram.replyByTelegram)
+            logger.info(f"app.py, refresh_scheduler // 텔레그램 스케줄 설정: send={send_interval}s, reply={reply_interval}s")
     
     # 크몽웹에서 계정과 메세지 받아오기 (텔레그램과 무관하게 실행)
-    schedule.every(kmong_interval).seconds.do(getMessageListFromKmongWeb)
-    logger.info(f"app.py, refresh_scheduler // 크몽 메시지 체크 간격: {kmong_interval}s")
+    # parseUnReadMessagesinDB는 계정별 시작 간격, 이후 간격은 활동에 따라 adaptive.floor~ceiling 사이에서 조절됨
+    kmong_poller.configure_schedule(refresh_interval)
+    schedule.every(KMONG_POLL_TICK_SECONDS).seconds.do(getMessageListFromKmongWeb)
+    logger.info(f"app.py, refresh_scheduler // 크몽 메시지 체크 시작 간격: {kmong_interval}s, 적응형 범위: {refresh_interval.get('adaptive', {})}")
     
     logger.info("app.py, refresh_scheduler // ✅ 스케줄러 갱신 완료")
     return True
@@ -166,7 +164,7 @@ def init():
     try:
         # 데이터베이스 초기화
         dbLib.create_db()
-        db_message.add_missing_columns_to_all_chatrooms()
+        db_message.ensure_message_schema()
         
         # 텔레그램 초기화
         init_telegram()
@@ -187,6 +185,12 @@ if __name__ == '__main__':
     
     # 메시지 체크 스레드를 별도의 백그라운드 스레드로 실행
     threading.Thread(target=background_task, daemon=True).start()
+
+    # 크몽 웹 전송 워커 시작 (중단된 전송 작업은 다시 대기열로)
+    OutboxWorker.get_instance().start()
+
+    # 텔레그램 알림 전송기 시작 (속도 제한/재시도)
+    TelegramSender.get_instance().start()
     
     # 스레드 시작 후 잠시 대기 (초기화 시간 확보)
     time.sleep(2)
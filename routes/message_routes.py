@@ -1,14 +1,14 @@
-from flask import Blueprint, request, jsonify
-from datetime import date
+from flask import Blueprint, request, jsonify, Response, stream_with_context
 
 from static.js.service.message_service import MessageService
 from static.js.service.account_service import AccountService
+from static.js.service.stream_service import StreamService
 
 from utils.telegram_manager.legacy_telegram_manager import LegacyTelegramManager
-from utils.selenium_manager.selenium_manager import SeleniumManager
+from utils.selenium_manager.browser_pool import BrowserPool
+from utils.selenium_manager.outbox_worker import OutboxWorker
 from utils.gpt_manager.gpt_manager import GPTManager
 
-from model.message_dto import MessageDTO
 
 
 # Blueprint 생성
@@ -17,17 +17,27 @@ message_bp = Blueprint('message', __name__, url_prefix='/api/message')
 # 인스턴스 생성
 message_service = MessageService()
 account_service = AccountService()
+stream_service = StreamService.get_instance()
 chatGPT = GPTManager()
-selenium = SeleniumManager()
+browser_pool = BrowserPool.get_instance()
+outbox_worker = OutboxWorker.get_instance()
 telegram = LegacyTelegramManager()
 
 # [채팅방 목록] 특정 채팅방의 메세지 목록 불러오기
 @message_bp.route('/loadChatHistory/<int:chatroom_id>')
 def loadChatHistoryByChatRoomIdFromDB(chatroom_id):
-    """특정 채팅방의 메시지 목록 불러오기"""
+    """
+    특정 채팅방의 메시지 목록 불러오기 (idx 오름차순)
+    - ?limit=50 : 가장 최근 메시지 limit개
+    - ?before_idx=<idx>&limit=50 : 해당 idx 이전의 과거 메시지
+    - ?after_idx=<idx> : 해당 idx 이후의 새 메시지만
+    """
     try:
-        # Use message service to get messages
-        messages = message_service.get_messages_by_chatroom_id(chatroom_id)
+        before_idx = request.args.get('before_idx', type=int)
+        after_idx = request.args.get('after_idx', type=int)
+        limit = request.args.get('limit', default=50, type=int)
+
+        messages = message_service.get_messages_page(chatroom_id, before_idx=before_idx, after_idx=after_idx, limit=limit)
         return jsonify(messages)
     except Exception as e:
         print(f"채팅 내역 불러오기 오류: {e}")
@@ -36,74 +46,33 @@ def loadChatHistoryByChatRoomIdFromDB(chatroom_id):
 # [채팅방 목록] 채팅방 리스트 업데이트
 @message_bp.route('/updateChatroomList')
 def updateChatroomList():
-    # Get all accounts from service
-    accounts = account_service.get_all_accounts()
-
-    # Get all chatroom tables from service
-    chatroom_table_list = message_service.get_all_chatroom_tables()
-
-    chatroomList = []
-
-    for chatroom_table in chatroom_table_list:
-        # Extract table ID from chatroom_table string
-        if isinstance(chatroom_table, str):
-            table_id = int(chatroom_table.split('_')[1])  # chatroom_123 → 123
-            chatroom_data = message_service.get_chatroom_by_id(table_id)
-        else:
-            chatroom_data = chatroom_table  # Already a dictionary, use as is
-
-        # Skip if no chatroom data
-        if not chatroom_data:
-            continue
+    # 채팅방별 요약만 반환 (메시지 목록은 채팅방을 열 때 /loadChatHistory로 불러옴)
+    # 정렬: 안읽은 메시지가 있는 채팅방 먼저, 그 안에서는 최신 날짜 순
+    chatroomList = message_service.get_chatroom_summaries()
+    return jsonify(chatroomList)
 
-        for account in accounts:
-            # Match user_id with admin_id
-            if ('user_id' in account and account['user_id'] > 0 and 
-                'admin_id' in chatroom_data and chatroom_data['admin_id'] == account['user_id']):
-                
-                # Get messages for this chatroom
-                messageList = message_service.get_messages_by_chatroom_id(table_id)
-
-                # Add to chatroom list if messages exist
-                if messageList:
-                    # Check if there are any unread messages in this chatroom
-                    has_unread_messages = any(msg.get('seen', 1) == 0 for msg in messageList)
-                    
-                    chatroom_data = {
-                        'email': account['email'],
-                        'user_id': account['user_id'],
-                        'messages': messageList, 
-                        'chatroom_id': table_id,
-                        'has_unread_messages': has_unread_messages  # Add flag for unread messages
-                    }
-                    chatroomList.append(chatroom_data)
-
-    # Process each chatroom to find the most recent message date
-    for chatroom in chatroomList:
-        messages = chatroom['messages']
-        if messages:
-            # Try to find the most recent message date
-            # Assuming each message has a 'date' field in a format that can be sorted
-            try:
-                # Sort messages by date (assuming newer dates are "greater")
-                # Convert string dates to comparable format if needed
-                latest_message = max(messages, key=lambda msg: msg.get('date', ''))
-                chatroom['latest_date'] = latest_message.get('date', '')
-            except (TypeError, ValueError):
-                # Fallback if date comparison fails
-                chatroom['latest_date'] = ''
-        else:
-            chatroom['latest_date'] = ''
 
-    # Sort the chatroomList:
-    # 1. Chatrooms with unread messages (bell emoji) appear first
-    # 2. Within each group (unread/read), sort by most recent date
-    chatroomList.sort(key=lambda x: (
-        not x['has_unread_messages'],  # Unread messages first
-        '' if not x['latest_date'] else str(x['latest_date']),  # Then by date (descending)
-    ), reverse=True)  # Reverse for descending date order (newest first)
+# [채팅방 목록] 실시간 갱신 스트림 (Server-Sent Events)
+@message_bp.route('/stream')
+def streamUpdates():
+    """
+    채팅방 요약 변경('chatroom')과 새 메시지('message')를 실시간으로 전달
+    재연결 시 Last-Event-ID 헤더(또는 ?lastEventId=)로 놓친 이벤트부터 이어받음
+    """
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('lastEventId')
+    try:
+        last_event_id = int(last_event_id) if last_event_id else None
+    except ValueError:
+        last_event_id = None
 
-    return jsonify(chatroomList)
+    return Response(
+        stream_with_context(stream_service.stream(last_event_id)),
+        mimetype='text/event-stream',
+        headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'
+        }
+    )
 
 
 # [대화] 상대방이 안읽은 메세지 -> 읽은 메세지로 업데이트
@@ -157,33 +126,14 @@ def sendMessageInWeb():
                 continue  # Skip this account on conversion error
 
             if admin_id == account_user_id:
-                # 1) Login to Kmong
-                selenium.login(account['email'], 
-                                     account['password'])
-
-                # 2) Navigate to chatroom
-                selenium.getClientChatRoom(chatroom_id=chatroom_id, client_id=client_id)
-
-                # 3) Create message DTO and send message
-                dto = MessageDTO(
+                # 전송은 outbox 워커가 처리하고, 결과는 /stream의 'outbox' 이벤트로 전달됨
+                job_id = outbox_worker.enqueue(
+                    chatroom_id=chatroom_id,
                     admin_id=admin_id,
-                    text=text,
                     client_id=client_id,
-                    sender_id=admin_id,
-                    replied_kmong=1,
-                    replied_telegram=0,
-                    seen=0,
-                    kmong_message_id=0,
-                    date=date.today()
+                    text=text
                 )
-                
-                selenium.send_message(
-                    message=text, 
-                    dto=dto,
-                    chatroomID=chatroom_id
-                )
-            
-                return jsonify({'success': True, 'message': '메시지가 전송되었습니다.'})
+                return jsonify({'success': True, 'message': '메시지 전송이 예약되었습니다.', 'job_id': job_id, 'status': 'queued'}), 202
                 
         return jsonify({'success': False, 'message': '해당 admin_id의 계정을 찾을 수 없음'})
     
@@ -192,6 +142,15 @@ def sendMessageInWeb():
         return jsonify({'success': False, 'message': f'메시지 전송에 실패했습니다: {str(e)}'})
 
 
+# [대화] 웹 전송 작업 상태 조회
+@message_bp.route('/outbox/<int:job_id>')
+def getOutboxJob(job_id):
+    job = outbox_worker.get_job(job_id)
+    if job is None:
+        return jsonify({'success': False, 'message': '작업을 찾을 수 없음'}), 404
+    return jsonify({'success': True, 'job': job})
+
+
 # [대화] 이전 대화기록 불러오기
 @message_bp.route('/syncChatHistory', methods=['POST'])
 def syncChatHistory():
@@ -217,19 +176,17 @@ def syncChatHistory():
                 continue  # Skip this account on conversion error
 
             if admin_id == account_user_id:
-                # Login to Kmong
-                selenium.login(account['email'],account['password'])
-
-                # Navigate to chatroom
-                selenium.getClientChatRoom(chatroom_id=chatroom_id, client_id=client_id)
+                # Logged-in browser for this account (reused between requests)
+                with browser_pool.session(account['email'], account['password']) as selenium:
+                    # Navigate to chatroom
+                    selenium.getClientChatRoom(chatroom_id=chatroom_id, client_id=client_id)
 
-                # Get chat history
-                chat_history = selenium.getChatHistory(admin_id=admin_id)
+                    # Get chat history
+                    chat_history = selenium.getChatHistory(admin_id=admin_id)
                 
                 # Use message service to sync chat history
                 success, message = message_service.sync_chat_history(chatroom_id, chat_history)
                 
-                selenium.close_driver()
                 return jsonify({'success': success, 'message': message})
                 
         return jsonify({'success': False, 'message': '해당 admin_id의 계정을 찾을 수 없음'})
@@ -256,7 +213,7 @@ def get_gpt_suggestions():
     # ✅ 현재 대화 내역을 conversation에 저장
     conversation = qna_data["current_conversation"]
 
-    # ✅ GPT로 답변 생성
-    answer = chatGPT.generate_response(conversation, response_type)
+    # ✅ GPT로 답변 생성 (비슷한 과거 문의/답변 참고)
+    answer = chatGPT.generate_response(conversation, response_type, qna_data["training_data"])
 
     return jsonify({"answer": answer})
@@ -10,6 +10,7 @@ from static.js.service.settings_service import SettingsService
 from utils.telegram_manager.legacy_telegram_manager import LegacyTelegramManager
 from utils.selenium_manager.selenium_manager import SeleniumManager
 from utils.gpt_manager.gpt_manager import GPTManager
+from utils.kmong_manager.kmong_poller import KmongPoller
 
 
 # Blueprint 생성
@@ -90,6 +91,50 @@ def update_refresh_interval():
         traceback.print_exc()
         return jsonify({'success': False, 'message': error_msg}), 500
 
+@settings_bp.route('/updateAdaptiveInterval', methods=['POST'])
+def update_adaptive_interval():
+    """계정별 적응형 갱신주기 범위(floor, ceiling, backoff) 업데이트 엔드포인트"""
+    try:
+        data = request.json
+        adaptive = settings_service.get_settings()['refreshInterval']['adaptive']
+        floor = data.get('floor', adaptive['floor'])
+        ceiling = data.get('ceiling', adaptive['ceiling'])
+        backoff = data.get('backoff', adaptive['backoff'])
+        
+        success, message = settings_service.update_adaptive_interval(floor, ceiling, backoff)
+        if not success:
+            return jsonify({'success': False, 'message': message}), 400
+        
+        # 스케줄러 재설정 (새 범위 적용)
+        from app import refresh_scheduler
+        refresh_scheduler()
+        
+        return jsonify({
+            'success': True,
+            'message': message,
+            'adaptive': settings_service.get_settings()['refreshInterval']['adaptive']
+        })
+    
+    except Exception as e:
+        error_msg = f"적응형 갱신주기 업데이트 중 오류: {e}"
+        print(f"settings_routes.py, update_adaptive_interval // ⛔ {error_msg}")
+        return jsonify({'success': False, 'message': error_msg}), 500
+
+@settings_bp.route('/pollingCadence')
+def get_polling_cadence():
+    """계정별 현재 크몽 확인 주기 반환"""
+    try:
+        return jsonify({
+            'success': True,
+            'adaptive': settings_service.get_settings()['refreshInterval']['adaptive'],
+            'accounts': KmongPoller.get_instance().get_cadences()
+        })
+    
+    except Exception as e:
+        error_msg = f"확인 주기 조회 중 오류: {e}"
+        print(f"settings_routes.py, get_polling_cadence // ⛔ {error_msg}")
+        return jsonify({'success': False, 'message': error_msg}), 500
+
 @settings_bp.route('/updateTelegramSettings', methods=['POST'])
 def update_telegram_settings():
     """텔레그램 봇 설정 업데이트 엔드포인트"""
@@ -320,11 +365,8 @@ def start_reply_polling():
         
         # 답장 폴링 시작
         def on_reply_callback(reply_info):
-            """답장 수신 시 호출될 콜백 함수"""
-            try:
-                telegram.replyByTelegram()
-            except Exception as e:
-                print(f"답장 처리 콜백 오류: {str(e)}")
+            """답장 처리 후 호출될 콜백 함수 (처리는 listen_for_replies에서 완료됨)"""
+            print(f"텔레그램 답장 처리 완료: 채팅방 ID {reply_info.get('chatroom_id')}")
         
         telegram.start_reply_polling(interval=interval, callback=on_reply_callback)
         
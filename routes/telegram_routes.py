@@ -0,0 +1,59 @@
+from flask import Blueprint, request, jsonify
+
+from static.js.service.settings_service import SettingsService
+from utils.telegram_manager.legacy_telegram_manager import LegacyTelegramManager, WEBHOOK_SECRET_HEADER
+from utils.telegram_manager.telegram_sender import TelegramSender
+
+# Blueprint 생성
+telegram_bp = Blueprint('telegram', __name__, url_prefix='/api/telegram')
+
+# 서비스 인스턴스 생성
+settings_service = SettingsService()
+
+# [텔레그램] webhook 수신 (텔레그램 서버가 호출)
+@telegram_bp.route('/webhook', methods=['POST'])
+def receive_update():
+    telegram = LegacyTelegramManager.get_instance()
+
+    # setWebhook 때 넘긴 secret_token이 헤더에 없으면 거부
+    if not telegram.webhook_mode or not telegram.verify_webhook_secret(request.headers.get(WEBHOOK_SECRET_HEADER)):
+        return jsonify({'ok': False}), 403
+
+    update = request.get_json(silent=True)
+    if not update or 'update_id' not in update:
+        return jsonify({'ok': False}), 400
+
+    # 처리는 백그라운드에서 (텔레그램은 응답이 늦으면 같은 업데이트를 다시 보냄)
+    telegram.enqueue_update(update)
+    return jsonify({'ok': True})
+
+# [텔레그램] webhook 모드 켜기/끄기
+@telegram_bp.route('/updateWebhook', methods=['POST'])
+def update_webhook():
+    data = request.get_json()
+    enabled = bool(data.get('enabled'))
+    url = data.get('url', '')
+
+    success, message = settings_service.update_telegram_webhook(enabled, url)
+    if not success:
+        return jsonify({'success': False, 'message': message}), 400
+
+    telegram = LegacyTelegramManager.get_instance()
+    if enabled:
+        webhook = settings_service.get_settings()['telegram']['webhook']
+        ok, secret = telegram.set_webhook(url, webhook.get('secret'))
+        if not ok:
+            return jsonify({'success': False, 'message': '텔레그램 webhook 등록에 실패했습니다.'}), 502
+        settings_service.update_telegram_webhook(True, url, secret)
+        return jsonify({'success': True, 'message': 'webhook 모드가 시작되었습니다.'})
+
+    telegram.delete_webhook()
+    telegram.prepareObserving()
+    return jsonify({'success': True, 'message': 'webhook 모드가 해제되어 폴링으로 전환되었습니다.'})
+
+# [텔레그램] 알림 전송 상태 (상태별 개수, 최근 알림)
+@telegram_bp.route('/sendQueue', methods=['GET'])
+def get_send_queue():
+    chatroom_id = request.args.get('chatroom_id', type=int)
+    status = TelegramSender.get_instance().status(chatroom_id)
+    return jsonify({'success': True, 'data': status})
@@ -19,6 +19,7 @@ class MessageUI {
         // Subscribe to view model changes
         this.viewModel.addChatroomObserver(this._renderChatrooms.bind(this));
         this.viewModel.addMessageObserver(this._renderMessages.bind(this));
+        this.viewModel.addOutboxObserver(this._handleOutboxUpdate.bind(this));
         
         // 설정 변경 관찰
         if (this.settingsViewModel) {
@@ -50,6 +51,16 @@ class MessageUI {
         if (this.syncButton) {
             this.syncButton.addEventListener('click', () => this._handleSyncChatHistory());
         }
+        
+        // Load older messages when scrolled to the top of the chat list
+        if (this.chatListContainer) {
+            this.chatListContainer.addEventListener('scroll', () => {
+                if (this.chatListContainer.scrollTop === 0) {
+                    this.viewModel.loadOlderMessages()
+                        .catch(error => console.error('Error loading older messages:', error));
+                }
+            });
+        }
     }
 
     /**
@@ -74,6 +85,18 @@ class MessageUI {
             });
     }
 
+    /**
+     * Report a queued message that could not be delivered to Kmong
+     * @param {Object} job - { job_id, chatroom_id, status, error }
+     * @private
+     */
+    _handleOutboxUpdate(job) {
+        if (job.status === 'failed') {
+            alert('메시지 전송 실패: ' + (job.error || '크몽 웹 전송에 실패했습니다.'));
+            console.error('Outbox job failed:', job);
+        }
+    }
+
     /**
      * Handle sync chat history button click
      * @private
@@ -118,99 +141,128 @@ class MessageUI {
 
     /**
      * Render chatrooms in the UI (observer callback)
-     * @param {Array} chatrooms - Array of chatroom objects
+     * @param {Array} chatrooms - Array of chatroom summary objects
+     * @param {Object} change - { type: 'replace' } or { type: 'patch', chatroom } for a single pushed update
      * @private
      */
-    _renderChatrooms(chatrooms) {
+    _renderChatrooms(chatrooms, change = { type: 'replace' }) {
         if (!this.chatRoomListContainer) return;
         
+        if (change.type === 'patch') {
+            this._patchChatroom(chatrooms, change.chatroom);
+            return;
+        }
+        
         this.chatRoomListContainer.innerHTML = '';  // Clear existing list
         
         chatrooms.forEach(chatroomData => {
-            const chatRoomItem = document.createElement('div');
-            chatRoomItem.classList.add('chat-room-item');
-            
-            // Store chatroom data
-            chatRoomItem.setAttribute('data-chatroom-id', chatroomData.chatroom_id);
-            
-            // Create checkbox container
-            const checkboxContainer = document.createElement('div');
-            checkboxContainer.classList.add('chatroom-checkbox-container');
-            
-            // Create checkbox
-            const checkbox = document.createElement('input');
-            checkbox.type = 'checkbox';
-            checkbox.classList.add('chatroom-checkbox');
-            checkbox.id = `chatroom-check-${chatroomData.chatroom_id}`;
-            
-            // Set checkbox state from settings
-            if (this.settingsViewModel) {
-                checkbox.checked = this.settingsViewModel.isChatroomChecked(chatroomData.chatroom_id);
-            }
-            
-            // Add checkbox event listener
-            checkbox.addEventListener('click', (event) => 
-                this._handleChatroomCheckboxClick(event, chatroomData.chatroom_id)
-            );
-            
-            checkboxContainer.appendChild(checkbox);
-            
-            // Email display
-            const emailContainer = document.createElement('div');
-            emailContainer.classList.add('chatroom-content-container');
-            
-            const emailElement = document.createElement('div');
-            emailElement.classList.add('chat-room-email');
-            
-            // Count unread messages
-            let unreadMessages = 0;
-            for (let i = 0; i < chatroomData.messages.length; i++) {
-                if (chatroomData.messages[i].seen == 0 && 
-                    chatroomData.messages[i].client_id == chatroomData.messages[i].sender_id) {
-                    unreadMessages++;
-                }
-            }
-            
-            // Show unread message count
-            if (unreadMessages > 0) {
-                emailElement.innerText = `🔔 ${chatroomData.email} (${unreadMessages})`;
-            } else {
-                emailElement.innerText = chatroomData.email;
-            }
-            
-            // Last message display
-            let lastMessageText = `새 메시지가 없습니다.(${chatroomData.chatroom_id})`;
-            if (chatroomData.messages.length > 0) {
-                const lastMessage = chatroomData.messages[chatroomData.messages.length - 1];
-                lastMessageText = lastMessage.text;
-                
-                // Store client and admin IDs
-                chatRoomItem.setAttribute('data-client-id', lastMessage.client_id);
-                chatRoomItem.setAttribute('data-admin-id', lastMessage.admin_id);
+            this.chatRoomListContainer.appendChild(this._createChatroomItem(chatroomData));
+        });
+    }
+
+    /**
+     * Replace a single chatroom item and move it to its sorted position
+     * @param {Array} chatrooms - Sorted array of chatroom summary objects
+     * @param {Object} chatroomData - Updated chatroom summary
+     * @private
+     */
+    _patchChatroom(chatrooms, chatroomData) {
+        const selector = `.chat-room-item[data-chatroom-id="${chatroomData.chatroom_id}"]`;
+        const oldItem = this.chatRoomListContainer.querySelector(selector);
+        const newItem = this._createChatroomItem(chatroomData);
+        
+        if (oldItem) {
+            if (oldItem.classList.contains('selected')) newItem.classList.add('selected');
+            oldItem.remove();
+        }
+        
+        const position = chatrooms.findIndex(room => String(room.chatroom_id) === String(chatroomData.chatroom_id));
+        const nextItem = this.chatRoomListContainer.children[position] || null;
+        this.chatRoomListContainer.insertBefore(newItem, nextItem);
+    }
+
+    /**
+     * Create the DOM element for one chatroom
+     * @param {Object} chatroomData - Chatroom summary object
+     * @returns {HTMLElement} - Chatroom item element
+     * @private
+     */
+    _createChatroomItem(chatroomData) {
+        const chatRoomItem = document.createElement('div');
+        chatRoomItem.classList.add('chat-room-item');
+        
+        // Store chatroom data
+        chatRoomItem.setAttribute('data-chatroom-id', chatroomData.chatroom_id);
+        
+        // Create checkbox container
+        const checkboxContainer = document.createElement('div');
+        checkboxContainer.classList.add('chatroom-checkbox-container');
+        
+        // Create checkbox
+        const checkbox = document.createElement('input');
+        checkbox.type = 'checkbox';
+        checkbox.classList.add('chatroom-checkbox');
+        checkbox.id = `chatroom-check-${chatroomData.chatroom_id}`;
+        
+        // Set checkbox state from settings
+        if (this.settingsViewModel) {
+            checkbox.checked = this.settingsViewModel.isChatroomChecked(chatroomData.chatroom_id);
+        }
+        
+        // Add checkbox event listener
+        checkbox.addEventListener('click', (event) => 
+            this._handleChatroomCheckboxClick(event, chatroomData.chatroom_id)
+        );
+        
+        checkboxContainer.appendChild(checkbox);
+        
+        // Email display
+        const emailContainer = document.createElement('div');
+        emailContainer.classList.add('chatroom-content-container');
+        
+        const emailElement = document.createElement('div');
+        emailElement.classList.add('chat-room-email');
+        
+        // Unread message count (computed on the server)
+        const unreadMessages = chatroomData.unread_count || 0;
+        
+        // Show unread message count
+        if (unreadMessages > 0) {
+            emailElement.innerText = `🔔 ${chatroomData.email} (${unreadMessages})`;
+        } else {
+            emailElement.innerText = chatroomData.email;
+        }
+        
+        // Last message display
+        let lastMessageText = `새 메시지가 없습니다.(${chatroomData.chatroom_id})`;
+        if (chatroomData.last_message) {
+            lastMessageText = chatroomData.last_message;
+        }
+        
+        // Store client and admin IDs
+        chatRoomItem.setAttribute('data-client-id', chatroomData.client_id);
+        chatRoomItem.setAttribute('data-admin-id', chatroomData.admin_id);
+        
+        const messageElement = document.createElement('div');
+        messageElement.innerText = lastMessageText;
+        messageElement.classList.add('chat-room-message');
+        
+        // Add elements to chatroom item
+        emailContainer.appendChild(emailElement);
+        emailContainer.appendChild(messageElement);
+        
+        chatRoomItem.appendChild(checkboxContainer);
+        chatRoomItem.appendChild(emailContainer);
+        
+        // Add click event (전체 아이템 클릭 이벤트는 체크박스 클릭 시 예외 처리)
+        chatRoomItem.addEventListener('click', (event) => {
+            // 체크박스 클릭 이벤트가 아닌 경우에만 채팅방 선택 처리
+            if (!event.target.classList.contains('chatroom-checkbox')) {
+                this._handleChatroomSelection(chatRoomItem);
             }
-            
-            const messageElement = document.createElement('div');
-            messageElement.innerText = lastMessageText;
-            messageElement.classList.add('chat-room-message');
-            
-            // Add elements to chatroom item
-            emailContainer.appendChild(emailElement);
-            emailContainer.appendChild(messageElement);
-            
-            chatRoomItem.appendChild(checkboxContainer);
-            chatRoomItem.appendChild(emailContainer);
-            
-            // Add click event (전체 아이템 클릭 이벤트는 체크박스 클릭 시 예외 처리)
-            chatRoomItem.addEventListener('click', (event) => {
-                // 체크박스 클릭 이벤트가 아닌 경우에만 채팅방 선택 처리
-                if (!event.target.classList.contains('chatroom-checkbox')) {
-                    this._handleChatroomSelection(chatRoomItem);
-                }
-            });
-            
-            // Add to list
-            this.chatRoomListContainer.appendChild(chatRoomItem);
         });
+        
+        return chatRoomItem;
     }
 
     /**
@@ -248,11 +300,28 @@ class MessageUI {
     /**
      * Render messages in the UI (observer callback)
      * @param {Array} messages - Array of message objects
+     * @param {Object} change - What changed: { type: 'replace' | 'prepend' | 'append', count }
      * @private
      */
-    _renderMessages(messages) {
+    _renderMessages(messages, change = { type: 'replace' }) {
         if (!this.chatListContainer) return;
         
+        const currentChatroom = this.viewModel.getCurrentChatroomInfo();
+        
+        // New messages at the bottom: add only their nodes instead of rebuilding the list
+        const renderedCount = this.chatListContainer.querySelectorAll('.message-container').length;
+        if (change.type === 'append' && change.count > 0 && renderedCount > 0 && renderedCount + change.count === messages.length) {
+            messages.slice(-change.count).forEach(message => {
+                this.chatListContainer.appendChild(this._createMessageElement(message, currentChatroom));
+            });
+            this.chatListContainer.scrollTop = this.chatListContainer.scrollHeight;
+            return;
+        }
+        
+        // Keep the viewport on the same message when older history is prepended
+        const previousScrollHeight = this.chatListContainer.scrollHeight;
+        const previousScrollTop = this.chatListContainer.scrollTop;
+        
         this.chatListContainer.innerHTML = '';  // Clear existing list
         
         if (messages.length === 0) {
@@ -260,52 +329,63 @@ class MessageUI {
             return;
         }
         
-        const currentChatroom = this.viewModel.getCurrentChatroomInfo();
-        
         messages.forEach(message => {
-            const messageContainer = document.createElement('div');
-            messageContainer.classList.add('message-container');
-            
-            // Store message data
-            messageContainer.dataset.chatroomId = currentChatroom.chatroomId;
-            messageContainer.dataset.clientId = message.client_id;
-            messageContainer.dataset.adminId = message.admin_id;
-            
-            const messageElement = document.createElement('div');
-            messageElement.classList.add('message-item');
-            
-            // Format date
-            const formattedDate = new Date(message.date).toLocaleString("ko-KR", {
-                year: "numeric",
-                month: "2-digit",
-                day: "2-digit",
-                hour: "2-digit",
-                minute: "2-digit",
-                second: "2-digit"
-            });
-            
-            // Determine message style based on sender
-            const isSender = message.client_id === message.sender_id;
-            const backgroundClass = isSender ? 'gray-background' : 'yellow-background';
-            
-            // Message content
-            messageElement.innerHTML = `
-                <div class="message-text ${backgroundClass}">
-                    ${message.text}
-                </div>
-                <div class="message-date">${formattedDate}</div>
-            `;
-            
-            // Set alignment based on sender
-            messageContainer.classList.add(isSender ? 'left' : 'right');
-            messageContainer.appendChild(messageElement);
-            
-            // Add to chat list
-            this.chatListContainer.appendChild(messageContainer);
+            this.chatListContainer.appendChild(this._createMessageElement(message, currentChatroom));
+        });
+        
+        if (change.type === 'prepend') {
+            this.chatListContainer.scrollTop = this.chatListContainer.scrollHeight - previousScrollHeight + previousScrollTop;
+        } else {
+            // Scroll to bottom
+            this.chatListContainer.scrollTop = this.chatListContainer.scrollHeight;
+        }
+    }
+
+    /**
+     * Build the DOM node for one message
+     * @param {Object} message - Message object
+     * @param {Object} currentChatroom - Current chatroom info
+     * @returns {HTMLElement} Message container element
+     * @private
+     */
+    _createMessageElement(message, currentChatroom) {
+        const messageContainer = document.createElement('div');
+        messageContainer.classList.add('message-container');
+        
+        // Store message data
+        messageContainer.dataset.chatroomId = currentChatroom.chatroomId;
+        messageContainer.dataset.clientId = message.client_id;
+        messageContainer.dataset.adminId = message.admin_id;
+        
+        const messageElement = document.createElement('div');
+        messageElement.classList.add('message-item');
+        
+        // Format date
+        const formattedDate = new Date(message.date).toLocaleString("ko-KR", {
+            year: "numeric",
+            month: "2-digit",
+            day: "2-digit",
+            hour: "2-digit",
+            minute: "2-digit",
+            second: "2-digit"
         });
         
-        // Scroll to bottom
-        this.chatListContainer.scrollTop = this.chatListContainer.scrollHeight;
+        // Determine message style based on sender
+        const isSender = message.client_id === message.sender_id;
+        const backgroundClass = isSender ? 'gray-background' : 'yellow-background';
+        
+        // Message content
+        messageElement.innerHTML = `
+            <div class="message-text ${backgroundClass}">
+                ${message.text}
+            </div>
+            <div class="message-date">${formattedDate}</div>
+        `;
+        
+        // Set alignment based on sender
+        messageContainer.classList.add(isSender ? 'left' : 'right');
+        messageContainer.appendChild(messageElement);
+        return messageContainer;
     }
 
     /**
@@ -328,10 +408,13 @@ class MessageUI {
     }
 
     /**
-     * Start auto-refresh for chatrooms
-     * @param {number} interval - Refresh interval in milliseconds
+     * Start auto-refresh for chatrooms.
+     * Uses the server push stream when available; falls back to polling otherwise.
+     * @param {number} interval - Polling interval in milliseconds (fallback only)
      */
     startAutoRefresh(interval = 30000) {
+        if (this.viewModel.connectStream()) return;
+        
         setInterval(() => {
             this.viewModel.loadChatrooms()
                 .catch(error => console.error('Error auto-refreshing chatrooms:', error));
@@ -1,11 +1,17 @@
+import difflib
 import utils.kmong_manager.db_message as db_message
+from utils.kmong_manager import db_connection
 from model.message_dto import MessageDTO
 from datetime import date
 
 class MessageService:
+    MAX_PAGE_SIZE = 200
+    # 대화기록 동기화 때 스크랩한 개수보다 더 거슬러 올라가 비교할 저장된 메시지 수
+    SYNC_LOOKBACK = 200
+
     def __init__(self):
-        # Ensure all chatroom tables have the required columns
-        db_message.add_missing_columns_to_all_chatrooms()
+        # Ensure the unified messages table exists (migrates legacy chatroom_* tables once)
+        db_message.ensure_message_schema()
     
     def get_all_chatroom_tables(self):
         """Get a list of all chatroom tables"""
@@ -15,10 +21,24 @@ class MessageService:
         """Get chatroom information by ID"""
         return db_message.read_chatroom_by_id(chatroom_id)
     
+    def get_chatroom_summaries(self):
+        """Get chatroom list entries (account, unread count, latest date, last message preview)"""
+        return db_message.read_chatroom_summaries()
+    
+    def get_chatroom_summary(self, chatroom_id):
+        """Get the chatroom list entry for a single chatroom (None if it has no matching account)"""
+        summaries = db_message.read_chatroom_summaries(chatroom_id=chatroom_id)
+        return summaries[0] if summaries else None
+    
     def get_messages_by_chatroom_id(self, chatroom_id):
         """Get all messages for a specific chatroom"""
         return db_message.read_all_messages(chatroom_id)
     
+    def get_messages_page(self, chatroom_id, before_idx=None, after_idx=None, limit=50):
+        """Get one page of messages for a chatroom, oldest first (keyset pagination on idx)"""
+        limit = max(1, min(int(limit), self.MAX_PAGE_SIZE))
+        return db_message.read_messages_page(chatroom_id, before_idx=before_idx, after_idx=after_idx, limit=limit)
+    
     def create_chatroom(self, chatroom_id):
         """Create a new chatroom with the given ID"""
         if db_message.check_chatroom_table_exists(chatroom_id):
@@ -66,18 +86,90 @@ class MessageService:
             return False
     
     def sync_chat_history(self, chatroom_id, messages):
-        """Sync chat history for a specific chatroom by replacing all messages"""
-        # Delete existing chatroom
-        self.delete_chatroom(chatroom_id)
+        """
+        스크랩한 대화기록을 채팅방에 저장된 메시지와 맞춰서 합침.
+        저장된 메시지는 idx와 읽음/답장 상태를 그대로 두고, 빠진 메시지만 추가하고 바뀐 내용만 수정한다.
+        조회부터 저장까지 한 트랜잭션이라 그 사이 폴링으로 저장된 메시지와 섞이지 않는다.
+        """
+        with db_connection.transaction():
+            stored = db_message.read_messages_page(chatroom_id, limit=len(messages) + self.SYNC_LOOKBACK)
+            merged = self._merge_history(stored, messages)
+            
+            text_updates = [(row['idx'], dto.text) for kind, row, dto in merged
+                            if kind == 'update' and row['text'] != dto.text]
+            new_dtos, sort_keys = self._place_new_messages(chatroom_id, merged)
+            
+            if not text_updates and not new_dtos:
+                return True, "채팅 내역이 이미 최신입니다."
+            
+            db_message.update_message_texts(chatroom_id, text_updates)
+            db_message.create_messages_bulk(chatroom_id, new_dtos, notify=False, sort_keys=sort_keys)
+        
+        return True, f"채팅 내역이 동기화되었습니다. (새 메시지 {len(new_dtos)}개)"
+    
+    @staticmethod
+    def _position(row):
+        return row['sort_key'] if row.get('sort_key') is not None else row['idx']
+    
+    def _place_new_messages(self, chatroom_id, merged):
+        """
+        새 메시지마다 채팅방 내 위치(sort_key)를 정함.
+        마지막 저장된 메시지 뒤에 오는 메시지는 None(새 idx 순서 그대로),
+        저장된 메시지 사이에 들어갈 메시지는 앞뒤 메시지 위치 사이를 균등하게 나눈 값.
+        :return: (새 MessageDTO 목록, sort_key 목록)
+        """
+        new_dtos, sort_keys = [], []
+        pending = []  # 다음 저장된 메시지 앞에 들어갈 새 메시지
+        previous_position = None
         
-        # Create new chatroom
-        self.create_chatroom(chatroom_id)
+        for kind, row, dto in merged:
+            if kind == 'new':
+                pending.append(dto)
+                continue
+            position = self._position(row)
+            if pending:
+                if previous_position is None:
+                    # 비교 범위의 첫 메시지보다 앞: 범위 밖의 바로 앞 메시지와의 사이
+                    previous_position = db_message.read_position_before(chatroom_id, position)
+                step = (position - previous_position) / (len(pending) + 1)
+                new_dtos.extend(pending)
+                sort_keys.extend(previous_position + step * number for number in range(1, len(pending) + 1))
+                pending = []
+            previous_position = position
         
-        # Add each message to the chatroom
-        for message in messages:
-            db_message.create_message(chatroom_id, message)
+        new_dtos.extend(pending)
+        sort_keys.extend([None] * len(pending))
+        return new_dtos, sort_keys
+    
+    @staticmethod
+    def _history_key(sender_id, text):
+        return str(sender_id), (text or '').strip()
+    
+    def _merge_history(self, stored, scraped):
+        """
+        저장된 메시지와 스크랩한 MessageDTO를 (보낸 사람, 내용)과 순서로 맞춤.
+        시간순 [(kind, 저장된 행, 스크랩한 dto)] 반환. kind는
+        'stored'(그대로인 행), 'update'(내용이 바뀐 행), 'new'(스크랩에만 있음) 중 하나.
+        스크랩에 없는 저장된 메시지도 'stored'로 남겨서 로컬 데이터는 지우지 않는다.
+        """
+        stored_keys = [self._history_key(row['sender_id'], row['text']) for row in stored]
+        scraped_keys = [self._history_key(dto.sender_id, dto.text) for dto in scraped]
         
-        return True, "채팅 내역이 동기화되었습니다."
+        merged = []
+        matcher = difflib.SequenceMatcher(None, stored_keys, scraped_keys, autojunk=False)
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+            if tag == 'equal' or tag == 'delete':
+                merged.extend(('stored', row, None) for row in stored[i1:i2])
+            elif tag == 'insert':
+                merged.extend(('new', None, dto) for dto in scraped[j1:j2])
+            elif i2 - i1 == j2 - j1 and all(
+                    stored_keys[i][0] == scraped_keys[j][0] for i, j in zip(range(i1, i2), range(j1, j2))):
+                # 같은 사람들이 같은 순서로 보냄: 내용이 수정됐거나 표시 형식만 다름
+                merged.extend(('update', row, dto) for row, dto in zip(stored[i1:i2], scraped[j1:j2]))
+            else:
+                merged.extend(('stored', row, None) for row in stored[i1:i2])
+                merged.extend(('new', None, dto) for dto in scraped[j1:j2])
+        return merged
     
 # from datetime import date
 # from model.message_dto import MessageDTO
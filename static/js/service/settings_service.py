@@ -11,14 +11,41 @@ class SettingsService:
             'refreshInterval': {
                 'parseUnReadMessagesinDB': 30,  # 기본값 25-35초
                 'sendUnReadMessagesViaTelebot': 30,  # 기본값 25-35초
-                'replyViaTeleBot': 10  # 기본값 8-12초
+                'replyViaTeleBot': 10,  # 기본값 8-12초
+                'adaptive': {  # 계정별 크몽 확인 주기 (활동이 있으면 floor, 조용하면 backoff배씩 ceiling까지)
+                    'floor': 15,
+                    'ceiling': 600,
+                    'backoff': 2.0
+                }
             },
             'telegram': {
                 'botToken': '',
-                'chatId': ''
+                'chatId': '',
+                'digest': True,  # 채팅방별 새 메시지를 한 메시지로 묶어서 전송
+                'apiBaseUrl': '',  # 비워두면 https://api.telegram.org (오프라인 테스트 시 fake_bot_api 주소)
+                'webhook': {  # 답장을 getUpdates 폴링 대신 /api/telegram/webhook 으로 받음
+                    'enabled': False,
+                    'url': '',
+                    'secret': ''
+                }
             },
             'chatrooms': {
                 'checked': []  # 체크된 채팅방 ID 목록
+            },
+            'browser': {  # Selenium 브라우저 성능 설정 (utils/selenium_manager/browser_profile.py)
+                'headless': True,
+                'page_load_strategy': 'eager',
+                'window_width': 1280,
+                'window_height': 900,
+                'block_images': True,
+                'block_media': True,
+                'block_fonts': True,
+                'block_third_party': True
+            },
+            'gpt': {  # 추천 답변 프롬프트에 넣을 비슷한 과거 문의/답변 (utils/gpt_manager/vector_index.py)
+                'embedder': 'openai',  # 'openai' 또는 'hashing' (오프라인, API 호출 없음)
+                'embeddingModel': 'text-embedding-3-small',
+                'similarExamples': 3
             }
         }
         # 로깅 설정
@@ -51,6 +78,9 @@ class SettingsService:
             for key in self.default_settings['refreshInterval']:
                 if key not in settings['refreshInterval']:
                     settings['refreshInterval'][key] = self.default_settings['refreshInterval'][key]
+            for key in self.default_settings['refreshInterval']['adaptive']:
+                if key not in settings['refreshInterval']['adaptive']:
+                    settings['refreshInterval']['adaptive'][key] = self.default_settings['refreshInterval']['adaptive'][key]
         
         # telegram 설정 체크
         if 'telegram' not in settings:
@@ -68,6 +98,22 @@ class SettingsService:
                 if key not in settings['chatrooms']:
                     settings['chatrooms'][key] = self.default_settings['chatrooms'][key]
 
+        # browser 설정 체크
+        if 'browser' not in settings:
+            settings['browser'] = self.default_settings['browser']
+        else:
+            for key in self.default_settings['browser']:
+                if key not in settings['browser']:
+                    settings['browser'][key] = self.default_settings['browser'][key]
+
+        # gpt 설정 체크
+        if 'gpt' not in settings:
+            settings['gpt'] = self.default_settings['gpt']
+        else:
+            for key in self.default_settings['gpt']:
+                if key not in settings['gpt']:
+                    settings['gpt'][key] = self.default_settings['gpt'][key]
+
         return settings
   
     def _save_settings(self, settings):
@@ -112,6 +158,32 @@ class SettingsService:
             traceback.print_exc()
             return False, f'갱신주기 업데이트에 실패했습니다: {str(e)}'
     
+    def update_adaptive_interval(self, floor, ceiling, backoff):
+        """Update adaptive per-account polling bounds"""
+        if not isinstance(floor, (int, float)) or floor < 5:
+            return False, '최소 간격은 5초 이상이어야 합니다.'
+        if not isinstance(ceiling, (int, float)) or ceiling < floor:
+            return False, '최대 간격은 최소 간격보다 크거나 같아야 합니다.'
+        if not isinstance(backoff, (int, float)) or backoff < 1:
+            return False, '증가 배율은 1 이상이어야 합니다.'
+        
+        try:
+            self.settings['refreshInterval']['adaptive'] = {
+                'floor': floor,
+                'ceiling': ceiling,
+                'backoff': backoff
+            }
+            
+            if self._save_settings(self.settings):
+                self.logger.info(f"settings_service.py, update_adaptive_interval // ✅ 적응형 주기 저장: {self.settings['refreshInterval']['adaptive']}")
+                return True, '적응형 갱신주기가 업데이트되었습니다.'
+            else:
+                self.logger.error("settings_service.py, update_adaptive_interval // ⛔ 적응형 주기 저장 실패")
+                return False, '적응형 갱신주기 저장 중 오류가 발생했습니다.'
+        except Exception as e:
+            self.logger.error(f"settings_service.py, update_adaptive_interval // ⛔ 적응형 주기 업데이트 중 오류: {e}")
+            return False, f'적응형 갱신주기 업데이트에 실패했습니다: {str(e)}'
+    
     def update_telegram_settings(self, token, chat_id):
         """Update Telegram bot settings"""
         if not token or not chat_id:
@@ -131,6 +203,27 @@ class SettingsService:
             print(f"텔레그램 설정 업데이트 중 오류: {e}")
             return False, f'텔레그램 설정 업데이트에 실패했습니다: {str(e)}'
         
+    def update_telegram_webhook(self, enabled, url, secret=None):
+        """Update Telegram webhook settings (https only; http is allowed only with apiBaseUrl set for fake_bot_api)"""
+        allowed_schemes = ('https://', 'http://') if self.settings['telegram'].get('apiBaseUrl') else ('https://',)
+        if enabled and not str(url or '').startswith(allowed_schemes):
+            return False, '유효하지 않은 webhook 주소입니다. (텔레그램은 https 주소만 허용)'
+
+        try:
+            webhook = self.settings['telegram'].setdefault('webhook', {})
+            webhook['enabled'] = bool(enabled)
+            webhook['url'] = url or ''
+            if secret is not None:
+                webhook['secret'] = secret
+
+            if self._save_settings(self.settings):
+                return True, '텔레그램 webhook 설정이 업데이트되었습니다.'
+            else:
+                return False, '텔레그램 webhook 설정 저장 중 오류가 발생했습니다.'
+        except Exception as e:
+            print(f"텔레그램 webhook 설정 업데이트 중 오류: {e}")
+            return False, f'텔레그램 webhook 설정 업데이트에 실패했습니다: {str(e)}'
+
     def update_chatroom_check(self, chatroom_id, is_checked):
         """특정 채팅방의 체크 상태를 업데이트"""
         try:
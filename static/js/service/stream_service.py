@@ -0,0 +1,154 @@
+import json
+import time
+import logging
+import threading
+from collections import deque
+
+import utils.kmong_manager.db_message as db_message
+from utils.event_bus import event_bus
+from utils.event_bus.events import MessageStored, MessageSeen, OutboxJobUpdated
+from static.js.service.message_service import MessageService
+
+
+class StreamService:
+    """
+    Server-Sent Events push channel.
+    Turns event bus events into 'chatroom' (summary delta), 'message' (new row) and 'outbox' (send job status) stream events,
+    keeping a short history so reconnecting browsers can resume from Last-Event-ID.
+    Chatroom summaries are queried on a background thread, once per chatroom per SUMMARY_COALESCE_SECONDS,
+    so a burst of stored messages does not run one summary query per message on the publisher's thread.
+    """
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    HEARTBEAT_SECONDS = 15
+    SUMMARY_COALESCE_SECONDS = 0.2
+
+    @classmethod
+    def get_instance(cls):
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls()
+        return cls._instance
+
+    def __init__(self, history_size=500):
+        self.logger = logging.getLogger(__name__)
+        self.message_service = MessageService()
+
+        self._condition = threading.Condition()
+        self._history = deque(maxlen=history_size)
+        # Start ids from the boot time so ids from a previous process are always older
+        self._last_id = int(time.time() * 1000)
+
+        # Chatrooms whose summary has to be pushed (drained by the summary thread)
+        self._pending_summaries = set()
+        self._summary_lock = threading.Lock()
+        self._summary_wakeup = threading.Event()
+        self._summary_thread = threading.Thread(target=self._run_summaries, name="stream-summaries", daemon=True)
+        self._summary_thread.start()
+
+        event_bus.subscribe(MessageStored, self._on_message_stored)
+        event_bus.subscribe(MessageSeen, self._on_message_seen)
+        event_bus.subscribe(OutboxJobUpdated, self._on_outbox_job_updated)
+
+    def _push(self, event_name, data):
+        with self._condition:
+            self._last_id += 1
+            self._history.append((self._last_id, event_name, data))
+            self._condition.notify_all()
+
+    def _push_chatroom_summary(self, chatroom_id):
+        summary = self.message_service.get_chatroom_summary(chatroom_id)
+        if summary:
+            self._push('chatroom', summary)
+
+    def _schedule_chatroom_summary(self, chatroom_id):
+        """Queue a summary push; repeated calls for the same chatroom before the flush collapse into one"""
+        with self._summary_lock:
+            self._pending_summaries.add(chatroom_id)
+        self._summary_wakeup.set()
+
+    def _run_summaries(self):
+        while True:
+            self._summary_wakeup.wait()
+            # Let the rest of the burst arrive before querying
+            time.sleep(self.SUMMARY_COALESCE_SECONDS)
+            self._summary_wakeup.clear()
+            with self._summary_lock:
+                chatroom_ids, self._pending_summaries = self._pending_summaries, set()
+
+            for chatroom_id in chatroom_ids:
+                try:
+                    self._push_chatroom_summary(chatroom_id)
+                except Exception as e:
+                    self.logger.error(f"stream_service.py, _run_summaries // ⛔ 채팅방 {chatroom_id} 요약 조회 오류: {str(e)}")
+
+    def _on_message_stored(self, event):
+        message = db_message.read_message_by_id(event.chatroom_id, event.message_idx)
+        if message:
+            self._push('message', message)
+        self._schedule_chatroom_summary(event.chatroom_id)
+
+    def _on_message_seen(self, event):
+        self._schedule_chatroom_summary(event.chatroom_id)
+
+    def _on_outbox_job_updated(self, event):
+        self._push('outbox', {
+            'job_id': event.job_id,
+            'chatroom_id': event.chatroom_id,
+            'status': event.status,
+            'error': event.error
+        })
+
+    def _events_after(self, last_event_id):
+        """Return (events, reset) for events newer than last_event_id"""
+        with self._condition:
+            if last_event_id is None:
+                return [], False
+            if self._history and last_event_id < self._history[0][0] - 1:
+                # Client missed events that are no longer kept: it has to reload everything
+                return [], True
+            if last_event_id > self._last_id:
+                # Id from another process (server restarted)
+                return [], True
+            return [item for item in self._history if item[0] > last_event_id], False
+
+    @staticmethod
+    def _format(event_id, event_name, data):
+        payload = json.dumps(data, ensure_ascii=False, default=str)
+        return f"id: {event_id}\nevent: {event_name}\ndata: {payload}\n\n"
+
+    def stream(self, last_event_id=None):
+        """Generator of SSE frames. Blocks between events, sending a heartbeat comment when idle."""
+        backlog, reset = self._events_after(last_event_id)
+        with self._condition:
+            cursor = self._last_id
+
+        if reset:
+            yield self._format(cursor, 'reset', {})
+        for event_id, event_name, data in backlog:
+            yield self._format(event_id, event_name, data)
+        if not reset and not backlog:
+            # Tell the client where it starts so a later reconnect can resume
+            yield f"id: {cursor}\nretry: 3000\n\n"
+
+        while True:
+            previous_cursor = cursor
+            with self._condition:
+                if self._last_id <= cursor:
+                    self._condition.wait(timeout=self.HEARTBEAT_SECONDS)
+                pending = [item for item in self._history if item[0] > cursor]
+                if pending:
+                    cursor = pending[-1][0]
+
+            if not pending:
+                yield ": keepalive\n\n"
+                continue
+
+            if pending[0][0] > previous_cursor + 1:
+                # Fell behind further than the kept history
+                yield self._format(cursor, 'reset', {})
+                continue
+
+            for event_id, event_name, data in pending:
+                yield self._format(event_id, event_name, data)
@@ -10,10 +10,26 @@ class MessageViewModel {
         this.currentClientId = null;
         this.currentAdminId = null;
         
+        // Message paging state
+        this.pageSize = 50;
+        this.hasMoreHistory = false;
+        this.isLoadingHistory = false;
+        
+        // Live update stream (Server-Sent Events)
+        this.eventSource = null;
+        
         // Observer lists for different data types
         this.chatroomObservers = [];
         this.messageObservers = [];
         this.currentChatroomObservers = [];
+        this.outboxObservers = [];
+
+        // Send jobs waiting for a result, polled when there is no stream
+        this.pendingJobs = new Set();
+        this.outboxPollInterval = 3000;
+        // Latest stream update per job id not registered yet (the event can beat the POST response)
+        this.earlyOutboxUpdates = new Map();
+        this.maxEarlyOutboxUpdates = 50;
     }
 
     /**
@@ -40,6 +56,14 @@ class MessageViewModel {
         this.currentChatroomObservers.push(observer);
     }
 
+    /**
+     * Add an observer for outbox (send job) status changes
+     * @param {Function} observer - Called with { job_id, chatroom_id, status, error }
+     */
+    addOutboxObserver(observer) {
+        this.outboxObservers.push(observer);
+    }
+
     /**
      * Remove a chatroom observer
      * @param {Function} observer - Observer to remove
@@ -66,16 +90,18 @@ class MessageViewModel {
 
     /**
      * Notify chatroom observers
+     * @param {Object} change - What changed: { type: 'replace' } or { type: 'patch', chatroom }
      */
-    notifyChatroomObservers() {
-        this.chatroomObservers.forEach(observer => observer(this.chatrooms));
+    notifyChatroomObservers(change = { type: 'replace' }) {
+        this.chatroomObservers.forEach(observer => observer(this.chatrooms, change));
     }
 
     /**
      * Notify message observers
+     * @param {Object} change - What changed: { type: 'replace' | 'prepend' | 'append', count }
      */
-    notifyMessageObservers() {
-        this.messageObservers.forEach(observer => observer(this.messages));
+    notifyMessageObservers(change = { type: 'replace', count: this.messages.length }) {
+        this.messageObservers.forEach(observer => observer(this.messages, change));
     }
 
     /**
@@ -122,21 +148,118 @@ class MessageViewModel {
     }
 
     /**
-     * Load messages for a specific chatroom
+     * Fetch one page of messages from server
      * @param {string} chatroomId - Chatroom ID
-     * @returns {Promise} - Promise that resolves when messages are loaded
+     * @param {Object} params - Query parameters (before_idx, after_idx, limit)
+     * @returns {Promise<Array>} - Messages ordered oldest first
+     * @private
      */
-    loadMessages(chatroomId) {
-        return fetch(`/api/message/loadChatHistory/${chatroomId}`)
+    _fetchMessagePage(chatroomId, params = {}) {
+        const query = new URLSearchParams(params).toString();
+        return fetch(`/api/message/loadChatHistory/${chatroomId}?${query}`)
             .then(response => {
                 if (!response.ok) throw new Error("메시지를 불러오는 데 실패했습니다.");
                 return response.json();
-            })
+            });
+    }
+
+    /**
+     * Connect to the server push stream for live chatroom/message updates.
+     * EventSource reconnects on its own and sends Last-Event-ID so no update is missed.
+     * @returns {boolean} - false if the browser has no EventSource support
+     */
+    connectStream() {
+        if (!window.EventSource) return false;
+        if (this.eventSource) return true;
+
+        this.eventSource = new EventSource('/api/message/stream');
+
+        this.eventSource.addEventListener('chatroom', event => {
+            this.applyChatroomPatch(JSON.parse(event.data));
+        });
+        this.eventSource.addEventListener('message', event => {
+            this.applyIncomingMessage(JSON.parse(event.data));
+        });
+        this.eventSource.addEventListener('outbox', event => {
+            this.applyOutboxUpdate(JSON.parse(event.data));
+        });
+        this.eventSource.addEventListener('reset', () => {
+            // Server could not replay missed events: reload everything once
+            this.loadChatrooms().catch(() => {});
+            if (this.currentChatroomId) this.loadNewMessages().catch(() => {});
+        });
+        this.eventSource.onerror = () => {
+            console.warn('실시간 갱신 연결이 끊어졌습니다. 재연결 중...');
+        };
+        return true;
+    }
+
+    /**
+     * Close the server push stream
+     */
+    disconnectStream() {
+        if (this.eventSource) {
+            this.eventSource.close();
+            this.eventSource = null;
+        }
+    }
+
+    /**
+     * Sort chatrooms the same way the server does:
+     * unread first, then latest date, then latest message
+     * @private
+     */
+    _sortChatrooms() {
+        this.chatrooms.sort((a, b) => {
+            const unreadDiff = (b.unread_count > 0) - (a.unread_count > 0);
+            if (unreadDiff !== 0) return unreadDiff;
+            const dateA = String(a.latest_date || '');
+            const dateB = String(b.latest_date || '');
+            if (dateA !== dateB) return dateA < dateB ? 1 : -1;
+            return (b.last_idx || 0) - (a.last_idx || 0);
+        });
+    }
+
+    /**
+     * Apply a single chatroom summary pushed by the server
+     * @param {Object} summary - Chatroom summary object
+     */
+    applyChatroomPatch(summary) {
+        const index = this.chatrooms.findIndex(room => String(room.chatroom_id) === String(summary.chatroom_id));
+        if (index >= 0) {
+            this.chatrooms[index] = summary;
+        } else {
+            this.chatrooms.push(summary);
+        }
+        this._sortChatrooms();
+        this.notifyChatroomObservers({ type: 'patch', chatroom: summary });
+    }
+
+    /**
+     * Apply a new message pushed by the server (only for the open chatroom)
+     * @param {Object} message - Message row
+     */
+    applyIncomingMessage(message) {
+        if (String(message.chatroom_id) !== String(this.currentChatroomId)) return;
+
+        const lastIdx = this.messages.length > 0 ? this.messages[this.messages.length - 1].idx : 0;
+        if (message.idx <= lastIdx) return;  // Already held
+
+        this.messages.push(message);
+        this.notifyMessageObservers({ type: 'append', count: 1 });
+    }
+
+    /**
+     * Load the most recent messages for a specific chatroom
+     * @param {string} chatroomId - Chatroom ID
+     * @returns {Promise} - Promise that resolves when messages are loaded
+     */
+    loadMessages(chatroomId) {
+        return this._fetchMessagePage(chatroomId, { limit: this.pageSize })
             .then(data => {
                 this.messages = data;
+                this.hasMoreHistory = data.length === this.pageSize;
                 this.notifyMessageObservers();
-                // 여기서 this._markMessagesAsRead(chatroomId)를 호출했지만, 해당 메소드가 없음
-                // 대신 markMessagesAsRead를 사용
                 return data;
             })
             .catch(error => {
@@ -145,6 +268,58 @@ class MessageViewModel {
             });
     }
 
+    /**
+     * Load older messages (before the oldest message currently held)
+     * @returns {Promise} - Promise that resolves with the loaded messages
+     */
+    loadOlderMessages() {
+        const chatroomId = this.currentChatroomId;
+        if (!chatroomId || !this.hasMoreHistory || this.isLoadingHistory || this.messages.length === 0) {
+            return Promise.resolve([]);
+        }
+
+        this.isLoadingHistory = true;
+        return this._fetchMessagePage(chatroomId, { before_idx: this.messages[0].idx, limit: this.pageSize })
+            .then(data => {
+                // 그 사이 다른 채팅방으로 이동했으면 무시
+                if (chatroomId !== this.currentChatroomId) return [];
+                this.messages = data.concat(this.messages);
+                this.hasMoreHistory = data.length === this.pageSize;
+                this.notifyMessageObservers({ type: 'prepend', count: data.length });
+                return data;
+            })
+            .catch(error => {
+                console.error('이전 메시지 로딩 중 오류:', error);
+                throw error;
+            })
+            .finally(() => {
+                this.isLoadingHistory = false;
+            });
+    }
+
+    /**
+     * Load only messages newer than the latest message currently held
+     * @returns {Promise} - Promise that resolves with the new messages
+     */
+    loadNewMessages() {
+        const chatroomId = this.currentChatroomId;
+        if (!chatroomId) return Promise.resolve([]);
+        if (this.messages.length === 0) return this.loadMessages(chatroomId);
+
+        const lastIdx = this.messages[this.messages.length - 1].idx;
+        return this._fetchMessagePage(chatroomId, { after_idx: lastIdx, limit: 200 })
+            .then(data => {
+                if (chatroomId !== this.currentChatroomId || data.length === 0) return [];
+                this.messages = this.messages.concat(data);
+                this.notifyMessageObservers({ type: 'append', count: data.length });
+                return data;
+            })
+            .catch(error => {
+                console.error('새 메시지 로딩 중 오류:', error);
+                throw error;
+            });
+    }
+
     /**
     * 메시지를 읽음 처리하는 메소드
      * @param {string} chatroomId - Chatroom ID
@@ -178,7 +353,7 @@ class MessageViewModel {
     /**
      * Send a message
      * @param {string} text - Message text
-     * @returns {Promise} - Promise that resolves when message is sent
+     * @returns {Promise} - Promise that resolves with { job_id, status } once the message is queued
      */
     sendMessage(text) {
         if (!text || !text.trim()) {
@@ -206,17 +381,64 @@ class MessageViewModel {
             return response.json();
         })
         .then(data => {
-            if (data.success) {
-                return Promise.all([
-                    this.loadMessages(this.currentChatroomId),
-                    this.loadChatrooms()
-                ]).then(() => data);
-            } else {
-                throw new Error(data.message || "메시지 전송 실패");
+            if (!data.success) throw new Error(data.message || "메시지 전송 실패");
+
+            // The message is queued: its result arrives as an 'outbox' stream event
+            this.pendingJobs.add(data.job_id);
+            const earlyUpdate = this.earlyOutboxUpdates.get(data.job_id);
+            if (earlyUpdate) {
+                this.earlyOutboxUpdates.delete(data.job_id);
+                this.applyOutboxUpdate(earlyUpdate);
             }
+            if (!this.eventSource && this.pendingJobs.has(data.job_id)) this.pollOutboxJob(data.job_id);
+            return data;
         });
     }
 
+    /**
+     * Apply a send job status change (from the stream or from polling)
+     * @param {Object} job - { job_id, chatroom_id, status, error }
+     */
+    applyOutboxUpdate(job) {
+        if (!this.pendingJobs.has(job.job_id)) {
+            // Possibly our own job whose POST has not resolved yet: keep the latest update for sendMessage
+            this.earlyOutboxUpdates.delete(job.job_id);
+            this.earlyOutboxUpdates.set(job.job_id, job);
+            if (this.earlyOutboxUpdates.size > this.maxEarlyOutboxUpdates) {
+                this.earlyOutboxUpdates.delete(this.earlyOutboxUpdates.keys().next().value);
+            }
+            return;
+        }
+
+        if (job.status === 'sent' || job.status === 'failed') {
+            this.pendingJobs.delete(job.job_id);
+        }
+        if (job.status === 'sent' && !this.eventSource && String(job.chatroom_id) === String(this.currentChatroomId)) {
+            // Without the stream the stored reply has to be fetched
+            this.loadNewMessages().catch(() => {});
+            this.loadChatrooms().catch(() => {});
+        }
+        this.outboxObservers.forEach(observer => observer(job));
+    }
+
+    /**
+     * Poll a send job until it is sent or failed (used when EventSource is unavailable)
+     * @param {number} jobId - Outbox job id
+     */
+    pollOutboxJob(jobId) {
+        setTimeout(() => {
+            fetch(`/api/message/outbox/${jobId}`)
+                .then(response => response.json())
+                .then(data => {
+                    if (!data.success) return;
+                    const { job_id, chatroom_id, status, last_error } = data.job;
+                    this.applyOutboxUpdate({ job_id, chatroom_id, status, error: last_error });
+                    if (this.pendingJobs.has(jobId)) this.pollOutboxJob(jobId);
+                })
+                .catch(() => this.pollOutboxJob(jobId));
+        }, this.outboxPollInterval);
+    }
+
     /**
      * Sync chat history with server
      * @returns {Promise} - Promise that resolves when chat history is synced
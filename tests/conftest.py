@@ -0,0 +1,49 @@
+import pytest
+
+from utils.event_bus.event_bus import EventBus
+from utils.kmong_manager import db_connection
+from utils.kmong_manager import db_message
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    """테스트마다 비어 있는 임시 DB 파일 (메시지 스키마 생성까지)"""
+    db_connection.configure(str(tmp_path / "test.db"))
+    monkeypatch.setattr(db_message, "_schema_ready", False)
+    db_message.ensure_message_schema()
+    yield tmp_path / "test.db"
+    db_connection.close_all()
+
+
+class FakeClock:
+    """time.time / time.monotonic / time.sleep 대신 쓰는 시계 (sleep하면 시간만 흐름)"""
+
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+        self.sleeps = []
+
+    def time(self):
+        return self.now
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def bus(monkeypatch):
+    """테스트마다 새 EventBus (다른 테스트에서 만든 구독자가 이벤트를 받지 않도록)"""
+    instance = EventBus()
+    monkeypatch.setattr(EventBus, "_instance", instance)
+    return instance
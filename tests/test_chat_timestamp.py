@@ -0,0 +1,27 @@
+from datetime import date
+
+import pytest
+
+from utils.selenium_manager.chat_timestamp import parse_chat_timestamp
+
+TODAY = date(2025, 3, 10)
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("2024.03.05 오후 3:21", date(2024, 3, 5)),
+    ("2024. 3. 5.", date(2024, 3, 5)),
+    ("2024-03-05 15:21", date(2024, 3, 5)),
+    ("2024년 3월 5일 화요일", date(2024, 3, 5)),
+    ("3월 5일 오전 9:02", date(2025, 3, 5)),
+    ("12.24", date(2024, 12, 24)),
+    ("어제 오후 11:50", date(2025, 3, 9)),
+    ("오후 3:21", TODAY),
+    ("15:21", TODAY),
+])
+def test_parses_displayed_timestamps(text, expected):
+    assert parse_chat_timestamp(text, today=TODAY) == expected
+
+
+@pytest.mark.parametrize("text", [None, "", "읽음", "2024.13.40"])
+def test_returns_none_when_date_is_unknown(text):
+    assert parse_chat_timestamp(text, today=TODAY) is None
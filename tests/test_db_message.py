@@ -0,0 +1,47 @@
+from datetime import date
+
+from model.message_dto import MessageDTO
+from utils.kmong_manager import db_connection
+from utils.kmong_manager import db_message
+
+CHATROOM_ID = 100
+ADMIN_ID = 1
+CLIENT_ID = 2
+
+
+def _client_message(text, kmong_message_id):
+    return MessageDTO(admin_id=ADMIN_ID, text=text, client_id=CLIENT_ID, sender_id=CLIENT_ID,
+                      kmong_message_id=kmong_message_id, date=date.today())
+
+
+def _web_reply(text):
+    # OutboxWorker가 웹에서 보낸 답장을 저장하는 값과 같음
+    return MessageDTO(admin_id=ADMIN_ID, text=text, client_id=CLIENT_ID, sender_id=ADMIN_ID,
+                      replied_kmong=1, replied_telegram=0, seen=0, date=date.today())
+
+
+def test_web_reply_is_not_forwarded_to_telegram(db):
+    question_idx = db_message.create_message(CHATROOM_ID, _client_message("견적 문의드립니다", 11))
+    db_message.create_message(CHATROOM_ID, _web_reply("네 확인해보겠습니다"))
+
+    unread = db_message.read_unread_messages()
+
+    assert [row['idx'] for row in unread] == [question_idx]
+
+
+def test_web_reply_stays_out_after_client_messages_are_seen(db):
+    db_message.create_message(CHATROOM_ID, _client_message("견적 문의드립니다", 11))
+    db_message.create_message(CHATROOM_ID, _web_reply("네 확인해보겠습니다"))
+
+    db_message.update_unread_message(CHATROOM_ID)
+
+    assert db_message.read_unread_messages() == []
+
+
+def test_unread_query_uses_partial_index(db):
+    with db_connection.connect() as conn:
+        plan = conn.execute("""EXPLAIN QUERY PLAN SELECT * FROM messages
+                               WHERE seen = 0 AND replied_telegram = 0 AND client_id = sender_id
+                               ORDER BY chatroom_id, idx""").fetchall()
+
+    assert any("idx_messages_unread_client" in row[-1] for row in plan)
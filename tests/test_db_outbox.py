@@ -0,0 +1,78 @@
+import pytest
+
+from utils.kmong_manager import db_outbox
+
+
+@pytest.fixture
+def outbox(db, clock, monkeypatch):
+    monkeypatch.setattr(db_outbox, "time", clock)
+    db_outbox.create_outbox_table()
+    return clock
+
+
+def test_claim_records_lease(outbox):
+    job_id = db_outbox.enqueue_message(1, 10, 20, "hi")
+
+    job = db_outbox.claim_next_job("worker-a")
+
+    assert (job['job_id'], job['status'], job['attempts']) == (job_id, db_outbox.STATUS_SENDING, 1)
+    stored = db_outbox.read_job(job_id)
+    assert (stored['claimed_by'], stored['claimed_at']) == ("worker-a", outbox.now)
+
+
+def test_live_lease_is_neither_requeued_nor_reclaimed(outbox):
+    db_outbox.enqueue_message(1, 10, 20, "hi")
+    db_outbox.claim_next_job("worker-a")
+    outbox.advance(db_outbox.CLAIM_LEASE_SECONDS - 1)
+
+    assert db_outbox.requeue_interrupted_jobs() == 0
+    assert db_outbox.claim_next_job("worker-b") is None
+
+
+def test_expired_lease_is_reclaimed(outbox):
+    job_id = db_outbox.enqueue_message(1, 10, 20, "hi")
+    db_outbox.claim_next_job("worker-a")
+    outbox.advance(db_outbox.CLAIM_LEASE_SECONDS + 1)
+
+    job = db_outbox.claim_next_job("worker-b")
+
+    assert (job['job_id'], job['claimed_by'], job['attempts']) == (job_id, "worker-b", 2)
+
+
+def test_requeue_only_expired_claims(outbox):
+    expired = db_outbox.enqueue_message(1, 10, 20, "old")
+    fresh = db_outbox.enqueue_message(2, 10, 30, "new")
+    db_outbox.claim_next_job("worker-a")
+    outbox.advance(db_outbox.CLAIM_LEASE_SECONDS - 10)
+    db_outbox.claim_next_job("worker-b")
+    outbox.advance(20)
+
+    assert db_outbox.requeue_interrupted_jobs() == 1
+    assert db_outbox.read_job(expired)['status'] == db_outbox.STATUS_QUEUED
+    assert db_outbox.read_job(fresh)['status'] == db_outbox.STATUS_SENDING
+
+
+def test_jobs_in_one_chatroom_are_sent_in_order(outbox):
+    first = db_outbox.enqueue_message(1, 10, 20, "first")
+    second = db_outbox.enqueue_message(1, 10, 20, "second")
+    other_room = db_outbox.enqueue_message(2, 10, 30, "other")
+
+    assert db_outbox.claim_next_job("a")['job_id'] == first
+    assert db_outbox.claim_next_job("b")['job_id'] == other_room
+    assert db_outbox.claim_next_job("c") is None
+
+    db_outbox.mark_sent(first, 1)
+    with db_outbox.db_connection.transaction():
+        db_outbox.mark_stored(first)
+    assert db_outbox.claim_next_job("c")['job_id'] == second
+
+
+def test_retry_waits_for_backoff(outbox):
+    job_id = db_outbox.enqueue_message(1, 10, 20, "hi")
+    db_outbox.claim_next_job("a")
+    db_outbox.mark_retry(job_id, 1, "timeout", 10)
+
+    outbox.advance(9)
+    assert db_outbox.claim_next_job("a") is None
+    outbox.advance(1)
+    assert db_outbox.claim_next_job("a")['job_id'] == job_id
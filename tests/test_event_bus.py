@@ -0,0 +1,35 @@
+import threading
+import time
+
+from utils.event_bus.event_bus import EventBus
+
+
+def test_get_instance_creates_one_bus_under_concurrency(monkeypatch):
+    monkeypatch.setattr(EventBus, "_instance", None)
+    original_init = EventBus.__init__
+    created = []
+
+    def slow_init(self):
+        # 생성 도중 다른 스레드가 끼어들 수 있도록 지연
+        created.append(self)
+        time.sleep(0.01)
+        original_init(self)
+
+    monkeypatch.setattr(EventBus, "__init__", slow_init)
+
+    barrier = threading.Barrier(8)
+    results = []
+
+    def worker():
+        barrier.wait()
+        results.append(EventBus.get_instance())
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(created) == 1
+    assert all(result is created[0] for result in results)
+    assert len(results) == 8
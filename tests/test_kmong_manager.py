@@ -0,0 +1,93 @@
+import json
+
+import pytest
+
+pytest.importorskip("requests")
+pytest.importorskip("psutil")
+
+from model.account_dto import AccountDTO
+from model.message_dto import MessageDTO
+from utils.kmong_checker import dbLib
+from utils.kmong_manager import db_account
+from utils.kmong_manager import db_message
+from utils.kmong_manager.kmong_manger import KmongManager
+
+EMAIL = "seller@example.com"
+ME = 1000
+
+
+def _message(mid, chatroom_id, sender, receiver, text):
+    return {'MID': mid, 'inbox_group_id': chatroom_id, 'MSGFROM': sender, 'MSGTO': receiver, 'message': text}
+
+
+def _page(*messages):
+    return {'total': len(messages), 'dates': [{'messages': list(messages)}]}
+
+
+@pytest.fixture
+def manager(db, monkeypatch):
+    db_account.create_account_table()
+    db_account.create_account(AccountDTO(email=EMAIL, password="pw", login_cookie="{}", user_id=ME))
+    dbLib.create_db()
+    manager = KmongManager()
+    pages = {}
+    monkeypatch.setattr(manager, "_fetch_message_page", lambda userid, cookies, page: pages.get(page))
+    manager.pages = pages
+    return manager
+
+
+def _rows(chatroom_id):
+    return {row['kmong_message_id']: row for row in db_message.read_all_messages(chatroom_id)}
+
+
+def test_my_messages_are_stored_with_admin_and_client_in_place(manager):
+    manager.pages[1] = _page(
+        _message(12, 10, ME, 2000, "네 가능합니다"),
+        _message(11, 10, 2000, ME, "가능할까요?"),
+    )
+    db_message.create_chatroom_table(10)
+
+    assert manager.check_unread_message(EMAIL, "pw", json.dumps({}))
+
+    rows = _rows(10)
+    assert (rows[12]['admin_id'], rows[12]['client_id'], rows[12]['sender_id'], rows[12]['seen']) == (ME, 2000, ME, 1)
+    assert (rows[11]['admin_id'], rows[11]['client_id'], rows[11]['sender_id'], rows[11]['seen']) == (ME, 2000, 2000, 0)
+    assert [row['kmong_message_id'] for row in db_message.read_unread_messages()] == [11]
+
+
+def test_first_ingest_keeps_only_latest_message_unread(manager):
+    manager.pages[1] = _page(
+        _message(23, 20, 3000, ME, "답변 부탁드려요"),
+        _message(22, 20, ME, 3000, "지난 답변"),
+        _message(21, 20, 3000, ME, "지난 문의"),
+    )
+
+    manager.check_unread_message(EMAIL, "pw", json.dumps({}))
+
+    rows = _rows(20)
+    assert (rows[21]['seen'], rows[21]['replied_telegram']) == (1, 1)
+    assert (rows[23]['seen'], rows[23]['replied_telegram']) == (0, 0)
+    assert [row['kmong_message_id'] for row in db_message.read_unread_messages()] == [23]
+
+
+def test_history_older_than_stored_message_is_not_forwarded(manager):
+    db_message.create_message(30, MessageDTO(admin_id=ME, text="이미 저장됨", client_id=4000, sender_id=4000,
+                                             kmong_message_id=32, seen=1))
+    manager.pages[1] = _page(
+        _message(33, 30, 4000, ME, "새 문의"),
+        _message(32, 30, 4000, ME, "이미 저장됨"),
+        _message(31, 30, 4000, ME, "업그레이드 전 기록"),
+    )
+
+    manager.check_unread_message(EMAIL, "pw", json.dumps({}))
+
+    rows = _rows(30)
+    assert (rows[31]['seen'], rows[31]['replied_telegram']) == (1, 1)
+    assert [row['kmong_message_id'] for row in db_message.read_unread_messages()] == [33]
+
+
+def test_account_user_id_is_inferred_from_messages_across_chatrooms(manager):
+    assert KmongManager._resolve_account_user_id("unknown@example.com", [
+        _message(2, 40, ME, 5000, "a"),
+        _message(1, 41, 6000, ME, "b"),
+    ]) == ME
@@ -0,0 +1,100 @@
+import pytest
+
+pytest.importorskip("requests")
+pytest.importorskip("psutil")
+
+from utils.kmong_manager import kmong_poller
+from utils.kmong_manager.kmong_poller import PollingSchedule, RequestPacer
+
+
+class LowestRandom:
+    """random.uniform 대신 항상 범위의 최솟값"""
+
+    @staticmethod
+    def uniform(low, high):
+        return low
+
+
+@pytest.fixture
+def fake_time(clock, monkeypatch):
+    monkeypatch.setattr(kmong_poller, "time", clock)
+    monkeypatch.setattr(kmong_poller, "random", LowestRandom)
+    return clock
+
+
+def test_pacer_spaces_requests_of_one_account(fake_time):
+    pacer = RequestPacer(account_delay=(2.0, 4.0), host_delay=(0.1, 0.3))
+
+    pacer.wait("a@example.com")
+    pacer.wait("a@example.com")
+    pacer.wait("a@example.com")
+
+    assert fake_time.sleeps == [2.0, 2.0]
+
+
+def test_pacer_only_spaces_other_accounts_by_host_delay(fake_time):
+    pacer = RequestPacer(account_delay=(2.0, 4.0), host_delay=(0.1, 0.3))
+
+    pacer.wait("a@example.com")
+    pacer.wait("b@example.com")
+
+    assert fake_time.sleeps == [pytest.approx(0.1)]
+
+
+def test_pacer_does_not_wait_after_idle_gap(fake_time):
+    pacer = RequestPacer(account_delay=(2.0, 4.0), host_delay=(0.1, 0.3))
+    pacer.wait("a@example.com")
+
+    fake_time.advance(10)
+    pacer.wait("a@example.com")
+
+    assert fake_time.sleeps == []
+
+
+def test_new_account_is_due_immediately(fake_time):
+    schedule = PollingSchedule(base_interval=30, floor=15, ceiling=600, backoff=2.0)
+
+    assert schedule.due_accounts(["a"]) == ["a"]
+
+
+def test_quiet_account_backs_off_up_to_ceiling(fake_time):
+    schedule = PollingSchedule(base_interval=30, floor=15, ceiling=200, backoff=2.0)
+    intervals = []
+    for _ in range(5):
+        schedule.record_poll("a", active=False)
+        intervals.append(schedule.snapshot()[0]['interval'])
+
+    assert intervals == [60, 120, 200, 200, 200]
+
+
+def test_activity_resets_to_floor(fake_time):
+    schedule = PollingSchedule(base_interval=30, floor=15, ceiling=600, backoff=2.0)
+    schedule.record_poll("a", active=False)
+    schedule.record_poll("a", active=False)
+
+    schedule.record_poll("a", active=True)
+
+    assert schedule.snapshot()[0]['interval'] == 15
+    fake_time.advance(14)
+    assert schedule.due_accounts(["a"]) == []
+    fake_time.advance(1)
+    assert schedule.due_accounts(["a"]) == ["a"]
+
+
+def test_mark_active_pulls_next_check_forward(fake_time):
+    schedule = PollingSchedule(base_interval=30, floor=15, ceiling=600, backoff=2.0)
+    for _ in range(4):
+        schedule.record_poll("a", active=False)
+
+    schedule.mark_active("a")
+
+    assert schedule.snapshot()[0]['next_check_in'] == 15
+
+
+def test_removed_accounts_are_forgotten(fake_time):
+    schedule = PollingSchedule()
+    schedule.record_poll("a", active=False)
+
+    schedule.due_accounts(["b"])
+
+    assert [state['email'] for state in schedule.snapshot()] == ["b"]
@@ -0,0 +1,100 @@
+from contextlib import contextmanager
+
+import pytest
+
+pytest.importorskip("selenium")
+
+from utils.kmong_manager import db_connection
+from utils.kmong_manager import db_message
+from utils.kmong_manager import db_outbox
+from utils.selenium_manager.outbox_worker import OutboxWorker
+
+CHATROOM_ID = 100
+ADMIN_ID = 1
+CLIENT_ID = 2
+
+
+class FakeSelenium:
+    def __init__(self):
+        self.sent = []
+
+    def getClientChatRoom(self, chatroom_id, client_id):
+        pass
+
+    def send_message(self, message):
+        self.sent.append(message)
+
+
+class FakeBrowserPool:
+    def __init__(self):
+        self.selenium = FakeSelenium()
+
+    @contextmanager
+    def session(self, email, password):
+        yield self.selenium
+
+
+@pytest.fixture
+def worker(db, monkeypatch):
+    db_outbox.create_outbox_table()
+    worker = OutboxWorker.__new__(OutboxWorker)
+    worker.browser_pool = FakeBrowserPool()
+    monkeypatch.setattr(OutboxWorker, "_find_account", staticmethod(lambda admin_id: {'email': "a", 'password': "b"}))
+    return worker
+
+
+def _make_due(job_id):
+    with db_connection.transaction() as conn:
+        conn.execute("UPDATE outbox SET next_attempt_at = 0 WHERE job_id = ?", (job_id,))
+
+
+def test_store_failure_retries_only_the_local_save(worker, monkeypatch):
+    job_id = db_outbox.enqueue_message(CHATROOM_ID, ADMIN_ID, CLIENT_ID, "안녕하세요")
+    create_message = db_message.create_message
+
+    def broken_create_message(*args, **kwargs):
+        raise RuntimeError("database is locked")
+
+    monkeypatch.setattr(db_message, "create_message", broken_create_message)
+    worker._process(db_outbox.claim_next_job("w1"))
+
+    job = db_outbox.read_job(job_id)
+    assert (job['status'], job['stored']) == (db_outbox.STATUS_SENT, 0)
+    assert db_message.read_all_messages(CHATROOM_ID) == []
+
+    monkeypatch.setattr(db_message, "create_message", create_message)
+    _make_due(job_id)
+    retry = db_outbox.claim_next_job("w2")
+    assert retry['job_id'] == job_id and retry['status'] == db_outbox.STATUS_SENT
+    worker._process(retry)
+
+    assert worker.browser_pool.selenium.sent == ["안녕하세요"]
+    assert [row['text'] for row in db_message.read_all_messages(CHATROOM_ID)] == ["안녕하세요"]
+    assert db_outbox.read_job(job_id)['stored'] == 1
+    assert db_outbox.claim_next_job("w3") is None
+
+
+def test_later_job_waits_until_earlier_reply_is_stored(worker):
+    first = db_outbox.enqueue_message(CHATROOM_ID, ADMIN_ID, CLIENT_ID, "첫 번째")
+    second = db_outbox.enqueue_message(CHATROOM_ID, ADMIN_ID, CLIENT_ID, "두 번째")
+    db_outbox.claim_next_job("w1")
+    db_outbox.mark_sent(first, CHATROOM_ID)
+    db_outbox.mark_store_retry(first, "database is locked", 0)
+
+    assert db_outbox.claim_next_job("w2")['job_id'] == first
+    assert db_outbox.claim_next_job("w3") is None
+
+    with db_connection.transaction():
+        db_outbox.mark_stored(first)
+    assert db_outbox.claim_next_job("w3")['job_id'] == second
+
+
+def test_successful_send_is_stored_once(worker):
+    job_id = db_outbox.enqueue_message(CHATROOM_ID, ADMIN_ID, CLIENT_ID, "네 가능합니다")
+
+    worker._process(db_outbox.claim_next_job("w1"))
+
+    job = db_outbox.read_job(job_id)
+    assert (job['status'], job['stored']) == (db_outbox.STATUS_SENT, 1)
+    rows = db_message.read_all_messages(CHATROOM_ID)
+    assert [(row['sender_id'], row['seen'], row['replied_kmong']) for row in rows] == [(ADMIN_ID, 0, 1)]
@@ -0,0 +1,41 @@
+import json
+
+import pytest
+
+from static.js.service.settings_service import SettingsService
+
+
+@pytest.fixture
+def settings_service(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    return SettingsService()
+
+
+def test_webhook_requires_https(settings_service):
+    ok, _ = settings_service.update_telegram_webhook(True, "http://example.com/api/telegram/webhook")
+
+    assert not ok
+    assert settings_service.get_settings()['telegram']['webhook']['enabled'] is False
+
+
+def test_webhook_accepts_https(settings_service, tmp_path):
+    ok, _ = settings_service.update_telegram_webhook(True, "https://example.com/api/telegram/webhook", "s3cret")
+
+    assert ok
+    saved = json.loads((tmp_path / "settings.json").read_text(encoding="utf-8"))
+    assert saved['telegram']['webhook'] == {'enabled': True, 'url': "https://example.com/api/telegram/webhook",
+                                            'secret': "s3cret"}
+
+
+def test_webhook_allows_http_only_with_fake_bot_api(settings_service):
+    settings_service.get_settings()['telegram']['apiBaseUrl'] = "http://127.0.0.1:8081"
+
+    ok, _ = settings_service.update_telegram_webhook(True, "http://127.0.0.1:5000/api/telegram/webhook")
+
+    assert ok
+
+
+def test_disabling_webhook_does_not_need_url(settings_service):
+    ok, _ = settings_service.update_telegram_webhook(False, "")
+
+    assert ok
@@ -0,0 +1,94 @@
+import json
+import threading
+import time
+
+import pytest
+
+from utils.event_bus import event_bus
+from utils.event_bus.events import MessageSeen, MessageStored
+from static.js.service import stream_service
+from static.js.service.stream_service import StreamService
+
+
+@pytest.fixture
+def service(db, bus, monkeypatch):
+    monkeypatch.setattr(StreamService, "SUMMARY_COALESCE_SECONDS", 0.05)
+    return StreamService(history_size=5)
+
+
+def _frames(generator, count):
+    return [next(generator) for _ in range(count)]
+
+
+def _event_ids(frames):
+    return [int(frame.split("\n")[0][len("id: "):]) for frame in frames]
+
+
+def test_new_client_starts_at_current_cursor(service):
+    service._push('outbox', {'job_id': 1})
+
+    frame = next(service.stream())
+
+    assert frame == f"id: {service._last_id}\nretry: 3000\n\n"
+
+
+def test_resume_replays_events_after_last_event_id(service):
+    service._push('outbox', {'job_id': 1})
+    resume_from = service._last_id
+    service._push('outbox', {'job_id': 2})
+    service._push('outbox', {'job_id': 3})
+
+    frames = _frames(service.stream(last_event_id=resume_from), 2)
+
+    assert _event_ids(frames) == [resume_from + 1, resume_from + 2]
+    assert [json.loads(frame.split("data: ")[1])['job_id'] for frame in frames] == [2, 3]
+
+
+def test_resume_older_than_history_resets(service):
+    resume_from = service._last_id
+    for job_id in range(7):
+        service._push('outbox', {'job_id': job_id})
+
+    frame = next(service.stream(last_event_id=resume_from))
+
+    assert "event: reset" in frame
+
+
+def test_resume_from_other_process_resets(service):
+    frame = next(service.stream(last_event_id=service._last_id + 1000))
+
+    assert "event: reset" in frame
+
+
+def test_live_stream_delivers_pushed_events(service):
+    generator = service.stream()
+    next(generator)
+    threading.Timer(0.05, service._push, args=('outbox', {'job_id': 9})).start()
+
+    frame = next(generator)
+
+    assert "event: outbox" in frame and '"job_id": 9' in frame
+
+
+def test_summaries_are_coalesced_off_publisher_thread(service, monkeypatch):
+    calls = []
+    monkeypatch.setattr(service.message_service, "get_chatroom_summary",
+                        lambda chatroom_id: calls.append((chatroom_id, threading.current_thread().name))
+                        or {'chatroom_id': chatroom_id})
+    monkeypatch.setattr(stream_service.db_message, "read_message_by_id",
+                        lambda chatroom_id, idx: {'chatroom_id': chatroom_id, 'idx': idx})
+
+    for idx in range(20):
+        event_bus.publish(MessageStored(chatroom_id=1 + idx % 2, message_idx=idx))
+    event_bus.publish(MessageSeen(chatroom_id=1))
+    assert calls == []
+
+    deadline = time.monotonic() + 2
+    while len(calls) < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    time.sleep(0.1)
+
+    assert sorted(chatroom_id for chatroom_id, _ in calls) == [1, 2]
+    assert {thread_name for _, thread_name in calls} == {"stream-summaries"}
+    events = [name for _, name, _ in service._history]
+    assert events.count('chatroom') == 2
@@ -0,0 +1,136 @@
+import pytest
+
+from utils.kmong_manager import db_connection
+from utils.kmong_manager import db_telegram
+from utils.telegram_manager import telegram_sender
+from utils.telegram_manager.telegram_sender import TelegramSender, TokenBucket
+
+
+class ApiError(Exception):
+    """telebot ApiTelegramException과 같은 속성만 가진 오류"""
+
+    def __init__(self, error_code, result_json=None):
+        super().__init__(f"Error code: {error_code}")
+        self.error_code = error_code
+        self.result_json = result_json
+
+
+@pytest.fixture
+def sender(db, clock, bus, monkeypatch):
+    monkeypatch.setattr(telegram_sender, "time", clock)
+    monkeypatch.setattr(db_telegram, "time", clock)
+    return TelegramSender()
+
+
+def _enqueue(chat_id="100", text="새 메시지"):
+    return db_telegram.enqueue_telegram_messages([{'chat_id': chat_id, 'text': text}])[0]
+
+
+def _read_job(job_id):
+    with db_connection.connect() as conn:
+        row = conn.execute("SELECT status, attempts, next_attempt_at FROM telegram_send_queue WHERE job_id = ?",
+                           (job_id,)).fetchone()
+    return row
+
+
+def test_bucket_allows_burst_then_spaces_requests(clock, monkeypatch):
+    monkeypatch.setattr(telegram_sender, "time", clock)
+    bucket = TokenBucket(rate=2, capacity=2)
+
+    assert [bucket.reserve() for _ in range(4)] == [0.0, 0.0, 0.5, 1.0]
+
+    clock.advance(1.0)
+    assert bucket.reserve() == pytest.approx(0.5)
+
+
+def test_bucket_refills_up_to_capacity(clock, monkeypatch):
+    monkeypatch.setattr(telegram_sender, "time", clock)
+    bucket = TokenBucket(rate=1, capacity=2)
+    bucket.reserve()
+    bucket.reserve()
+
+    clock.advance(60)
+
+    assert [bucket.reserve() for _ in range(3)] == [0.0, 0.0, 1.0]
+
+
+def test_pause_blocks_until_retry_after(clock, monkeypatch):
+    monkeypatch.setattr(telegram_sender, "time", clock)
+    bucket = TokenBucket(rate=30, capacity=30)
+
+    bucket.pause(7)
+
+    assert bucket.reserve() == pytest.approx(7)
+    clock.advance(7)
+    assert bucket.reserve() == 0.0
+
+
+def test_429_pauses_chat_and_retries_without_counting_attempt(sender, clock):
+    job_id = _enqueue()
+    job = db_telegram.claim_next_telegram_job()
+    chat_bucket = sender._chat_bucket(job['chat_id'])
+
+    sender._on_error(job, chat_bucket, ApiError(429, {'parameters': {'retry_after': 7}}))
+
+    status, attempts, next_attempt_at = _read_job(job_id)
+    assert (status, attempts, next_attempt_at) == ('queued', 0, clock.now + 7)
+    assert chat_bucket.reserve() == pytest.approx(7)
+    assert sender._global_bucket.reserve() == pytest.approx(7)
+
+
+def test_429_without_retry_after_waits_one_second(sender, clock):
+    job_id = _enqueue()
+    job = db_telegram.claim_next_telegram_job()
+
+    sender._on_error(job, sender._chat_bucket(job['chat_id']), ApiError(429, {'description': "Too Many Requests"}))
+
+    assert _read_job(job_id)[2] == clock.now + 1
+
+
+def test_repeated_429_never_fails_the_job(sender, clock):
+    job_id = _enqueue()
+    for _ in range(TelegramSender.MAX_ATTEMPTS + 2):
+        job = db_telegram.claim_next_telegram_job()
+        sender._on_error(job, sender._chat_bucket(job['chat_id']), ApiError(429, {'parameters': {'retry_after': 1}}))
+        clock.advance(1)
+
+    assert _read_job(job_id)[:2] == ('queued', 0)
+
+
+def test_other_errors_back_off_then_fail(sender, clock):
+    job_id = _enqueue()
+    delays = []
+    for _ in range(TelegramSender.MAX_ATTEMPTS):
+        job = db_telegram.claim_next_telegram_job()
+        sender._on_error(job, sender._chat_bucket(job['chat_id']), ApiError(400))
+        status, _, next_attempt_at = _read_job(job_id)
+        if status == 'queued':
+            delays.append(next_attempt_at - clock.now)
+            clock.advance(next_attempt_at - clock.now)
+
+    base = TelegramSender.RETRY_BASE_SECONDS
+    assert delays == [base * 2 ** n for n in range(TelegramSender.MAX_ATTEMPTS - 1)]
+    assert _read_job(job_id)[0] == 'failed'
+
+
+def test_process_waits_for_private_chat_rate(sender, clock, monkeypatch):
+    sent = []
+    monkeypatch.setattr(TelegramSender, "_send", staticmethod(lambda job: sent.append(job['job_id']) or len(sent)))
+    first, second = _enqueue(), _enqueue()
+
+    sender._process(db_telegram.claim_next_telegram_job())
+    sender._process(db_telegram.claim_next_telegram_job())
+
+    assert sent == [first, second]
+    assert clock.sleeps == [pytest.approx(1 / TelegramSender.PRIVATE_CHAT_RATE)]
+    assert _read_job(second)[0] == 'sent'
+
+
+def test_group_chat_jobs_keep_order(sender):
+    first = _enqueue(chat_id="-100")
+    _enqueue(chat_id="-100")
+
+    job = db_telegram.claim_next_telegram_job()
+
+    assert job['job_id'] == first
+    assert db_telegram.claim_next_telegram_job() is None
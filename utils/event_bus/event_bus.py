@@ -0,0 +1,63 @@
+import logging
+import threading
+import traceback
+from collections import defaultdict
+
+from utils.event_bus.events import Event
+
+# 로깅 설정
+logger = logging.getLogger(__name__)
+
+
+class EventBus:
+    """
+    프로세스 내부 발행/구독 버스.
+    저장소/매니저 계층이 이벤트를 발행하면 구독자(UI 푸시, 텔레그램 전달, 캐시 등)가 같은 프로세스 안에서 바로 받는다.
+    핸들러는 발행한 스레드에서 동기적으로 호출되므로 오래 걸리는 작업은 핸들러 안에서 따로 넘겨야 한다.
+    """
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    @classmethod
+    def get_instance(cls):
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls()
+        return cls._instance
+
+    def __init__(self):
+        self._handlers = defaultdict(list)
+        self._lock = threading.Lock()
+
+    def subscribe(self, event_type, handler):
+        """event_type(및 하위 타입) 이벤트 구독. 구독 해제 함수를 반환한다."""
+        with self._lock:
+            self._handlers[event_type].append(handler)
+        return lambda: self.unsubscribe(event_type, handler)
+
+    def unsubscribe(self, event_type, handler):
+        with self._lock:
+            if handler in self._handlers.get(event_type, []):
+                self._handlers[event_type].remove(handler)
+
+    def publish(self, event: Event):
+        """구독자에게 이벤트 전달. 한 구독자의 오류가 다른 구독자나 발행자에게 전파되지 않는다."""
+        with self._lock:
+            handlers = []
+            for event_type in type(event).__mro__:
+                handlers.extend(self._handlers.get(event_type, []))
+
+        for handler in handlers:
+            try:
+                handler(event)
+            except Exception as e:
+                logger.error(f"event_bus, publish // ⛔ {type(event).__name__} 처리 중 오류: {str(e)}")
+                traceback.print_exc()
+
+
+def subscribe(event_type, handler):
+    return EventBus.get_instance().subscribe(event_type, handler)
+
+
+def publish(event: Event):
+    EventBus.get_instance().publish(event)
@@ -0,0 +1,52 @@
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import List
+
+
+@dataclass
+class Event:
+    """모든 이벤트의 기본 클래스 (Event를 구독하면 모든 이벤트를 받음)"""
+    created_at: datetime = field(default_factory=datetime.now, init=False)
+
+
+@dataclass
+class MessageStored(Event):
+    """메시지가 DB에 저장됨"""
+    chatroom_id: int = 0
+    message_idx: int = 0
+    admin_id: int = 0
+    client_id: int = 0
+    sender_id: int = 0
+    text: str = ""
+
+
+@dataclass
+class MessageSeen(Event):
+    """채팅방의 안읽은 메시지가 읽음 처리됨"""
+    chatroom_id: int = 0
+
+
+@dataclass
+class TelegramForwarded(Event):
+    """메시지가 텔레그램으로 전달됨"""
+    chatroom_id: int = 0
+    message_idxs: List[int] = field(default_factory=list)
+
+
+@dataclass
+class ReplySent(Event):
+    """크몽으로 답장이 전송됨 (channel: 'web' 또는 'telegram')"""
+    chatroom_id: int = 0
+    admin_id: int = 0
+    client_id: int = 0
+    text: str = ""
+    channel: str = "web"
+
+
+@dataclass
+class OutboxJobUpdated(Event):
+    """크몽 웹 전송 작업(outbox)의 상태가 바뀜 (queued/sending/sent/failed)"""
+    job_id: int = 0
+    chatroom_id: int = 0
+    status: str = ""
+    error: str = ""
@@ -0,0 +1,71 @@
+import hashlib
+import logging
+
+import numpy as np
+
+# 로깅 설정
+logger = logging.getLogger(__name__)
+
+
+class HashingEmbedder:
+    """
+    문자 n-gram을 해시해 고정 크기 벡터로 만드는 임베더. (네트워크/모델 없이 항상 같은 결과)
+    띄어쓰기가 불규칙한 한국어 문의도 비슷한 글자 조합이면 가깝게 나온다.
+    """
+
+    def __init__(self, dim=512, ngram_range=(2, 3)):
+        self.dim = dim
+        self.ngram_range = ngram_range
+        self.name = f"hashing-{dim}-{ngram_range[0]}{ngram_range[1]}"
+
+    def _ngrams(self, text):
+        text = " ".join(text.lower().split())
+        for n in range(self.ngram_range[0], self.ngram_range[1] + 1):
+            for start in range(max(len(text) - n + 1, 1)):
+                yield text[start:start + n]
+
+    def embed(self, texts):
+        """ :return: (len(texts), dim) float32, 행마다 L2 정규화 """
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for gram in self._ngrams(text or ""):
+                digest = hashlib.blake2b(gram.encode("utf-8"), digest_size=8).digest()
+                value = int.from_bytes(digest, "little")
+                # 하위 비트로 위치, 최상위 비트로 부호 (해시 충돌이 서로 상쇄되도록)
+                vectors[row, value % self.dim] += 1.0 if value >> 63 else -1.0
+        return _normalize(vectors)
+
+
+class OpenAIEmbedder:
+    """OpenAI 임베딩 API 사용 (GPTManager의 OpenAI 클라이언트 공유)"""
+
+    BATCH_SIZE = 256
+
+    def __init__(self, client, model="text-embedding-3-small"):
+        self.client = client
+        self.model = model
+        self.name = f"openai-{model}"
+
+    def embed(self, texts):
+        vectors = []
+        for start in range(0, len(texts), self.BATCH_SIZE):
+            batch = [text or " " for text in texts[start:start + self.BATCH_SIZE]]
+            response = self.client.embeddings.create(model=self.model, input=batch)
+            vectors.extend(item.embedding for item in response.data)
+        return _normalize(np.asarray(vectors, dtype=np.float32))
+
+
+def _normalize(vectors):
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def create_embedder(gpt_settings, client=None):
+    """ settings.json 'gpt' 항목에 맞는 임베더 (openai 클라이언트가 없으면 hashing) """
+    kind = gpt_settings.get('embedder', 'openai')
+    if kind == 'openai' and client is not None:
+        return OpenAIEmbedder(client, gpt_settings.get('embeddingModel') or "text-embedding-3-small")
+    if kind != 'hashing':
+        logger.warning(f"embedder, create_embedder // ⚠️ '{kind}' 임베더를 사용할 수 없어 hashing 임베더를 사용합니다.")
+    return HashingEmbedder()
@@ -1,8 +1,11 @@
 from openai import OpenAI
 from datetime import datetime
 from dotenv import load_dotenv
-from utils.kmong_manager.db_message import read_all_chatroom_tables, read_all_messages
-from collections import defaultdict
+from utils.kmong_manager.db_message import read_all_messages
+from utils.gpt_manager.qna_index import QnaIndex
+from utils.gpt_manager.vector_index import QnaVectorIndex
+from utils.gpt_manager.embedder import create_embedder
+from static.js.service.settings_service import SettingsService
 import os
 
 # 환경 변수 로드
@@ -18,35 +21,15 @@ class GPTManager:
             raise ValueError("OpenAI API 키가 설정되지 않았습니다.")
 
         self.client = OpenAI(api_key=openai_api_key)
+        self.qna_index = QnaIndex.get_instance()
+
+        # 비슷한 과거 문의 검색 (settings.json 'gpt')
+        gpt_settings = SettingsService().get_settings().get('gpt', {})
+        self.similar_examples = int(gpt_settings.get('similarExamples', 3))
+        self.vector_index = QnaVectorIndex(self.qna_index, create_embedder(gpt_settings, self.client))
     
     def fetch_predefined_qna(self, table_id: int):
-        """이전 대화를 학습하고, 현재 대화 내용을 바탕으로 AI가 추천 답변을 생성"""
-        predefined_qna = defaultdict(list)
-        chatroom_tables = read_all_chatroom_tables()
-
-        for table_name in chatroom_tables:
-            table_id = int(table_name.replace("chatroom_", ""))
-            messages = read_all_messages(table_id)
-            
-            conversation_history = []
-            prev_sender = None
-            
-            for message in messages:
-                client_id = message["client_id"]
-                sender_id = message["sender_id"]
-                text = message["text"]
-                
-                is_client = client_id == sender_id
-                role = "client" if is_client else "me"
-                
-                if prev_sender == sender_id:
-                    conversation_history[-1].append(text)
-                else:
-                    conversation_history.append([text])
-                
-                predefined_qna[role].append(text)
-                prev_sender = sender_id
-        
+        """현재 채팅방 대화 내용과, 마지막 고객 문의와 비슷한 다른 채팅방의 과거 질문/답변 쌍을 반환"""
         # 현재 채팅방 데이터 가져오기
         current_messages = read_all_messages(table_id)
         current_conversation = []
@@ -62,11 +45,30 @@ class GPTManager:
                 "content": text  # 기존 text -> content 변경
             })
         
+        # 전체 기록 대신 비슷한 문의 몇 개만 (프롬프트 크기 유지)
+        predefined_qna = []
+        query = self._latest_client_text(current_messages)
+        try:
+            predefined_qna = self.vector_index.search(query, k=self.similar_examples, exclude_chatroom_id=int(table_id))
+        except Exception as e:
+            print(f"Error searching similar exchanges: {e}")
+        
         return {
             "training_data": predefined_qna,
             "current_conversation": current_conversation
         }
     
+    @staticmethod
+    def _latest_client_text(messages) -> str:
+        """마지막으로 이어진 고객 메시지들 (답변할 문의)"""
+        texts = []
+        for message in sorted(messages, key=lambda m: m["idx"], reverse=True):
+            if message["client_id"] == message["sender_id"]:
+                texts.append(message["text"] or "")
+            elif texts:
+                break
+        return "\n".join(reversed(texts))
+    
     def get_answer_from_gpt(self, prompt: str) -> str:
         """GPT를 사용하여 답변 생성"""
         try:
@@ -88,8 +90,15 @@ class GPTManager:
         
         return "\n".join([f"{msg.get('role', 'unknown')}: {msg.get('content', '내용 없음')}" for msg in conversation])
     
-    def generate_response(self, conversation: list, response_type: str) -> str:
-        """대화 유형에 따라 적절한 응답을 생성"""
+    def format_examples(self, examples: list) -> str:
+        """비슷한 과거 문의와 내 답변을 프롬프트용 문자열로 변환 (길면 잘라서)"""
+        return "\n".join(
+            f"[{number}] client: {example['question'][:300]}\n    me: {example['answer'][:300]}"
+            for number, example in enumerate(examples, start=1)
+        )
+    
+    def generate_response(self, conversation: list, response_type: str, examples: list = None) -> str:
+        """대화 유형에 따라 적절한 응답을 생성 (examples: 비슷한 과거 문의/답변, 말투와 내용 참고용)"""
         prompt_templates = {
             "positive_basic": "기본적인 긍정 답변: '예, 가능합니다.'",
             "positive_detailed": "상세한 긍정 답변: '예, 가능합니다. 이렇게 진행하면 해결됩니다.'",
@@ -101,8 +110,16 @@ class GPTManager:
         if response_type not in prompt_templates:
             raise ValueError(f"잘못된 response_type: {response_type}")
 
+        examples_prompt = ""
+        if examples:
+            examples_prompt = f"""
+        비슷한 문의에 내가 했던 답변 (말투와 내용 참고):
+        {self.format_examples(examples)}
+        """
+
         full_prompt = f"""
         대화 내용: {self.format_conversation(conversation)}
+        {examples_prompt}
         대답 시 고려할 사항:
         {prompt_templates[response_type]}
         """
@@ -0,0 +1,81 @@
+import logging
+import threading
+
+from utils.kmong_manager import db_qna
+from utils.event_bus import event_bus
+from utils.event_bus.events import MessageStored
+
+# 로깅 설정
+logger = logging.getLogger(__name__)
+
+
+class QnaIndex:
+    """
+    GPT 추천 답변에 쓰는 (고객 질문 → 내 답변) 쌍 색인.
+
+    - 쌍은 qna_pairs 테이블에 저장되고, 처음 사용할 때 한 번 읽어 메모리에 둔다.
+    - MessageStored 이벤트가 오면 dirty 표시만 하고, 다음 조회 때 새 메시지만 추출해 바뀐 채팅방의 쌍만 다시 읽는다.
+    - 대화기록 동기화처럼 이벤트 없이 저장된 메시지는 watermark와 최신 idx를 비교해 찾는다.
+    """
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    @classmethod
+    def get_instance(cls):
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls()
+        return cls._instance
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pairs_by_room = None  # chatroom_id → [pair, ...] (처음 조회 전에는 None)
+        self._dirty = True
+        self.version = 0  # 쌍이 바뀔 때마다 증가 (QnaVectorIndex가 다시 만들지 판단)
+        event_bus.subscribe(MessageStored, self._on_message_stored)
+
+    def _on_message_stored(self, event: MessageStored):
+        self._dirty = True
+
+    def refresh(self):
+        """새 메시지를 반영. 바뀐 chatroom_id 집합을 반환"""
+        with self._lock:
+            return self._refresh()
+
+    def _refresh(self):
+        if self._pairs_by_room is None:
+            db_qna.create_qna_tables()
+            changed = db_qna.index_new_messages()
+            self._pairs_by_room = {}
+            for pair in db_qna.read_qna_pairs():
+                self._pairs_by_room.setdefault(pair['chatroom_id'], []).append(pair)
+            self._dirty = False
+            self.version += 1
+            logger.info(f"qna_index, _refresh // ✅ 질문/답변 {sum(len(p) for p in self._pairs_by_room.values())}쌍 로드")
+            return changed
+
+        if not self._dirty and not db_qna.has_unindexed_messages():
+            return set()
+
+        # 다른 스레드가 그 사이 새 메시지를 저장하면 다시 dirty가 되도록 먼저 내림
+        self._dirty = False
+        changed = db_qna.index_new_messages()
+        if changed:
+            self.version += 1
+            for chatroom_id in changed:
+                self._pairs_by_room.pop(chatroom_id, None)
+            for pair in db_qna.read_qna_pairs(changed):
+                self._pairs_by_room.setdefault(pair['chatroom_id'], []).append(pair)
+        return changed
+
+    def pairs(self, exclude_chatroom_id=None):
+        """
+        모든 질문/답변 쌍 (exclude_chatroom_id 채팅방 제외)
+        :return: [{pair_id, chatroom_id, question, answer, question_idx, answer_idx}, ...]
+        """
+        with self._lock:
+            self._refresh()
+            return [pair
+                    for chatroom_id, room_pairs in self._pairs_by_room.items()
+                    if chatroom_id != exclude_chatroom_id
+                    for pair in room_pairs]
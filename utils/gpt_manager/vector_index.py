@@ -0,0 +1,91 @@
+import logging
+import threading
+
+import numpy as np
+
+from utils.kmong_manager import db_qna
+
+# 로깅 설정
+logger = logging.getLogger(__name__)
+
+
+class QnaVectorIndex:
+    """
+    질문/답변 쌍(QnaIndex)의 질문 임베딩으로 만든 코사인 유사도 색인.
+
+    - 임베딩은 정규화된 float32 행렬 하나로 들고 있어 검색은 행렬-벡터 곱 한 번이다.
+    - 새 쌍만 임베딩하고, 결과는 qna_embeddings에 저장해 재시작 후에도 다시 계산하지 않는다.
+    """
+
+    def __init__(self, qna_index, embedder):
+        self.qna_index = qna_index
+        self.embedder = embedder
+        self._lock = threading.Lock()
+        self._vectors = {}  # pair_id → 임베딩
+        self._pairs = []
+        self._matrix = None
+        self._chatroom_ids = None
+        self._version = None  # 행렬을 만들 때의 QnaIndex.version
+
+    def _sync(self):
+        self.qna_index.refresh()
+        if self._version == self.qna_index.version:
+            return
+
+        version = self.qna_index.version
+        pairs = self.qna_index.pairs()
+        missing = [pair['pair_id'] for pair in pairs if pair['pair_id'] not in self._vectors]
+        if missing:
+            stored = db_qna.read_qna_embeddings(self.embedder.name, missing)
+            for pair_id, vector in stored.items():
+                self._vectors[pair_id] = np.frombuffer(vector, dtype=np.float32)
+
+            to_embed = [pair for pair in pairs if pair['pair_id'] not in self._vectors]
+            if to_embed:
+                embedded = self.embedder.embed([pair['question'] for pair in to_embed])
+                for pair, vector in zip(to_embed, embedded):
+                    self._vectors[pair['pair_id']] = vector
+                db_qna.save_qna_embeddings(self.embedder.name,
+                                           [(pair['pair_id'], vector.tobytes()) for pair, vector in zip(to_embed, embedded)])
+                logger.info(f"vector_index, _sync // ✅ 질문 {len(to_embed)}개 임베딩 ({self.embedder.name})")
+
+        # 초기화로 사라진 쌍 정리
+        live_ids = {pair['pair_id'] for pair in pairs}
+        for pair_id in [pair_id for pair_id in self._vectors if pair_id not in live_ids]:
+            del self._vectors[pair_id]
+
+        self._pairs = pairs
+        self._version = version
+        self._chatroom_ids = np.array([pair['chatroom_id'] for pair in pairs], dtype=np.int64)
+        self._matrix = (np.vstack([self._vectors[pair['pair_id']] for pair in pairs])
+                        if pairs else np.zeros((0, 0), dtype=np.float32))
+
+    def search(self, text, k=3, exclude_chatroom_id=None, min_score=0.2):
+        """
+        text와 질문이 가장 비슷한 쌍 k개 (유사도 높은 순)
+        :return: [{question, answer, chatroom_id, score}, ...]
+        """
+        if not text or not text.strip() or k <= 0:
+            return []
+
+        with self._lock:
+            self._sync()
+            if not self._pairs:
+                return []
+            query = self.embedder.embed([text])[0]
+            scores = self._matrix @ query
+            if exclude_chatroom_id is not None:
+                scores = np.where(self._chatroom_ids == int(exclude_chatroom_id), -np.inf, scores)
+
+            k = min(k, len(scores))
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+            return [
+                {
+                    'question': self._pairs[i]['question'],
+                    'answer': self._pairs[i]['answer'],
+                    'chatroom_id': self._pairs[i]['chatroom_id'],
+                    'score': float(scores[i])
+                }
+                for i in top if scores[i] >= min_score
+            ]
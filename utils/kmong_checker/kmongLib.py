@@ -36,7 +36,8 @@ class KmongMessage:
 
         data = {"email": userid, "password": passwd, "remember": True, "next_page": "/", "is_dormant": 0}
 
-        res = networkLib.retry_req_json(url, header, [], data)
+        networkLib.reset_session(userid)
+        res = networkLib.retry_req_json(url, header, [], data, session_key=userid)
         json_data = json.loads(res.text)
 
         meta = json_data.get('meta', {})
@@ -78,7 +79,7 @@ class KmongMessage:
         url = f"https://kmong.com/api/v5/user/messages?page=1"
         #commonLib.print_log(LOGLEVEL.D, f"get_unread_message: url = {url}")
 
-        res = networkLib.retry_req_get(url, header, cookies)
+        res = networkLib.retry_req_get(url, header, cookies, session_key=userid)
         json_data = json.loads(res.text)
 
         message_count = json_data.get('total', -1)
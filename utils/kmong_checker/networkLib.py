@@ -5,74 +5,103 @@ import time
 import platform
 import traceback
 import json
+import threading
 import requests
 from requests.adapters import HTTPAdapter
+from requests.cookies import RequestsCookieJar
 from urllib3.util import Retry
 
 
-def retry_req_get(url, header, cookie, proxy_server=None):
+GET_RETRIES = 3
+POST_RETRIES = 5
+BACKOFF_FACTOR = 0.3
+STATUS_FORCELIST = (500, 502, 504)
+POOL_MAXSIZE = 10
+
+# 계정(session_key)별로 재사용되는 Session. 같은 계정의 GET/POST는 쿠키 저장소를 공유한다.
+_sessions = {}
+_cookie_jars = {}
+_sessions_lock = threading.Lock()
+
+
+def _create_session(retries, cookie_jar):
+    s = requests.Session()
+    retry = Retry(total=retries, read=retries, connect=retries, backoff_factor=BACKOFF_FACTOR,
+                  status_forcelist=STATUS_FORCELIST)
+
+    adapter = HTTPAdapter(max_retries=retry, pool_connections=1, pool_maxsize=POOL_MAXSIZE)
+    s.mount('http://', adapter)
+    s.mount('https://', adapter)
+    s.cookies = cookie_jar
+    return s
+
+
+def get_session(session_key=None, retries=GET_RETRIES):
+    """
+    session_key(보통 계정 이메일)별로 keep-alive 연결과 쿠키를 유지하는 Session 반환.
+    session_key가 없으면 공용 Session을 사용한다.
+    """
+    key = (session_key, retries)
+    with _sessions_lock:
+        s = _sessions.get(key)
+        if s is None:
+            cookie_jar = _cookie_jars.setdefault(session_key, RequestsCookieJar())
+            s = _create_session(retries, cookie_jar)
+            _sessions[key] = s
+    return s
+
+
+def reset_session(session_key):
+    """계정의 Session과 쿠키를 버린다. (재로그인 전, 계정 삭제 시)"""
+    with _sessions_lock:
+        sessions = [_sessions.pop(key) for key in list(_sessions) if key[0] == session_key]
+        _cookie_jars.pop(session_key, None)
+    for s in sessions:
+        s.close()
+
+
+def close_all_sessions():
+    with _sessions_lock:
+        sessions = list(_sessions.values())
+        _sessions.clear()
+        _cookie_jars.clear()
+    for s in sessions:
+        s.close()
+
+
+def retry_req_get(url, header, cookie, proxy_server=None, session_key=None):
     res = False
 
-    with requests.Session() as s:
-        try:
-            retries = 3
-            backoff_factor = 0.3
-            status_forcelist = (500, 502, 504)
-
-            retry = Retry(total=retries, read=retries, connect=retries, backoff_factor=backoff_factor,
-                          status_forcelist=status_forcelist)
-
-            adapter = HTTPAdapter(max_retries=retry)
-            s.mount('http://', adapter)
-            s.mount('https://', adapter)
-            res = s.get(url, headers=header, cookies=cookie, proxies=proxy_server)
-        except:
-            traceback.print_exc()
+    try:
+        s = get_session(session_key, GET_RETRIES)
+        res = s.get(url, headers=header, cookies=cookie, proxies=proxy_server)
+    except:
+        traceback.print_exc()
 
     return res
 
 
-def retry_req_post(url, header, cookie, data, proxy_server=None):
+def retry_req_post(url, header, cookie, data, proxy_server=None, session_key=None):
     res = False
 
-    with requests.Session() as s:
-        try:
-            retries = 5
-            backoff_factor = 0.3
-            status_forcelist = (500, 502, 504)
-
-            retry = Retry(total=retries, read=retries, connect=retries, backoff_factor=backoff_factor,
-                          status_forcelist=status_forcelist)
-
-            adapter = HTTPAdapter(max_retries=retry)
-            s.mount('http://', adapter)
-            s.mount('https://', adapter)
-            res = s.post(url, data, headers=header, cookies=cookie, proxies=proxy_server)
-        except:
-            traceback.print_exc()
+    try:
+        s = get_session(session_key, POST_RETRIES)
+        res = s.post(url, data, headers=header, cookies=cookie, proxies=proxy_server)
+    except:
+        traceback.print_exc()
 
     return res
 
 
-def retry_req_json(url, header, cookie, data, proxy_server=None):
+def retry_req_json(url, header, cookie, data, proxy_server=None, session_key=None):
     res = False
 
     header['content-type'] = 'application/json'
 
-    with requests.Session() as s:
-        try:
-            retries = 5
-            backoff_factor = 0.3
-            status_forcelist = (500, 502, 504)
-
-            retry = Retry(total=retries, read=retries, connect=retries, backoff_factor=backoff_factor,
-                          status_forcelist=status_forcelist)
-
-            adapter = HTTPAdapter(max_retries=retry)
-            s.mount('http://', adapter)
-            s.mount('https://', adapter)
-            res = s.post(url, data=json.dumps(data), headers=header, cookies=cookie, proxies=proxy_server)
-        except:
-            traceback.print_exc()
+    try:
+        s = get_session(session_key, POST_RETRIES)
+        res = s.post(url, data=json.dumps(data), headers=header, cookies=cookie, proxies=proxy_server)
+    except:
+        traceback.print_exc()
 
     return res
@@ -0,0 +1,172 @@
+import os
+import sqlite3
+import threading
+import logging
+from contextlib import contextmanager
+
+# 로깅 설정
+logger = logging.getLogger(__name__)
+
+# DB 경로 (환경변수 KMONG_DB_PATH 또는 configure()로 변경 가능)
+DEFAULT_DB_PATH = "db_kmong_checker2.db"
+
+# 연결마다 한 번만 적용되는 PRAGMA 목록
+CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",        # 읽기/쓰기 동시 진행 허용
+    "PRAGMA synchronous=NORMAL",      # WAL 모드에서 안전한 수준으로 fsync 감소
+    "PRAGMA busy_timeout=5000",       # 다른 스레드가 쓰는 중이면 최대 5초 대기
+    "PRAGMA foreign_keys=ON",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-8000",        # 약 8MB 페이지 캐시
+)
+
+
+def dict_factory(cursor, row):
+    contents = {}
+    for idx, col in enumerate(cursor.description):
+        contents[col[0]] = row[idx]
+    return contents
+
+
+class ConnectionPool:
+    """
+    스레드 간에 공유되는 SQLite 연결 풀.
+
+    - 같은 스레드에서 중첩 호출되면 이미 빌린 연결을 그대로 재사용한다.
+    - 스레드가 연결을 반납하면 유휴 목록으로 돌아가 다른 스레드(스케줄러, Flask 요청, 텔레그램 폴링)가 재사용한다.
+    - PRAGMA는 연결을 새로 만들 때 한 번만 적용한다.
+    """
+
+    def __init__(self, db_path=None, max_idle=8):
+        self.db_path = db_path or os.getenv("KMONG_DB_PATH", DEFAULT_DB_PATH)
+        self.max_idle = max_idle
+        self._idle = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _create_connection(self):
+        # 트랜잭션은 transaction()에서 직접 BEGIN/COMMIT 하므로 autocommit 모드로 연다.
+        conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+        for pragma in CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        logger.debug(f"db_connection, _create_connection // 🔌 새 SQLite 연결 생성: {self.db_path}")
+        return conn
+
+    def _acquire(self):
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+        return self._create_connection()
+
+    def _release(self, conn):
+        # 끝나지 않은 트랜잭션이 남아있으면 되돌린 뒤 반납
+        if conn.in_transaction:
+            conn.rollback()
+        with self._lock:
+            if len(self._idle) < self.max_idle:
+                self._idle.append(conn)
+                return
+        conn.close()
+
+    @contextmanager
+    def connect(self):
+        """현재 스레드용 연결을 빌려준다. 중첩 호출 시 같은 연결을 반환한다."""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            self._local.depth += 1
+            try:
+                yield conn
+            finally:
+                self._local.depth -= 1
+            return
+
+        conn = self._acquire()
+        self._local.conn = conn
+        self._local.depth = 1
+        self._local.tx_depth = 0
+        try:
+            yield conn
+        finally:
+            self._local.conn = None
+            self._local.depth = 0
+            self._release(conn)
+
+    @contextmanager
+    def transaction(self):
+        """
+        하나의 트랜잭션으로 묶어 실행한다.
+        중첩되면 가장 바깥쪽 트랜잭션에 합류하고, 바깥쪽이 끝날 때 한 번만 커밋한다.
+        """
+        with self.connect() as conn:
+            outermost = self._local.tx_depth == 0
+            if outermost:
+                conn.execute("BEGIN IMMEDIATE")
+                self._local.on_commit = []
+            self._local.tx_depth += 1
+            try:
+                yield conn
+            except Exception:
+                self._local.tx_depth -= 1
+                if outermost:
+                    self._local.on_commit = []
+                    conn.rollback()
+                raise
+            else:
+                self._local.tx_depth -= 1
+                if outermost:
+                    conn.commit()
+                    callbacks, self._local.on_commit = self._local.on_commit, []
+                    for callback in callbacks:
+                        callback()
+
+    def on_commit(self, callback):
+        """현재 스레드의 트랜잭션이 커밋된 뒤 callback 실행 (트랜잭션 밖이면 바로 실행)"""
+        if getattr(self._local, "tx_depth", 0) > 0:
+            self._local.on_commit.append(callback)
+        else:
+            callback()
+
+    def close_all(self):
+        """유휴 연결을 모두 닫는다. (경로 변경, 종료 시 사용)"""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+
+
+_pool = ConnectionPool()
+
+
+def configure(db_path):
+    """DB 경로를 변경한다. 기존 유휴 연결은 닫힌다."""
+    global _pool
+    old_pool = _pool
+    _pool = ConnectionPool(db_path=db_path, max_idle=old_pool.max_idle)
+    old_pool.close_all()
+    logger.info(f"db_connection, configure // ✅ DB 경로 변경: {db_path}")
+
+
+def get_db_path():
+    return _pool.db_path
+
+
+def connect():
+    """with db_connection.connect() as conn: 형태로 사용"""
+    return _pool.connect()
+
+
+def transaction():
+    """with db_connection.transaction() as conn: 형태로 사용"""
+    return _pool.transaction()
+
+
+def on_commit(callback):
+    """커밋된 데이터를 기준으로 동작해야 하는 후처리(이벤트 발행 등)에 사용"""
+    _pool.on_commit(callback)
+
+
+def close_all():
+    _pool.close_all()
@@ -1,155 +1,433 @@
 import sqlite3
+import threading
 from datetime import datetime
 from model.message_dto import MessageDTO
-
-def dict_factory(cursor, row):
-    contents = {}
-    for idx, col in enumerate(cursor.description):
-        contents[col[0]] = row[idx]
-    return contents
-
-def get_connect_db():
-    conn = sqlite3.connect("db_kmong_checker2.db")
-    return conn
+from utils.kmong_manager import db_connection
+from utils.kmong_manager.db_connection import dict_factory
+from utils.event_bus import event_bus
+from utils.event_bus.events import MessageStored, MessageSeen
+
+# 모든 채팅방의 메시지는 messages 테이블 하나에 chatroom_id로 구분하여 저장한다.
+# (이전 버전의 chatroom_{id} 테이블은 ensure_message_schema()에서 한 번 옮긴 뒤 삭제된다.)
+# 기존 함수들의 table_id 인자는 그대로 chatroom_id를 의미한다.
+
+_schema_lock = threading.Lock()
+_schema_ready = False
+
+# PRAGMA user_version으로 관리하는 메시지 스키마 버전
+# 1: kmong_message_id = 크몽 MID, (chatroom_id, kmong_message_id) UNIQUE
+# 2: sort_key (대화기록 동기화로 중간에 끼워 넣은 메시지의 채팅방 내 위치)
+# 3: 텔레그램 전송 대상(안읽은 고객 메시지) 조회용 부분 인덱스
+MESSAGE_SCHEMA_VERSION = 3
+
+# 채팅방 안에서 메시지 순서. 보통은 idx 순서이고, 대화 중간에 끼워 넣은 메시지만 sort_key(앞뒤 메시지 사이 값)를 가진다.
+MESSAGE_POSITION = "COALESCE(sort_key, idx)"
+
+MESSAGE_COLUMNS = "admin_id, text, client_id, sender_id, replied_kmong, replied_telegram, seen, kmong_message_id, date"
+
+def create_message_tables():
+    """ chatrooms / messages 테이블과 인덱스 생성 """
+    with db_connection.transaction() as conn:
+        conn.execute("""CREATE TABLE IF NOT EXISTS chatrooms (
+                    chatroom_id INTEGER PRIMARY KEY,
+                    created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+                )""")
+        conn.execute("""CREATE TABLE IF NOT EXISTS messages (
+                    idx INTEGER PRIMARY KEY AUTOINCREMENT, 
+                    chatroom_id INTEGER NOT NULL,
+                    admin_id INTEGER DEFAULT 0, 
+                    text TEXT DEFAULT '', 
+                    client_id INTEGER DEFAULT 0, 
+                    sender_id INTEGER DEFAULT 0, 
+                    replied_kmong INTEGER DEFAULT 0, 
+                    replied_telegram INTEGER DEFAULT 0, 
+                    seen INTEGER DEFAULT 0,
+                    kmong_message_id INTEGER DEFAULT 0,
+                    date DATE DEFAULT CURRENT_DATE,
+                    sort_key REAL
+                )""")
+        # 채팅방별 조회/정렬
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_messages_chatroom_date ON messages (chatroom_id, date)")
+        # 채팅방별 idx 기준 페이지 조회 (keyset pagination)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_messages_chatroom_idx ON messages (chatroom_id, idx)")
+        # 업그레이드 전 메시지(MID 없음)에 MID 채우기 (backfill_kmong_message_ids)
+        conn.execute("""CREATE INDEX IF NOT EXISTS idx_messages_missing_kmong_message_id
+                        ON messages (chatroom_id, sender_id, text) WHERE kmong_message_id = 0""")
+
+def migrate_chatroom_tables():
+    """ 기존 chatroom_{id} 테이블의 데이터를 messages 테이블로 옮기고 기존 테이블 삭제 """
+    legacy_tables = _read_legacy_chatroom_tables()
+    if not legacy_tables:
+        return 0
+
+    # 오래된 테이블에 빠진 컬럼이 있으면 먼저 채워둔다.
+    add_missing_columns_to_all_chatrooms()
+
+    migrated = 0
+    for table_name in legacy_tables:
+        try:
+            chatroom_id = int(table_name.split('_')[1])
+        except (IndexError, ValueError):
+            print(f"⚠️ 채팅방 ID를 알 수 없는 테이블은 건너뜁니다: {table_name}")
+            continue
+
+        # 테이블 하나씩 트랜잭션으로 옮겨서, 다른 스레드는 옮기기 전/후 상태만 보게 한다.
+        with db_connection.transaction() as conn:
+            conn.execute("INSERT OR IGNORE INTO chatrooms (chatroom_id) VALUES (?)", (chatroom_id,))
+            cursor = conn.execute(f"""INSERT INTO messages (chatroom_id, {MESSAGE_COLUMNS})
+                                      SELECT ?, {MESSAGE_COLUMNS} FROM {table_name} ORDER BY idx""", (chatroom_id,))
+            conn.execute(f"DROP TABLE {table_name}")
+        migrated += 1
+        print(f"✅ {table_name} → messages 이전 완료 ({cursor.rowcount}건)")
+
+    return migrated
+
+def upgrade_message_schema():
+    """ user_version 기준으로 아직 적용되지 않은 스키마 변경 적용 """
+    with db_connection.transaction() as conn:
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+
+        if version < 1:
+            # 이전 kmong_message_id는 (메시지 내용 + 이메일)의 24비트 해시라 MID와 맞지 않고 서로 충돌한다.
+            # 0(알 수 없음)으로 비운 뒤 채팅방별 MID 유일 인덱스를 만든다.
+            # MID는 다음 폴링에서 같은 메시지를 만나면 backfill_kmong_message_ids로 채워진다. (새 메시지로 다시 저장되지 않음)
+            conn.execute("UPDATE messages SET kmong_message_id = 0 WHERE kmong_message_id <> 0")
+            conn.execute("DROP INDEX IF EXISTS idx_messages_kmong_message_id")
+            conn.execute("""CREATE UNIQUE INDEX IF NOT EXISTS ux_messages_chatroom_kmong_message_id
+                            ON messages (chatroom_id, kmong_message_id) WHERE kmong_message_id <> 0""")
+
+        if version < 2:
+            columns = [row[1] for row in conn.execute("PRAGMA table_info(messages)")]
+            if 'sort_key' not in columns:
+                conn.execute("ALTER TABLE messages ADD COLUMN sort_key REAL")
+            # 채팅방별 위치 기준 페이지 조회 (식이 MESSAGE_POSITION과 같아야 인덱스를 사용)
+            conn.execute(f"CREATE INDEX IF NOT EXISTS idx_messages_chatroom_position ON messages (chatroom_id, {MESSAGE_POSITION})")
+
+        if version < 3:
+            # 전체 채팅방의 안읽은 고객 메시지 조회 (텔레그램 전송 대상, read_unread_messages와 조건이 같아야 인덱스를 사용)
+            conn.execute("DROP INDEX IF EXISTS idx_messages_seen_telegram")
+            conn.execute("""CREATE INDEX IF NOT EXISTS idx_messages_unread_client
+                            ON messages (chatroom_id, idx)
+                            WHERE seen = 0 AND replied_telegram = 0 AND client_id = sender_id""")
+
+        if version < MESSAGE_SCHEMA_VERSION:
+            conn.execute(f"PRAGMA user_version = {MESSAGE_SCHEMA_VERSION}")
+            print(f"✅ 메시지 스키마 버전 {version} → {MESSAGE_SCHEMA_VERSION}")
+
+def ensure_message_schema():
+    """ 메시지 저장소 준비 (프로세스당 한 번만 실제로 실행됨) """
+    global _schema_ready
+    with _schema_lock:
+        if _schema_ready:
+            return
+        create_message_tables()
+        migrate_chatroom_tables()
+        upgrade_message_schema()
+        _schema_ready = True
+
+def _read_legacy_chatroom_tables():
+    with db_connection.connect() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name LIKE 'chatroom\\_%' ESCAPE '\\'")
+        tables = [row[0] for row in cursor.fetchall()]
+        cursor.close()
+    return tables
 
 def check_chatroom_table_exists(table_id: int): 
-    table_name = f"chatroom_{table_id}"
-    conn = get_connect_db()
-    cursor = conn.cursor()
-    sql = "SELECT name FROM sqlite_master WHERE type='table' AND name=?"
-    cursor.execute(sql, (table_name,))
-    table_exists = cursor.fetchone() is not None
-    cursor.close()
-    conn.close()
+    with db_connection.connect() as conn:
+        cursor = conn.cursor()
+        sql = "SELECT 1 FROM chatrooms WHERE chatroom_id = ?"
+        cursor.execute(sql, (table_id,))
+        table_exists = cursor.fetchone() is not None
+        cursor.close()
     return table_exists
 
 def create_chatroom_table(table_id: int):
-    table_name = f"chatroom_{table_id}"
-    conn = get_connect_db()
-    cursor = conn.cursor()
-    sql = f"""CREATE TABLE IF NOT EXISTS {table_name} (
-                idx INTEGER PRIMARY KEY AUTOINCREMENT, 
-                admin_id INTEGER DEFAULT 0, 
-                text TEXT DEFAULT '', 
-                client_id INTEGER DEFAULT 0, 
-                sender_id INTEGER DEFAULT 0, 
-                replied_kmong INTEGER DEFAULT 0, 
-                replied_telegram INTEGER DEFAULT 0, 
-                seen INTEGER DEFAULT 0,
-                kmong_message_id INTEGER DEFAULT 0,
-                date DATE DEFAULT CURRENT_DATE
-            )"""
-    cursor.execute(sql)
-    conn.commit()
-    conn.close()
+    sql = "INSERT OR IGNORE INTO chatrooms (chatroom_id) VALUES (?)"
+    with db_connection.connect() as conn:
+        conn.execute(sql, (table_id,))
 
 def create_message(table_id: int, message_dto: MessageDTO):
-    table_name = f"chatroom_{table_id}"
-    conn = get_connect_db()
-    cursor = conn.cursor()
-    sql = f"""INSERT INTO {table_name} 
-              (admin_id, text, client_id, sender_id, replied_kmong, replied_telegram, seen, kmong_message_id, date)
-              VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"""
-    cursor.execute(sql, (message_dto.admin_id, message_dto.text, message_dto.client_id,
-                         message_dto.sender_id, message_dto.replied_kmong, message_dto.replied_telegram, 
-                         message_dto.seen, message_dto.kmong_message_id, message_dto.date))
-    conn.commit()
-    cursor.close()
-    conn.close()
+    """ 메시지 저장. 같은 채팅방에 같은 kmong_message_id(MID)가 이미 있으면 저장하지 않고 None 반환 """
+    sql = f"""INSERT INTO messages 
+              (chatroom_id, {MESSAGE_COLUMNS})
+              VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+              ON CONFLICT DO NOTHING"""
+    with db_connection.transaction() as conn:
+        conn.execute("INSERT OR IGNORE INTO chatrooms (chatroom_id) VALUES (?)", (table_id,))
+        cursor = conn.execute(sql, (table_id, message_dto.admin_id, message_dto.text, message_dto.client_id,
+                                    message_dto.sender_id, message_dto.replied_kmong, message_dto.replied_telegram, 
+                                    message_dto.seen, message_dto.kmong_message_id, message_dto.date))
+        if cursor.rowcount == 0:
+            return None
+        message_idx = cursor.lastrowid
+        # 커밋된 뒤에 구독자에게 알림
+        db_connection.on_commit(lambda: event_bus.publish(MessageStored(
+            chatroom_id=table_id,
+            message_idx=message_idx,
+            admin_id=message_dto.admin_id,
+            client_id=message_dto.client_id,
+            sender_id=message_dto.sender_id,
+            text=message_dto.text
+        )))
+    return message_idx
+
+def create_messages_bulk(table_id: int, message_dtos, notify=True, sort_keys=None):
+    """
+    여러 메시지를 한 트랜잭션에서 executemany로 저장 (주어진 순서대로 idx 부여).
+    중복 MID는 건너뛰며, 실제로 저장된 메시지의 idx 목록을 반환한다.
+    notify=False면 MessageStored 이벤트를 발행하지 않는다. (대화기록 동기화처럼 화면을 통째로 다시 읽는 경우)
+    sort_keys: 메시지별 채팅방 내 위치 (None이면 idx 순서, 대화 중간에 끼워 넣을 때만 지정)
+    """
+    message_dtos = list(message_dtos)
+    if not message_dtos:
+        return []
+    sort_keys = list(sort_keys) if sort_keys is not None else [None] * len(message_dtos)
+
+    sql = f"""INSERT INTO messages 
+              (chatroom_id, {MESSAGE_COLUMNS}, sort_key)
+              VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+              ON CONFLICT DO NOTHING"""
+    params = [(table_id, dto.admin_id, dto.text, dto.client_id, dto.sender_id, dto.replied_kmong,
+               dto.replied_telegram, dto.seen, dto.kmong_message_id, dto.date, sort_key)
+              for dto, sort_key in zip(message_dtos, sort_keys)]
+
+    with db_connection.transaction() as conn:
+        conn.execute("INSERT OR IGNORE INTO chatrooms (chatroom_id) VALUES (?)", (table_id,))
+        # AUTOINCREMENT라 이번에 저장된 행은 모두 이전 최대 idx보다 크다 (쓰기 잠금 중이라 다른 쓰기 없음)
+        last_idx = conn.execute("SELECT COALESCE(MAX(idx), 0) FROM messages").fetchone()[0]
+        conn.executemany(sql, params)
+
+        cursor = conn.cursor()
+        cursor.row_factory = dict_factory
+        cursor.execute("""SELECT idx, admin_id, client_id, sender_id, text FROM messages
+                          WHERE chatroom_id = ? AND idx > ? ORDER BY idx""", (table_id, last_idx))
+        inserted = cursor.fetchall()
+        cursor.close()
+
+        if notify:
+            db_connection.on_commit(lambda: [event_bus.publish(MessageStored(
+                chatroom_id=table_id,
+                message_idx=row['idx'],
+                admin_id=row['admin_id'],
+                client_id=row['client_id'],
+                sender_id=row['sender_id'],
+                text=row['text']
+            )) for row in inserted])
+
+    return [row['idx'] for row in inserted]
 
 def read_chatroom_by_id(table_id: int):
     """ 특정 채팅방 정보 조회 """
-    table_name = f"chatroom_{table_id}"
-    conn = get_connect_db()
-    conn.row_factory = dict_factory  # ✅ 딕셔너리로 반환하도록 설정
-    cursor = conn.cursor()
+    with db_connection.connect() as conn:
+        cursor = conn.cursor()
+        cursor.row_factory = dict_factory  # ✅ 딕셔너리로 반환하도록 설정
 
-    sql = f"SELECT * FROM {table_name} LIMIT 1"
-    cursor.execute(sql)
-    row = cursor.fetchone()
+        sql = "SELECT * FROM messages WHERE chatroom_id = ? ORDER BY idx LIMIT 1"
+        cursor.execute(sql, (table_id,))
+        row = cursor.fetchone()
 
-    cursor.close()
-    conn.close()
+        cursor.close()
 
     return row  # ✅ dict 형태로 반환됨
 
+def read_all_chatroom_ids():
+    """ 모든 채팅방 ID 조회 """
+    with db_connection.connect() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT chatroom_id FROM chatrooms ORDER BY chatroom_id")
+        rows = cursor.fetchall()
+        cursor.close()
 
-def read_all_chatroom_tables():
-    """ chatroom_으로 시작하는 모든 테이블 조회 """
-    conn = get_connect_db()
-    cursor = conn.cursor()
+    return [row[0] for row in rows]
 
-    # 'chatroom_'으로 시작하는 테이블 이름 조회
-    sql = "SELECT name FROM sqlite_master WHERE type='table' AND name LIKE 'chatroom_%';"
-    cursor.execute(sql)
+def read_all_chatroom_tables():
+    """ 모든 채팅방 조회 (기존 호출부 호환을 위해 'chatroom_{id}' 형태의 이름으로 반환) """
+    return [f"chatroom_{chatroom_id}" for chatroom_id in read_all_chatroom_ids()]
 
-    # 결과 가져오기
-    chatroom_tables = cursor.fetchall()
+def read_chatroom_summaries(chatroom_id=None):
+    """
+    채팅방 목록용 요약 조회 (계정 정보, 안읽은 메시지 수, 최신 날짜, 마지막 메시지) - 쿼리 1회
+    chatroom_id를 주면 해당 채팅방 하나만 조회 (실시간 갱신용)
+    """
+    condition = "WHERE chatroom_id = :chatroom_id" if chatroom_id is not None else ""
+    sql = f"""
+        WITH room_stats AS (
+            SELECT chatroom_id,
+                   MIN(idx) AS first_idx,
+                   MAX(CASE WHEN sort_key IS NULL THEN idx END) AS last_idx,  -- 중간에 끼워 넣은 메시지는 마지막이 아님
+                   MAX(date) AS latest_date,
+                   SUM(CASE WHEN seen = 0 AND client_id = sender_id THEN 1 ELSE 0 END) AS unread_count
+            FROM messages
+            {condition}
+            GROUP BY chatroom_id
+        )
+        SELECT account.email AS email,
+               account.user_id AS user_id,
+               stats.chatroom_id AS chatroom_id,
+               last_message.admin_id AS admin_id,
+               last_message.client_id AS client_id,
+               stats.unread_count AS unread_count,
+               stats.latest_date AS latest_date,
+               stats.last_idx AS last_idx,
+               last_message.text AS last_message
+        FROM room_stats AS stats
+        JOIN messages AS first_message ON first_message.idx = stats.first_idx
+        JOIN messages AS last_message ON last_message.idx = stats.last_idx
+        JOIN account_table AS account
+             ON account.user_id > 0 AND account.user_id = first_message.admin_id
+        ORDER BY stats.unread_count > 0 DESC, stats.latest_date DESC, stats.last_idx DESC
+    """
+    with db_connection.connect() as conn:
+        cursor = conn.cursor()
+        cursor.row_factory = dict_factory
+        cursor.execute(sql, {'chatroom_id': chatroom_id})
+        rows = cursor.fetchall()
+        cursor.close()
 
-    cursor.close()
-    conn.close()
+    for row in rows:
+        row['has_unread_messages'] = row['unread_count'] > 0
+        row['latest_date'] = row['latest_date'] or ''
 
-    # 테이블 이름만 리스트로 반환
-    return [table[0] for table in chatroom_tables]
+    return rows
 
 # 특정 메시지 조회 (READ)
 def read_message_by_id(table_id: int, message_id: int):
     """ 메시지 ID로 조회 """
-    table_name = f"chatroom_{table_id}"
-    conn = get_connect_db()
-    cursor = conn.cursor()
+    with db_connection.connect() as conn:
+        cursor = conn.cursor()
+        cursor.row_factory = dict_factory
+
+        sql = "SELECT * FROM messages WHERE chatroom_id = ? AND idx = ?"
+        cursor.execute(sql, (table_id, message_id))
+        row = cursor.fetchone()
 
-    sql = f"SELECT * FROM {table_name} WHERE idx = ?"
-    cursor.execute(sql, (message_id,))
-    row = cursor.fetchone()
-    conn.close()
+        cursor.close()
 
-    return dict(row) if row else None
+    return row
 
 
 # 전체 메시지 목록 조회 (READ)
 def read_all_messages(table_id: int):
-    """ 모든 메시지 조회 - 테이블이 없는 경우 자동 생성 """
-    table_name = f"chatroom_{table_id}"
-    conn = None
-    cursor = None
-    
+    """ 채팅방의 모든 메시지 조회 - 채팅방이 없으면 빈 리스트 """
     try:
-        # 먼저 테이블이 존재하는지 확인
-        if not check_chatroom_table_exists(table_id):
-            print(f"테이블 {table_name}이 존재하지 않습니다. 자동으로 생성합니다.")
-            create_chatroom_table(table_id)
-        
-        # 메시지 조회 시작
-        conn = get_connect_db()
-        conn.row_factory = dict_factory  # 결과를 딕셔너리 형태로 변환
-        cursor = conn.cursor()
+        with db_connection.connect() as conn:
+            cursor = conn.cursor()
+            cursor.row_factory = dict_factory  # 결과를 딕셔너리 형태로 변환
 
-        sql = f"SELECT * FROM {table_name} ORDER BY date DESC"
-        cursor.execute(sql)
-        rows = cursor.fetchall()
+            sql = f"SELECT * FROM messages WHERE chatroom_id = ? ORDER BY date DESC, {MESSAGE_POSITION} ASC"
+            cursor.execute(sql, (table_id,))
+            rows = cursor.fetchall()
+            cursor.close()
 
         return rows  # 모든 메시지를 dict 형태로 반환
     
     except sqlite3.Error as e:
-        print(f"메시지 조회 중 오류 발생 (테이블 ID: {table_id}): {str(e)}")
+        print(f"메시지 조회 중 오류 발생 (채팅방 ID: {table_id}): {str(e)}")
         return []  # 오류 발생 시 빈 리스트 반환
-    
-    finally:
-        # 연결 자원 해제
-        if cursor:
-            cursor.close()
-        if conn:
-            conn.close()
+
+def read_messages_page(table_id: int, before_idx=None, after_idx=None, limit=50):
+    """
+    채팅방 메시지를 위치(MESSAGE_POSITION) 기준으로 잘라서 조회 (오래된 것 → 최신 순으로 반환)
+    - before_idx: 이 idx 메시지보다 앞의 메시지 중 최신 limit개 (위로 스크롤해서 과거 내역 불러오기)
+    - after_idx: 이 idx 메시지 이후의 새 메시지 limit개 (이미 가진 메시지 이후 것만 불러오기)
+    - 둘 다 없으면 가장 최근 limit개
+    """
+    data = {'chatroom_id': table_id, 'limit': limit}
+    # 기준 메시지의 위치 (기준 메시지가 지워졌으면 idx 그대로)
+    cursor_position = f"COALESCE((SELECT {MESSAGE_POSITION} FROM messages WHERE idx = :{{cursor}}), :{{cursor}})"
+
+    if after_idx is not None:
+        data['after_idx'] = after_idx
+        sql = f"""SELECT * FROM messages
+                  WHERE chatroom_id = :chatroom_id AND {MESSAGE_POSITION} > {cursor_position.format(cursor='after_idx')}
+                  ORDER BY {MESSAGE_POSITION} ASC LIMIT :limit"""
+    else:
+        condition = ""
+        if before_idx is not None:
+            condition = f"AND {MESSAGE_POSITION} < {cursor_position.format(cursor='before_idx')}"
+            data['before_idx'] = before_idx
+        sql = f"""SELECT * FROM messages
+                  WHERE chatroom_id = :chatroom_id {condition}
+                  ORDER BY {MESSAGE_POSITION} DESC LIMIT :limit"""
+
+    with db_connection.connect() as conn:
+        cursor = conn.cursor()
+        cursor.row_factory = dict_factory
+        cursor.execute(sql, data)
+        rows = cursor.fetchall()
+        cursor.close()
+
+    if after_idx is None:
+        rows.reverse()
+
+    return rows
+
+def read_unread_messages():
+    """
+    모든 채팅방에서 읽지 않았고 텔레그램으로 보내지 않은 고객 메시지 조회 (부분 인덱스 사용)
+    내가 보낸 답장(client_id != sender_id)은 seen이 0이어도 알림 대상이 아니다.
+    """
+    with db_connection.connect() as conn:
+        cursor = conn.cursor()
+        cursor.row_factory = dict_factory
+
+        sql = """SELECT * FROM messages
+                 WHERE seen = 0 AND replied_telegram = 0 AND client_id = sender_id
+                 ORDER BY chatroom_id, idx"""
+        cursor.execute(sql)
+        rows = cursor.fetchall()
+        cursor.close()
+
+    return rows
+
+def read_stored_kmong_message_ids(keys):
+    """ (chatroom_id, kmong_message_id) 목록 중 이미 저장된 것만 집합으로 반환 (유일 인덱스 조회) """
+    keys = [(chatroom_id, kmong_message_id) for chatroom_id, kmong_message_id in set(keys) if kmong_message_id]
+    if not keys:
+        return set()
+
+    placeholders = ", ".join("(?, ?)" for _ in keys)
+    # 키 목록을 바깥에 두고 조인해야 키마다 인덱스 탐색 (IN (VALUES ...)는 인덱스 전체를 훑음)
+    sql = f"""SELECT m.chatroom_id, m.kmong_message_id
+              FROM (VALUES {placeholders}) AS k
+              JOIN messages AS m ON m.chatroom_id = k.column1 AND m.kmong_message_id = k.column2
+              WHERE m.kmong_message_id <> 0"""
+    params = [value for key in keys for value in key]
+    with db_connection.connect() as conn:
+        rows = conn.execute(sql, params).fetchall()
+
+    return {(row[0], row[1]) for row in rows}
+
+def backfill_kmong_message_ids(messages):
+    """
+    스키마 업그레이드로 MID가 0이 된 기존 메시지에 MID를 채움.
+    같은 채팅방에서 보낸 사람과 내용이 같고 아직 MID가 없는 메시지 중 가장 최근 것에 MID를 넣는다.
+    (최신순으로 넘기면 같은 내용이 여러 번 있어도 최신 메시지부터 차례로 짝지어짐)
+    :param messages: [(chatroom_id, kmong_message_id, sender_id, text), ...]
+    :return: MID를 채운 (chatroom_id, kmong_message_id) 집합 (이미 저장된 메시지로 취급)
+    """
+    messages = [message for message in messages if message[1]]
+    backfilled = set()
+    if not messages:
+        return backfilled
+    with db_connection.transaction() as conn:
+        for chatroom_id, kmong_message_id, sender_id, text in messages:
+            if (chatroom_id, kmong_message_id) in backfilled:
+                continue
+            cursor = conn.execute("""UPDATE messages SET kmong_message_id = ?
+                                     WHERE idx = (SELECT MAX(idx) FROM messages
+                                                  WHERE chatroom_id = ? AND kmong_message_id = 0
+                                                    AND sender_id = ? AND text = ?)""",
+                                  (kmong_message_id, chatroom_id, sender_id, text))
+            if cursor.rowcount:
+                backfilled.add((chatroom_id, kmong_message_id))
+    return backfilled
 
 def update_message(table_id: int, message_id: int, text=None, replied_kmong=None, replied_telegram=None, seen=None, kmong_message_id=None):
     """ 메시지 업데이트 """
-    table_name = f"chatroom_{table_id}"
-    conn = get_connect_db()
-    cursor = conn.cursor()
-
     update_fields = []
-    data = {'message_id': message_id}
+    data = {'chatroom_id': table_id, 'message_id': message_id}
 
     if text is not None:
         update_fields.append("text = :text")
@@ -169,87 +447,112 @@ def update_message(table_id: int, message_id: int, text=None, replied_kmong=None
 
     if update_fields:
         update_query = ", ".join(update_fields)
-        sql = f"UPDATE {table_name} SET {update_query} WHERE idx = :message_id"
-        cursor.execute(sql, data)
-        conn.commit()
+        sql = f"UPDATE messages SET {update_query} WHERE chatroom_id = :chatroom_id AND idx = :message_id"
+        with db_connection.connect() as conn:
+            conn.execute(sql, data)
 
-    cursor.close()
-    conn.close()
+def update_messages(table_id, message_ids, replied_kmong=None, replied_telegram=None, seen=None):
+    """
+    여러 메시지의 상태 값을 한 번의 UPDATE로 변경 (table_id가 None이면 채팅방 구분 없이 idx로만 찾음)
+    :return: 변경된 행 수
+    """
+    message_ids = list(message_ids)
+    update_fields = []
+    data = []
+
+    if replied_kmong is not None:
+        update_fields.append("replied_kmong = ?")
+        data.append(replied_kmong)
+    if replied_telegram is not None:
+        update_fields.append("replied_telegram = ?")
+        data.append(replied_telegram)
+    if seen is not None:
+        update_fields.append("seen = ?")
+        data.append(seen)
+
+    if not update_fields or not message_ids:
+        return 0
+
+    placeholders = ", ".join("?" for _ in message_ids)
+    where = f"idx IN ({placeholders})"
+    where_params = list(message_ids)
+    if table_id is not None:
+        where = f"chatroom_id = ? AND {where}"
+        where_params.insert(0, table_id)
+
+    with db_connection.transaction() as conn:
+        cursor = conn.execute(f"UPDATE messages SET {', '.join(update_fields)} WHERE {where}", data + where_params)
+        updated = cursor.rowcount
+
+        if seen is not None and updated > 0:
+            chatroom_ids = [row[0] for row in conn.execute(
+                f"SELECT DISTINCT chatroom_id FROM messages WHERE {where}", where_params)]
+            db_connection.on_commit(lambda: [event_bus.publish(MessageSeen(chatroom_id=chatroom_id))
+                                             for chatroom_id in chatroom_ids])
+
+    return updated
 
 # db_message.py
 def update_unread_message(table_id: int):
     """읽지 않은 메시지(seen == 0) 업데이트"""
-    table_name = f"chatroom_{table_id}"
-    conn = get_connect_db()
-    cursor = conn.cursor()
-
     # 읽지 않은 메시지 조건 (seen == 0, client_id == sender_id)
-    sql = f"""
-        UPDATE {table_name} 
+    sql = """
+        UPDATE messages 
         SET seen = 1 
-        WHERE seen = 0 AND client_id = sender_id
+        WHERE chatroom_id = ? AND seen = 0 AND client_id = sender_id
     """
-    cursor.execute(sql)
-    conn.commit()
+    with db_connection.connect() as conn:
+        cursor = conn.execute(sql, (table_id,))
 
-    cursor.close()
-    conn.close()
+    if cursor.rowcount > 0:
+        event_bus.publish(MessageSeen(chatroom_id=table_id))
 
 def delete_all_messages(table_id: int):
     """ 모든 메시지 삭제 """
-    table_name = f"chatroom_{table_id}"
-    conn = get_connect_db()
-    cursor = conn.cursor()
-
-    sql = f"DELETE FROM {table_name}"
-    cursor.execute(sql)
-    conn.commit()
-
-    cursor.close()
-    conn.close()
+    with db_connection.connect() as conn:
+        conn.execute("DELETE FROM messages WHERE chatroom_id = ?", (table_id,))
+
+def read_position_before(table_id: int, position):
+    """ 채팅방에서 position 바로 앞 메시지의 위치 (없으면 0) """
+    with db_connection.connect() as conn:
+        row = conn.execute(f"""SELECT MAX({MESSAGE_POSITION}) FROM messages
+                               WHERE chatroom_id = ? AND {MESSAGE_POSITION} < ?""", (table_id, position)).fetchone()
+    return row[0] or 0
+
+def update_message_texts(table_id: int, texts):
+    """ texts: [(idx, text), ...] - idx와 상태 값은 그대로 두고 내용만 변경 """
+    if not texts:
+        return
+    with db_connection.transaction() as conn:
+        conn.executemany("UPDATE messages SET text = ? WHERE chatroom_id = ? AND idx = ?",
+                         [(text, table_id, idx) for idx, text in texts])
 
 def delete_chatroom_table(table_id: int):
-    """ 채팅방 테이블 삭제 """
-    table_name = f"chatroom_{table_id}"
-    conn = get_connect_db()
-    cursor = conn.cursor()
-
-    sql = f"DROP TABLE IF EXISTS {table_name}"
-    cursor.execute(sql)
-    conn.commit()
-
-    cursor.close()
-    conn.close()
+    """ 채팅방 삭제 (메시지 포함) """
+    with db_connection.transaction() as conn:
+        conn.execute("DELETE FROM messages WHERE chatroom_id = ?", (table_id,))
+        conn.execute("DELETE FROM chatrooms WHERE chatroom_id = ?", (table_id,))
 
 def add_missing_columns_to_all_chatrooms():
-    """ 모든 chatroom_ 테이블에 'seen'과 'kmong_message_id' 컬럼 추가 """
-    conn = get_connect_db()
-    cursor = conn.cursor()
-
-    # 'chatroom_'으로 시작하는 모든 테이블 찾기
-    cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name LIKE 'chatroom_%';")
-    chatroom_tables = cursor.fetchall()
-
-    for table in chatroom_tables:
-        table_name = table[0]
-
-        # 해당 테이블의 컬럼 목록 가져오기
-        cursor.execute(f"PRAGMA table_info({table_name})")
-        columns = [col[1] for col in cursor.fetchall()]
+    """ 이전 버전의 chatroom_ 테이블에 'seen'과 'kmong_message_id' 컬럼 추가 (마이그레이션 전 단계) """
+    with db_connection.transaction() as conn:
+        cursor = conn.cursor()
 
-        # seen 컬럼 추가
-        if "seen" not in columns:
-            alter_sql = f"ALTER TABLE {table_name} ADD COLUMN seen INTEGER DEFAULT 0;"
-            cursor.execute(alter_sql)
-            print(f"✅ {table_name} 테이블에 'seen' 컬럼 추가 완료!")
+        for table_name in _read_legacy_chatroom_tables():
+            # 해당 테이블의 컬럼 목록 가져오기
+            cursor.execute(f"PRAGMA table_info({table_name})")
+            columns = [col[1] for col in cursor.fetchall()]
 
-        # kmong_message_id 컬럼 추가
-        if "kmong_message_id" not in columns:
-            alter_sql = f"ALTER TABLE {table_name} ADD COLUMN kmong_message_id INTEGER DEFAULT 0;"
-            cursor.execute(alter_sql)
-            print(f"✅ {table_name} 테이블에 'kmong_message_id' 컬럼 추가 완료!")
+            # seen 컬럼 추가
+            if "seen" not in columns:
+                alter_sql = f"ALTER TABLE {table_name} ADD COLUMN seen INTEGER DEFAULT 0;"
+                cursor.execute(alter_sql)
+                print(f"✅ {table_name} 테이블에 'seen' 컬럼 추가 완료!")
 
-    conn.commit()
-    cursor.close()
-    conn.close()
+            # kmong_message_id 컬럼 추가
+            if "kmong_message_id" not in columns:
+                alter_sql = f"ALTER TABLE {table_name} ADD COLUMN kmong_message_id INTEGER DEFAULT 0;"
+                cursor.execute(alter_sql)
+                print(f"✅ {table_name} 테이블에 'kmong_message_id' 컬럼 추가 완료!")
 
+        cursor.close()
@@ -0,0 +1,165 @@
+import time
+from utils.kmong_manager import db_connection
+from utils.kmong_manager.db_connection import dict_factory
+from utils.event_bus import event_bus
+from utils.event_bus.events import OutboxJobUpdated
+
+# 크몽 웹으로 보낼 메시지 작업 큐
+# status: queued -> sending -> sent / (재시도 시 다시 queued) / failed
+# sent는 크몽에 보낸 상태이고, 로컬 messages 저장까지 끝나면 stored = 1 (저장만 따로 재시도해 크몽에 두 번 보내지 않음)
+STATUS_QUEUED = "queued"
+STATUS_SENDING = "sending"
+STATUS_SENT = "sent"
+STATUS_FAILED = "failed"
+
+# 'sending' 작업을 가져간 워커가 이 시간 안에 끝내지 못하면 (프로세스 종료 등) 다른 워커가 다시 가져갈 수 있음
+# 크몽 웹 전송 한 번에 걸리는 시간보다 충분히 길어야 한다.
+CLAIM_LEASE_SECONDS = 300
+
+def create_outbox_table():
+    with db_connection.transaction() as conn:
+        conn.execute("""CREATE TABLE IF NOT EXISTS outbox (
+                    job_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    chatroom_id INTEGER NOT NULL,
+                    admin_id INTEGER NOT NULL,
+                    client_id INTEGER NOT NULL,
+                    text TEXT NOT NULL,
+                    channel TEXT DEFAULT 'web',
+                    status TEXT DEFAULT 'queued',
+                    attempts INTEGER DEFAULT 0,
+                    next_attempt_at REAL DEFAULT 0,
+                    last_error TEXT DEFAULT '',
+                    claimed_by TEXT DEFAULT '',
+                    claimed_at REAL DEFAULT 0,
+                    stored INTEGER DEFAULT 0,
+                    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+                    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
+                )""")
+        # 이전 버전 테이블에 lease 컬럼 추가
+        columns = [row[1] for row in conn.execute("PRAGMA table_info(outbox)")]
+        if 'claimed_by' not in columns:
+            conn.execute("ALTER TABLE outbox ADD COLUMN claimed_by TEXT DEFAULT ''")
+            conn.execute("ALTER TABLE outbox ADD COLUMN claimed_at REAL DEFAULT 0")
+        if 'stored' not in columns:
+            # 이전 버전은 전송과 저장을 함께 끝냈으므로 sent 작업은 모두 저장된 상태
+            conn.execute("ALTER TABLE outbox ADD COLUMN stored INTEGER DEFAULT 0")
+            conn.execute("UPDATE outbox SET stored = 1 WHERE status = 'sent'")
+        # 처리할 작업 찾기 / 채팅방별 순서 확인
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_outbox_status_next ON outbox (status, next_attempt_at)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_outbox_chatroom_job ON outbox (chatroom_id, job_id)")
+        # 크몽에 보냈지만 로컬 저장이 안 된 작업
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_outbox_unstored ON outbox (job_id) WHERE status = 'sent' AND stored = 0")
+
+def _publish_on_commit(job_id, chatroom_id, status, error=""):
+    db_connection.on_commit(lambda: event_bus.publish(OutboxJobUpdated(
+        job_id=job_id,
+        chatroom_id=chatroom_id,
+        status=status,
+        error=error
+    )))
+
+def enqueue_message(chatroom_id, admin_id, client_id, text, channel="web"):
+    """ 보낼 메시지를 큐에 넣고 job_id 반환 """
+    with db_connection.transaction() as conn:
+        cursor = conn.execute("""INSERT INTO outbox (chatroom_id, admin_id, client_id, text, channel)
+                                 VALUES (?, ?, ?, ?, ?)""", (chatroom_id, admin_id, client_id, text, channel))
+        job_id = cursor.lastrowid
+        _publish_on_commit(job_id, chatroom_id, STATUS_QUEUED)
+    return job_id
+
+def claim_next_job(worker_id):
+    """
+    보낼 차례가 된 작업 하나를 worker_id 이름으로 'sending'으로 바꾸고 반환 (없으면 None).
+    같은 채팅방에 먼저 들어온 작업이 아직 queued/sending이거나 저장 전이면 그 뒤의 작업은 가져가지 않는다.
+    lease(CLAIM_LEASE_SECONDS)가 끝난 'sending' 작업은 가져간 워커가 죽은 것으로 보고 다시 가져간다.
+    크몽에 보냈지만 로컬 저장이 안 된 작업(sent, stored = 0)은 status 그대로 lease만 잡아 반환한다. (저장만 다시 함)
+    """
+    now = time.time()
+    lease_expired = now - CLAIM_LEASE_SECONDS
+    sql = """SELECT * FROM outbox AS o
+             WHERE ((o.status = 'queued' AND o.next_attempt_at <= ?)
+                    OR (o.status = 'sending' AND o.claimed_at < ?)
+                    OR (o.status = 'sent' AND o.stored = 0 AND o.next_attempt_at <= ? AND o.claimed_at < ?))
+               AND NOT EXISTS (SELECT 1 FROM outbox AS p
+                               WHERE p.chatroom_id = o.chatroom_id AND p.job_id < o.job_id
+                                 AND (p.status IN ('queued', 'sending') OR (p.status = 'sent' AND p.stored = 0)))
+             ORDER BY o.job_id
+             LIMIT 1"""
+    with db_connection.transaction() as conn:
+        cursor = conn.cursor()
+        cursor.row_factory = dict_factory
+        cursor.execute(sql, (now, lease_expired, now, lease_expired))
+        job = cursor.fetchone()
+        cursor.close()
+
+        if job is None:
+            return None
+
+        if job['status'] == STATUS_SENT:
+            conn.execute("""UPDATE outbox SET claimed_by = ?, claimed_at = ?, updated_at = CURRENT_TIMESTAMP
+                            WHERE job_id = ?""", (worker_id, now, job['job_id']))
+            job['claimed_by'] = worker_id
+            job['claimed_at'] = now
+            return job
+
+        conn.execute("""UPDATE outbox SET status = 'sending', attempts = attempts + 1, claimed_by = ?, claimed_at = ?,
+                        updated_at = CURRENT_TIMESTAMP WHERE job_id = ?""", (worker_id, now, job['job_id']))
+        job['status'] = STATUS_SENDING
+        job['attempts'] += 1
+        job['claimed_by'] = worker_id
+        job['claimed_at'] = now
+        _publish_on_commit(job['job_id'], job['chatroom_id'], STATUS_SENDING)
+    return job
+
+def mark_sent(job_id, chatroom_id):
+    """ 크몽에 보냄 (로컬 저장 전). 이후 재시도는 mark_stored까지 저장만 다시 한다. """
+    with db_connection.transaction() as conn:
+        conn.execute("""UPDATE outbox SET status = 'sent', stored = 0, last_error = '', updated_at = CURRENT_TIMESTAMP
+                        WHERE job_id = ?""", (job_id,))
+        _publish_on_commit(job_id, chatroom_id, STATUS_SENT)
+
+def mark_stored(job_id):
+    """ 보낸 메시지를 로컬 messages에 저장함 (저장과 같은 트랜잭션에서 호출) """
+    with db_connection.transaction() as conn:
+        conn.execute("""UPDATE outbox SET stored = 1, claimed_by = '', last_error = '', updated_at = CURRENT_TIMESTAMP
+                        WHERE job_id = ?""", (job_id,))
+
+def mark_store_retry(job_id, error, delay_seconds):
+    """ 로컬 저장 실패: lease를 풀고 delay_seconds 뒤에 저장만 다시 하도록 둠 """
+    with db_connection.transaction() as conn:
+        conn.execute("""UPDATE outbox SET next_attempt_at = ?, last_error = ?, claimed_by = '', claimed_at = 0,
+                        updated_at = CURRENT_TIMESTAMP WHERE job_id = ?""",
+                     (time.time() + delay_seconds, error, job_id))
+
+def mark_retry(job_id, chatroom_id, error, delay_seconds):
+    """ 실패한 작업을 delay_seconds 뒤에 다시 보내도록 queued로 되돌림 """
+    with db_connection.transaction() as conn:
+        conn.execute("""UPDATE outbox SET status = 'queued', next_attempt_at = ?, last_error = ?,
+                        updated_at = CURRENT_TIMESTAMP WHERE job_id = ?""",
+                     (time.time() + delay_seconds, error, job_id))
+        _publish_on_commit(job_id, chatroom_id, STATUS_QUEUED, error)
+
+def mark_failed(job_id, chatroom_id, error):
+    with db_connection.transaction() as conn:
+        conn.execute("""UPDATE outbox SET status = 'failed', last_error = ?, updated_at = CURRENT_TIMESTAMP
+                        WHERE job_id = ?""", (error, job_id))
+        _publish_on_commit(job_id, chatroom_id, STATUS_FAILED, error)
+
+def requeue_interrupted_jobs():
+    """
+    보내는 중에 종료된 작업(lease가 끝난 sending)을 다시 queued로 (시작 시 호출).
+    lease가 남은 작업은 다른 프로세스(리로더 등)가 아직 보내는 중일 수 있으므로 건드리지 않는다.
+    """
+    with db_connection.transaction() as conn:
+        cursor = conn.execute("""UPDATE outbox SET status = 'queued', claimed_by = '', updated_at = CURRENT_TIMESTAMP
+                                 WHERE status = 'sending' AND claimed_at < ?""", (time.time() - CLAIM_LEASE_SECONDS,))
+        return cursor.rowcount
+
+def read_job(job_id):
+    with db_connection.connect() as conn:
+        cursor = conn.cursor()
+        cursor.row_factory = dict_factory
+        cursor.execute("SELECT * FROM outbox WHERE job_id = ?", (job_id,))
+        row = cursor.fetchone()
+        cursor.close()
+    return row
@@ -0,0 +1,198 @@
+from utils.kmong_manager import db_connection
+from utils.kmong_manager.db_connection import dict_factory
+from utils.kmong_manager.db_message import MESSAGE_POSITION
+
+# GPT 추천 답변용 (고객 질문 → 내 답변) 쌍
+# 메시지를 저장할 때마다 전체 대화를 다시 읽지 않도록, 마지막으로 반영한 메시지 idx(watermark) 이후만 이어서 추출한다.
+# - 연속된 고객 메시지는 하나의 질문, 그 뒤에 이어진 내 메시지들은 하나의 답변으로 합친다.
+# - qna_chatroom_state에 채팅방별로 추출 중인 상태(마지막 화자, 답을 기다리는 질문, 이어 붙일 쌍)를 저장한다.
+
+QNA_WATERMARK_KEY = "last_message_idx"
+
+def create_qna_tables():
+    with db_connection.transaction() as conn:
+        conn.execute("""CREATE TABLE IF NOT EXISTS qna_pairs (
+                    pair_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    chatroom_id INTEGER NOT NULL,
+                    question TEXT NOT NULL,
+                    answer TEXT NOT NULL,
+                    question_idx INTEGER NOT NULL,
+                    answer_idx INTEGER NOT NULL,
+                    created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+                )""")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_qna_pairs_chatroom ON qna_pairs (chatroom_id, pair_id)")
+        conn.execute("""CREATE TABLE IF NOT EXISTS qna_chatroom_state (
+                    chatroom_id INTEGER PRIMARY KEY,
+                    last_idx INTEGER NOT NULL DEFAULT 0,
+                    last_role TEXT DEFAULT '',
+                    question TEXT DEFAULT '',
+                    question_idx INTEGER DEFAULT 0,
+                    pair_id INTEGER DEFAULT 0
+                )""")
+        conn.execute("""CREATE TABLE IF NOT EXISTS qna_index_state (
+                    key TEXT PRIMARY KEY,
+                    value INTEGER NOT NULL DEFAULT 0
+                )""")
+        # 질문 임베딩 (float32 bytes). 임베딩 모델이 바뀌면 model별로 따로 저장
+        conn.execute("""CREATE TABLE IF NOT EXISTS qna_embeddings (
+                    pair_id INTEGER NOT NULL,
+                    model TEXT NOT NULL,
+                    vector BLOB NOT NULL,
+                    PRIMARY KEY (pair_id, model)
+                ) WITHOUT ROWID""")
+
+def read_qna_watermark():
+    with db_connection.connect() as conn:
+        row = conn.execute("SELECT value FROM qna_index_state WHERE key = ?", (QNA_WATERMARK_KEY,)).fetchone()
+    return row[0] if row else 0
+
+def has_unindexed_messages():
+    """ watermark 이후 저장된 메시지가 있는지 (이벤트 없이 저장된 대화기록 동기화 포함) """
+    with db_connection.connect() as conn:
+        row = conn.execute("""SELECT COALESCE(MAX(idx), 0) >
+                                     COALESCE((SELECT value FROM qna_index_state WHERE key = ?), 0)
+                              FROM messages""", (QNA_WATERMARK_KEY,)).fetchone()
+    return bool(row[0])
+
+def _reset_stale_chatrooms(conn, watermark):
+    """
+    이어서 추출할 수 없는 채팅방을 처음부터 다시 추출하도록 초기화
+    - 이미 반영한 마지막 메시지가 지워진 채팅방
+    - 대화기록 동기화로 반영한 메시지들 사이에 새 메시지가 끼워 넣어진 채팅방 (sort_key가 있는 새 메시지)
+    :return: 초기화한 chatroom_id 목록
+    """
+    stale = [row[0] for row in conn.execute("""SELECT s.chatroom_id FROM qna_chatroom_state AS s
+                                               WHERE NOT EXISTS (SELECT 1 FROM messages AS m WHERE m.idx = s.last_idx)
+                                               UNION
+                                               SELECT chatroom_id FROM messages
+                                               WHERE idx > ? AND sort_key IS NOT NULL""", (watermark,))]
+    for chatroom_id in stale:
+        conn.execute("""DELETE FROM qna_embeddings
+                        WHERE pair_id IN (SELECT pair_id FROM qna_pairs WHERE chatroom_id = ?)""", (chatroom_id,))
+        conn.execute("DELETE FROM qna_pairs WHERE chatroom_id = ?", (chatroom_id,))
+        conn.execute("DELETE FROM qna_chatroom_state WHERE chatroom_id = ?", (chatroom_id,))
+    return stale
+
+def index_new_messages(batch_size=1000):
+    """
+    watermark 이후 저장된 메시지에서 질문/답변 쌍을 추출해 반영
+    :return: 쌍이 바뀐(추가/수정/초기화) chatroom_id 집합
+    """
+    changed = set()
+    with db_connection.transaction() as conn:
+        watermark = conn.execute("SELECT value FROM qna_index_state WHERE key = ?", (QNA_WATERMARK_KEY,)).fetchone()
+        watermark = watermark[0] if watermark else 0
+
+        stale = _reset_stale_chatrooms(conn, watermark)
+        changed.update(stale)
+
+        cursor = conn.cursor()
+        cursor.row_factory = dict_factory
+        # 초기화한 채팅방은 watermark와 상관없이 처음부터
+        stale_condition = f"OR chatroom_id IN ({', '.join('?' for _ in stale)})" if stale else ""
+        # 채팅방마다 대화 순서대로 (채팅방끼리의 순서는 상관없음)
+        cursor.execute(f"""SELECT idx, chatroom_id, client_id, sender_id, text FROM messages
+                           WHERE idx > ? {stale_condition} ORDER BY {MESSAGE_POSITION}""", [watermark] + stale)
+
+        states = {}
+        last_idx = watermark
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            for row in rows:
+                chatroom_id = row['chatroom_id']
+                state = states.get(chatroom_id)
+                if state is None:
+                    state = _read_state(conn, chatroom_id)
+                    states[chatroom_id] = state
+                if _apply_message(conn, state, row):
+                    changed.add(chatroom_id)
+                last_idx = max(last_idx, row['idx'])
+        cursor.close()
+
+        conn.executemany("""INSERT OR REPLACE INTO qna_chatroom_state
+                            (chatroom_id, last_idx, last_role, question, question_idx, pair_id)
+                            VALUES (:chatroom_id, :last_idx, :last_role, :question, :question_idx, :pair_id)""",
+                         list(states.values()))
+        conn.execute("""INSERT INTO qna_index_state (key, value) VALUES (?, ?)
+                        ON CONFLICT(key) DO UPDATE SET value = excluded.value""", (QNA_WATERMARK_KEY, last_idx))
+    return changed
+
+def _read_state(conn, chatroom_id):
+    cursor = conn.cursor()
+    cursor.row_factory = dict_factory
+    cursor.execute("SELECT * FROM qna_chatroom_state WHERE chatroom_id = ?", (chatroom_id,))
+    state = cursor.fetchone()
+    cursor.close()
+    return state or {'chatroom_id': chatroom_id, 'last_idx': 0, 'last_role': '',
+                     'question': '', 'question_idx': 0, 'pair_id': 0}
+
+def _apply_message(conn, state, message):
+    """ 메시지 하나를 채팅방 상태에 반영. 쌍이 추가/수정되면 True """
+    text = (message['text'] or '').strip()
+    role = "client" if message['client_id'] == message['sender_id'] else "me"
+    previous_role = state['last_role']
+    state['last_idx'] = message['idx']
+    if not text:
+        return False
+    state['last_role'] = role
+
+    if role == "client":
+        if previous_role == "client" and state['question']:
+            state['question'] += "\n" + text
+        else:
+            # 내 답변 뒤에 온 고객 메시지는 새 질문
+            state['question'], state['question_idx'], state['pair_id'] = text, message['idx'], 0
+        return False
+
+    if not state['question']:
+        return False  # 질문 없이 먼저 보낸 메시지
+    if previous_role == "me" and state['pair_id']:
+        conn.execute("UPDATE qna_pairs SET answer = answer || ? || ?, answer_idx = ? WHERE pair_id = ?",
+                     ("\n", text, message['idx'], state['pair_id']))
+    else:
+        cursor = conn.execute("""INSERT INTO qna_pairs (chatroom_id, question, answer, question_idx, answer_idx)
+                                 VALUES (?, ?, ?, ?, ?)""",
+                              (state['chatroom_id'], state['question'], text, state['question_idx'], message['idx']))
+        state['pair_id'] = cursor.lastrowid
+    return True
+
+def read_qna_pairs(chatroom_ids=None):
+    """ 질문/답변 쌍 조회 (chatroom_ids를 주면 해당 채팅방만) """
+    condition = ""
+    params = []
+    if chatroom_ids is not None:
+        chatroom_ids = list(chatroom_ids)
+        if not chatroom_ids:
+            return []
+        condition = f"WHERE chatroom_id IN ({', '.join('?' for _ in chatroom_ids)})"
+        params = chatroom_ids
+    with db_connection.connect() as conn:
+        cursor = conn.cursor()
+        cursor.row_factory = dict_factory
+        cursor.execute(f"""SELECT pair_id, chatroom_id, question, answer, question_idx, answer_idx
+                           FROM qna_pairs {condition} ORDER BY pair_id""", params)
+        rows = cursor.fetchall()
+        cursor.close()
+    return rows
+
+def read_qna_embeddings(model, pair_ids):
+    """ :return: {pair_id: vector bytes} (저장된 것만) """
+    pair_ids = list(pair_ids)
+    embeddings = {}
+    with db_connection.connect() as conn:
+        # SQLite 변수 개수 제한을 넘지 않도록 나눠서 조회
+        for start in range(0, len(pair_ids), 500):
+            chunk = pair_ids[start:start + 500]
+            rows = conn.execute(f"""SELECT pair_id, vector FROM qna_embeddings
+                                    WHERE model = ? AND pair_id IN ({', '.join('?' for _ in chunk)})""",
+                                [model] + chunk).fetchall()
+            embeddings.update(rows)
+    return embeddings
+
+def save_qna_embeddings(model, embeddings):
+    """ embeddings: [(pair_id, vector bytes), ...] """
+    with db_connection.transaction() as conn:
+        conn.executemany("INSERT OR REPLACE INTO qna_embeddings (pair_id, model, vector) VALUES (?, ?, ?)",
+                         [(pair_id, model, vector) for pair_id, vector in embeddings])
@@ -0,0 +1,211 @@
+import json
+import time
+from utils.kmong_manager import db_connection
+from utils.kmong_manager.db_connection import dict_factory
+
+# 텔레그램으로 보낸 알림 메시지 → 크몽 채팅방/메시지 매핑
+# 답장(reply_to_message_id)이 오면 기본키 조회 한 번으로 대상 채팅방을 찾는다.
+def create_telegram_message_map_table():
+    with db_connection.transaction() as conn:
+        conn.execute("""CREATE TABLE IF NOT EXISTS telegram_message_map (
+                    chat_id TEXT NOT NULL,
+                    telegram_message_id INTEGER NOT NULL,
+                    chatroom_id INTEGER NOT NULL,
+                    message_idx INTEGER NOT NULL,
+                    admin_id INTEGER DEFAULT 0,
+                    client_id INTEGER DEFAULT 0,
+                    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+                    PRIMARY KEY (chat_id, telegram_message_id)
+                ) WITHOUT ROWID""")
+
+def save_telegram_messages(rows):
+    """
+    rows: [(chat_id, telegram_message_id, chatroom_id, message_idx, admin_id, client_id), ...]
+    message_idx는 알림에 포함된 마지막(최신) 메시지의 idx
+    """
+    rows = [(str(row[0]),) + tuple(row[1:]) for row in rows]
+    if not rows:
+        return
+    with db_connection.transaction() as conn:
+        conn.executemany("""INSERT OR REPLACE INTO telegram_message_map
+                            (chat_id, telegram_message_id, chatroom_id, message_idx, admin_id, client_id)
+                            VALUES (?, ?, ?, ?, ?, ?)""", rows)
+
+def read_telegram_message(chat_id, telegram_message_id):
+    """ 텔레그램 메시지가 가리키는 채팅방 정보 (없으면 None) """
+    with db_connection.connect() as conn:
+        cursor = conn.cursor()
+        cursor.row_factory = dict_factory
+        cursor.execute("""SELECT * FROM telegram_message_map
+                          WHERE chat_id = ? AND telegram_message_id = ?""", (str(chat_id), telegram_message_id))
+        row = cursor.fetchone()
+        cursor.close()
+    return row
+
+# getUpdates offset과 처리한 업데이트 기록 (봇 토큰이 바뀌면 update_id도 새로 시작하므로 bot_id별로 저장)
+def create_telegram_update_tables():
+    with db_connection.transaction() as conn:
+        conn.execute("""CREATE TABLE IF NOT EXISTS telegram_update_offset (
+                    bot_id TEXT PRIMARY KEY,
+                    last_update_id INTEGER NOT NULL DEFAULT 0,
+                    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
+                )""")
+        conn.execute("""CREATE TABLE IF NOT EXISTS telegram_processed_updates (
+                    bot_id TEXT NOT NULL,
+                    update_id INTEGER NOT NULL,
+                    processed_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+                    PRIMARY KEY (bot_id, update_id)
+                ) WITHOUT ROWID""")
+
+def read_last_update_id(bot_id):
+    with db_connection.connect() as conn:
+        row = conn.execute("SELECT last_update_id FROM telegram_update_offset WHERE bot_id = ?", (bot_id,)).fetchone()
+    return row[0] if row else 0
+
+def save_last_update_id(bot_id, update_id):
+    """ offset 저장 후, 텔레그램이 더 이상 다시 보내지 않는 오래된 처리 기록 정리 (업데이트 보관 기간 24시간) """
+    with db_connection.transaction() as conn:
+        conn.execute("""INSERT INTO telegram_update_offset (bot_id, last_update_id) VALUES (?, ?)
+                        ON CONFLICT(bot_id) DO UPDATE SET last_update_id = MAX(last_update_id, excluded.last_update_id),
+                                                          updated_at = CURRENT_TIMESTAMP""", (bot_id, update_id))
+        conn.execute("DELETE FROM telegram_processed_updates WHERE processed_at < datetime('now', '-2 days')")
+
+def mark_update_processed(bot_id, update_id):
+    """
+    업데이트를 처리한 것으로 기록. 이미 처리한 업데이트면 False
+    (답장 처리와 같은 트랜잭션 안에서 호출하면 재시작/재전송 시 같은 답장을 두 번 보내지 않음)
+    """
+    with db_connection.transaction() as conn:
+        cursor = conn.execute("INSERT OR IGNORE INTO telegram_processed_updates (bot_id, update_id) VALUES (?, ?)",
+                              (bot_id, update_id))
+        return cursor.rowcount == 1
+
+# 텔레그램으로 보낼 알림 큐 (TelegramSender가 속도 제한에 맞춰 전송)
+# status: queued -> sending -> sent / (재시도 시 다시 queued) / failed
+def create_telegram_send_queue_table():
+    with db_connection.transaction() as conn:
+        conn.execute("""CREATE TABLE IF NOT EXISTS telegram_send_queue (
+                    job_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    chat_id TEXT NOT NULL,
+                    text TEXT NOT NULL,
+                    parse_mode TEXT,
+                    chatroom_id INTEGER DEFAULT 0,
+                    message_idxs TEXT DEFAULT '[]',
+                    admin_id INTEGER DEFAULT 0,
+                    client_id INTEGER DEFAULT 0,
+                    status TEXT DEFAULT 'queued',
+                    attempts INTEGER DEFAULT 0,
+                    next_attempt_at REAL DEFAULT 0,
+                    last_error TEXT DEFAULT '',
+                    telegram_message_id INTEGER,
+                    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+                    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
+                )""")
+        # 보낼 작업 찾기 / 채팅별 순서 확인
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_telegram_send_queue_status_next ON telegram_send_queue (status, next_attempt_at)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_telegram_send_queue_chat_job ON telegram_send_queue (chat_id, job_id)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_telegram_send_queue_chatroom ON telegram_send_queue (chatroom_id, job_id)")
+
+def _decode_job(job):
+    if job is not None:
+        job['message_idxs'] = json.loads(job.get('message_idxs') or '[]')
+    return job
+
+def enqueue_telegram_messages(jobs):
+    """
+    jobs: [{chat_id, text, parse_mode, chatroom_id, message_idxs, admin_id, client_id}, ...]
+    :return: job_id 목록
+    """
+    job_ids = []
+    with db_connection.transaction() as conn:
+        for job in jobs:
+            cursor = conn.execute("""INSERT INTO telegram_send_queue
+                                     (chat_id, text, parse_mode, chatroom_id, message_idxs, admin_id, client_id)
+                                     VALUES (?, ?, ?, ?, ?, ?, ?)""",
+                                  (str(job['chat_id']), job['text'], job.get('parse_mode'), job.get('chatroom_id', 0),
+                                   json.dumps(job.get('message_idxs', [])), job.get('admin_id', 0), job.get('client_id', 0)))
+            job_ids.append(cursor.lastrowid)
+    return job_ids
+
+def claim_next_telegram_job():
+    """
+    보낼 차례가 된 작업 하나를 'sending'으로 바꾸고 반환 (없으면 None).
+    같은 채팅에 먼저 들어온 작업이 아직 queued/sending이면 그 뒤의 작업은 가져가지 않는다. (알림 순서 유지)
+    """
+    sql = """SELECT * FROM telegram_send_queue AS q
+             WHERE q.status = 'queued' AND q.next_attempt_at <= ?
+               AND NOT EXISTS (SELECT 1 FROM telegram_send_queue AS p
+                               WHERE p.chat_id = q.chat_id AND p.job_id < q.job_id
+                                 AND p.status IN ('queued', 'sending'))
+             ORDER BY q.job_id
+             LIMIT 1"""
+    with db_connection.transaction() as conn:
+        cursor = conn.cursor()
+        cursor.row_factory = dict_factory
+        cursor.execute(sql, (time.time(),))
+        job = cursor.fetchone()
+        cursor.close()
+
+        if job is None:
+            return None
+
+        conn.execute("""UPDATE telegram_send_queue SET status = 'sending', attempts = attempts + 1,
+                        updated_at = CURRENT_TIMESTAMP WHERE job_id = ?""", (job['job_id'],))
+        job['status'] = 'sending'
+        job['attempts'] += 1
+    return _decode_job(job)
+
+def next_telegram_job_due_in():
+    """ 다음 queued 작업까지 남은 초 (없으면 None) """
+    with db_connection.connect() as conn:
+        row = conn.execute("SELECT MIN(next_attempt_at) FROM telegram_send_queue WHERE status = 'queued'").fetchone()
+    if row is None or row[0] is None:
+        return None
+    return max(0.0, row[0] - time.time())
+
+def mark_telegram_job_sent(job_id, telegram_message_id):
+    with db_connection.transaction() as conn:
+        conn.execute("""UPDATE telegram_send_queue SET status = 'sent', telegram_message_id = ?, last_error = '',
+                        updated_at = CURRENT_TIMESTAMP WHERE job_id = ?""", (telegram_message_id, job_id))
+
+def mark_telegram_job_retry(job_id, error, delay_seconds, count_attempt=True):
+    """
+    delay_seconds 뒤에 다시 보내도록 queued로 되돌림
+    :param count_attempt: False면 이번 시도를 시도 횟수에서 뺌 (429 전송 제한처럼 실패로 볼 수 없는 경우)
+    """
+    attempts = "attempts" if count_attempt else "MAX(attempts - 1, 0)"
+    with db_connection.transaction() as conn:
+        conn.execute(f"""UPDATE telegram_send_queue SET status = 'queued', next_attempt_at = ?, last_error = ?,
+                         attempts = {attempts}, updated_at = CURRENT_TIMESTAMP WHERE job_id = ?""",
+                     (time.time() + delay_seconds, error, job_id))
+
+def mark_telegram_job_failed(job_id, error):
+    with db_connection.transaction() as conn:
+        conn.execute("""UPDATE telegram_send_queue SET status = 'failed', last_error = ?,
+                        updated_at = CURRENT_TIMESTAMP WHERE job_id = ?""", (error, job_id))
+
+def requeue_interrupted_telegram_jobs():
+    """ 보내는 중에 종료된 작업(sending)을 다시 queued로 (시작 시 호출) """
+    with db_connection.transaction() as conn:
+        cursor = conn.execute("""UPDATE telegram_send_queue SET status = 'queued', updated_at = CURRENT_TIMESTAMP
+                                 WHERE status = 'sending'""")
+        return cursor.rowcount
+
+def read_telegram_send_status(chatroom_id=None, limit=50):
+    """
+    상태별 작업 수와 최근 작업 목록 (chatroom_id를 주면 해당 채팅방 알림만)
+    :return: {'counts': {status: n}, 'jobs': [...]}
+    """
+    condition = "WHERE chatroom_id = ?" if chatroom_id is not None else ""
+    params = (chatroom_id,) if chatroom_id is not None else ()
+    with db_connection.connect() as conn:
+        counts = dict(conn.execute(f"SELECT status, COUNT(*) FROM telegram_send_queue {condition} GROUP BY status", params).fetchall())
+        cursor = conn.cursor()
+        cursor.row_factory = dict_factory
+        cursor.execute(f"""SELECT job_id, chatroom_id, message_idxs, status, attempts, last_error,
+                                  telegram_message_id, created_at, updated_at
+                           FROM telegram_send_queue {condition}
+                           ORDER BY job_id DESC LIMIT ?""", params + (limit,))
+        jobs = [_decode_job(job) for job in cursor.fetchall()]
+        cursor.close()
+    return {'counts': counts, 'jobs': jobs}
@@ -3,9 +3,7 @@ import os
 import sys
 import traceback
 import json
-import hashlib
 import logging
-import requests
 
 import random
 
@@ -18,6 +16,7 @@ from utils.kmong_checker import dbLib
 from utils.kmong_checker.config import LOGLEVEL
 from utils.kmong_manager import db_account
 from utils.kmong_manager import db_message
+from utils.kmong_manager import db_connection
 
 from model.account_dto import AccountDTO
 from model.message_dto import MessageDTO
@@ -26,6 +25,9 @@ from model.message_dto import MessageDTO
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
 class KmongManager:
+    # check_unread_message가 한 번에 따라가는 최대 페이지 수
+    MAX_MESSAGE_PAGES = 10
+
     def __init__(self):
         pass 
 
@@ -83,8 +85,11 @@ class KmongManager:
 
         data = {"email": userid, "password": passwd, "remember": True, "next_page": "/", "is_dormant": 0}
 
+        # 재로그인은 새 쿠키 저장소에서 시작
+        networkLib.reset_session(userid)
+
         try:
-            res = networkLib.retry_req_json(url, header, [], data)
+            res = networkLib.retry_req_json(url, header, [], data, session_key=userid)
             logging.info(f"KmongManager, login // 💭 res.text = {res.text}")
 
             json_data = json.loads(res.text)
@@ -123,204 +128,221 @@ class KmongManager:
         accountList = db_account.read_all_accounts()
         return accountList
 
-    def parsingUnreadMessage(self, email, pw, cookie, data):
-        # 가장 최근 메시지
-        latest_message = data 
-
-        print(f"KmongManager, parsingUnreadMessage // 📦 json 최신 메세지 : {latest_message}")
-
-        # 메세지 id
-        kmong_message_id = latest_message.get('MID', 0)
-        message_id = kmong_message_id
-
-        # 메세지 내용
-        message_content = latest_message.get('message', '')
-
-        # 해시 처리
-        message_content_hs = message_content + email
-        test_hash = hashlib.new('shake_256')
-        test_hash.update(message_content_hs.encode('utf-8'))
-        kmong_message_id = int(test_hash.hexdigest(3), 16)
-
+    @staticmethod
+    def _message_identity(message):
+        """저장용 kmong_message_id: 크몽 MID (채팅방 안에서 유일). 없으면 0"""
+        try:
+            return int(message.get('MID', 0) or 0)
+        except (TypeError, ValueError):
+            return 0
+
+    @staticmethod
+    def _resolve_account_user_id(userid, messages):
+        """
+        계정(나)의 크몽 user id.
+        저장된 값이 없으면 메시지마다 보낸/받은 사람에 항상 들어 있는 id로 추정하고,
+        채팅방이 하나뿐이라 구분할 수 없으면 최신 메시지의 받는 사람으로 본다.
+        """
+        account = db_account.read_account_by_email(userid)
+        if account and account.get('user_id'):
+            return account['user_id']
+
+        common_ids = None
+        for message in messages:
+            ids = {str(message.get('MSGFROM', 0)), str(message.get('MSGTO', 0))}
+            common_ids = ids if common_ids is None else common_ids & ids
+        if common_ids and len(common_ids) == 1:
+            return int(next(iter(common_ids)))
+        return messages[0].get('MSGTO', 0) if messages else 0
+
+    def _to_message_dto(self, message, account_user_id):
+        """크몽 API 메시지 -> (chatroom_id, MessageDTO)"""
         # 채팅룸 id
-        chatroom_id = latest_message.get('inbox_group_id', 0)
+        chatroom_id = message.get('inbox_group_id', 0)
+
+        # 보낸 사람이 나(계정)면 받는 사람이 의뢰자
+        sender_id = message.get('MSGFROM', 0)
+        receiver_id = message.get('MSGTO', 0)
+        from_me = str(sender_id) == str(account_user_id)
+        admin_id = sender_id if from_me else receiver_id
+        client_id = receiver_id if from_me else sender_id
+
+        return chatroom_id, MessageDTO(
+            admin_id=admin_id,
+            text=message.get('message', ''),
+            client_id=client_id,
+            sender_id=sender_id,
+            replied_kmong=0,
+            replied_telegram=0,
+            kmong_message_id=self._message_identity(message),
+            seen=1 if from_me else 0,
+            date=datetime.today()
+        )
+
+    @staticmethod
+    def _page_messages(json_data):
+        """응답의 모든 dates 그룹에 있는 메시지를 최신순 그대로 펼친다"""
+        messages = []
+        for date_group in json_data.get('dates', []) or []:
+            messages.extend(date_group.get('messages') or [])
+        return messages
+
+    def _fetch_message_page(self, userid, cookies, page):
+        url = f"https://kmong.com/api/v5/user/messages?page={page}"
+
+        try:
+            res = networkLib.retry_req_get(url, self.get_header(), cookies, session_key=userid)
+            return json.loads(res.text)
+        except Exception as e:
+            logging.error(f"KmongManager, _fetch_message_page // ⛔ 메시지 요청 오류 (page={page}): {str(e)}")
+            return None
+
+    @staticmethod
+    def _new_ingest_state(account_user_id):
+        """check_unread_message 한 번 동안 페이지 사이에 이어서 쓰는 상태"""
+        return {
+            'account_user_id': account_user_id,
+            'pending_keys': set(),    # 이번에 저장할 (chatroom_id, MID)
+            'checked_rooms': set(),   # 처음 만난 채팅방인지 확인한 chatroom_id
+            'backlog_rooms': set(),   # 이후(더 오래된) 새 메시지를 지난 기록으로 볼 chatroom_id
+        }
 
-        # 내 id
-        admin_id = latest_message.get('MSGTO', 0)
+    def _collect_new_messages(self, messages, ingest):
+        """
+        최신순 messages 중 아직 저장되지 않은 메시지만 (chatroom_id, MessageDTO)로 변환.
+        지난 기록은 읽음/텔레그램 전송 완료로 저장해 새 메시지 알림으로 보내지 않는다.
+        - 이미 저장된 메시지보다 오래된 메시지
+        - 처음 저장하는 채팅방에서 가장 최근 메시지를 뺀 나머지
+        :return: (새 메시지 목록, 이미 저장된 메시지를 만났는지)
+        """
+        pending_keys = ingest['pending_keys']
+        backlog_rooms = ingest['backlog_rooms']
+        parsed = [self._to_message_dto(message, ingest['account_user_id']) for message in messages]
+        existing_keys = db_message.read_stored_kmong_message_ids(
+            (chatroom_id, message_dto.kmong_message_id) for chatroom_id, message_dto in parsed
+        )
+        # 스키마 업그레이드 전에 저장된 메시지(MID 없음)면 MID만 채우고 이미 저장된 것으로 취급
+        existing_keys |= db_message.backfill_kmong_message_ids(
+            (chatroom_id, message_dto.kmong_message_id, message_dto.sender_id, message_dto.text)
+            for chatroom_id, message_dto in parsed
+            if (chatroom_id, message_dto.kmong_message_id) not in existing_keys
+        )
+
+        new_messages = []
+        reached_stored = False
+        for chatroom_id, message_dto in parsed:
+            key = (chatroom_id, message_dto.kmong_message_id)
+            if key in existing_keys:
+                reached_stored = True
+                backlog_rooms.add(chatroom_id)
+                continue
+            if message_dto.kmong_message_id:
+                if key in pending_keys:
+                    continue
+                pending_keys.add(key)
+
+            if chatroom_id in backlog_rooms:
+                message_dto.seen = 1
+                message_dto.replied_telegram = 1
+            elif chatroom_id not in ingest['checked_rooms']:
+                ingest['checked_rooms'].add(chatroom_id)
+                if not db_message.check_chatroom_table_exists(chatroom_id):
+                    # 처음 저장하는 채팅방: 이 메시지(가장 최근)만 새 메시지로 두고 나머지는 지난 기록
+                    backlog_rooms.add(chatroom_id)
+            new_messages.append((chatroom_id, message_dto))
+        return new_messages, reached_stored
+
+    def _store_new_messages(self, new_messages):
+        """새 메시지를 오래된 것부터 하나의 트랜잭션으로 저장 (중복 MID는 DB 유일 인덱스에서 무시됨)"""
+        messages_by_chatroom = {}
+        for chatroom_id, message_dto in reversed(new_messages):
+            messages_by_chatroom.setdefault(chatroom_id, []).append(message_dto)
+
+        with db_connection.transaction():
+            for chatroom_id, message_dtos in messages_by_chatroom.items():
+                db_message.create_messages_bulk(chatroom_id, message_dtos)
 
-        # 의뢰자 id
-        client_id = latest_message.get('MSGFROM', 0)
+    def parsingUnreadMessage(self, email, pw, cookie, data):
+        """크몽 API 메시지 하나를 저장 (이미 저장된 메시지면 무시)"""
+        logging.info(f"KmongManager, parsingUnreadMessage // 📦 json 메세지 : {data}")
 
-        # client_id = latest_message.get('user', 0).get('USERID', 0)
-        logging.info(f"KmongManager, parsingUnreadMessage // ⏫ 업데이트 : email={email}, password={pw}, admin_id={admin_id}, client_id={client_id}, message={message_content}")
-        db_account.update_account(email= email, password=pw, login_cookie=cookie, user_id=admin_id)
+        account_user_id = self._resolve_account_user_id(email, [data])
+        new_messages, _ = self._collect_new_messages([data], self._new_ingest_state(account_user_id))
+        db_account.update_account(email=email, password=pw, login_cookie=cookie, user_id=account_user_id)
 
-        # chatroom_id로 된 테이블이 존재하는지?
-        if db_message.check_chatroom_table_exists(table_id=chatroom_id):
-            logging.info(f"KmongManager, parsingUnreadMessage // ✅ account_table이 존재합니다.")
+        if new_messages:
+            logging.info(f"KmongManager, parsingUnreadMessage // 🆕 새로운 메시지를 추가합니다: {data.get('MID', 0)}")
+            self._store_new_messages(new_messages)
         else:
-            logging.info(f"KmongManager, parsingUnreadMessage // ⚠️ account_table이 존재하지 않아 테이블을 추가합니다.")
-
-            # chatroom_id로 된 테이블이 없어 생성함.
-            db_message.create_chatroom_table(table_id=chatroom_id)
-
-            # chatroom 테이블에 메세지 모두 가져오기
-            existing_messages = db_message.read_all_messages(table_id=chatroom_id)
-            # 기존 메세지에서 kmong_message_id데이터들만 따로 뽑아 json리스트로 만들기.
-            existing_ids = {msg['kmong_message_id'] for msg in existing_messages}
-
-            # for문으로 돌려서 새로운 메세지의 kmong_message_id가 중복되지 않는 새로운 값인 경우
-            if message_id not in existing_ids:
-                # 새로운 메세지를 chatroom 테이블에 추가
-                logging.info(f"KmongManager, parsingUnreadMessage // 🆕 새로운 메시지를 추가합니다: {message_id}")
-                db_message.create_message(table_id=chatroom_id, message_dto=MessageDTO(
-                    admin_id=admin_id,
-                    text=message_content,
-                    client_id=client_id,
-                    sender_id=client_id,
-                    replied_kmong=0,
-                    replied_telegram=0,
-                    kmong_message_id=kmong_message_id,
-                    seen=0,
-                    date=datetime.today()
-                ))
-            else:
-                logging.info(f"KmongManager, parsingUnreadMessage // 🔁 이미 존재하는 메시지: {message_id}")                 
-                        
-                # updateChatroomList 호출하여 UI를 갱신
-                try:
-                    # UI 갱신을 위해 서버에 요청
-                    urls = ["http://127.0.0.1:7100/updateChatroomList", "http://172.30.1.22:7100/updateChatroomList"]
-                    for url in urls:
-                        try:
-                            response = requests.get(url, timeout=5)
-                            if response.status_code == 200:
-                                logging.info(f"KmongManager, parsingUnreadMessage // ✅ updateChatroomList 호출 성공")
-                                return response.json()  # 또는 response.text (필요에 따라 변경)
-                        except requests.exceptions.RequestException as e:
-                                logging.error(f"KmongManager, parsingUnreadMessage // ⛔ updateChatroomList 호출 실패: {response.status_code}")
-                        return None  # 모든 요청이 실패한 경우
-                except Exception as e:
-                    logging.error(f"KmongManager, parsingUnreadMessage // ⛔ updateChatroomList 호출 중 오류 발생: {str(e)}")            
-
-
-    def check_unread_message(self, userid, passwd, cookie_str):
-        header = self.get_header()
+            logging.info(f"KmongManager, parsingUnreadMessage // 🔁 이미 존재하는 메시지: {data.get('MID', 0)}")
+
+        # UI 갱신은 db_message가 발행하는 MessageStored 이벤트로 처리됨 (HTTP 자기호출 제거)
 
+    def check_unread_message(self, userid, passwd, cookie_str, pace=None):
+        """
+        메시지 목록을 page=1부터 읽어 모든 dates 그룹의 메시지를 수집한다.
+        이미 저장된 메시지가 나오는 페이지(또는 MAX_MESSAGE_PAGES)까지 따라가고, 새 메시지는 한 번에 저장한다.
+        :param pace: 2페이지부터 각 페이지 요청 전에 호출 (요청 간격 조절, 예: RequestPacer.wait)
+        """
         if cookie_str is None or cookie_str == '':
-            logging.warning(f"kmongLib, check_unread_message // 🍪 쿠키 없음: {userid} 사용자 쿠키가 없거나 비어있음")
+            logging.warning(f"KmongManager, check_unread_message // 🍪 쿠키 없음: {userid} 사용자 쿠키가 없거나 비어있음")
             return False
 
         try: 
             cookies = json.loads(cookie_str)
         except Exception as e:
-            logging.error(f"kmongLib, check_unread_message // ⛔ 쿠키 파싱 오류: {str(e)}")
+            logging.error(f"KmongManager, check_unread_message // ⛔ 쿠키 파싱 오류: {str(e)}")
             return False
 
-        url = f"https://kmong.com/api/v5/user/messages?page=1"  
-                  
-        try:
-            res = networkLib.retry_req_get(url, header, cookies)
-            json_data = json.loads(res.text)
-        except Exception as e:
-            logging.error(f"kmongLib, check_unread_message // ⛔ 메시지 요청 오류: {str(e)}")
+        json_data = self._fetch_message_page(userid, cookies, 1)
+        if json_data is None:
             return False
 
         # 서버로부터 받은 메시지 개수
         message_count = json_data.get('total', -1)
         if message_count == -1:
-            logging.warning(f"kmongLib, check_unread_message // ⛔ 메시지 개수 확인 실패: {userid} 사용자")
+            logging.warning(f"KmongManager, check_unread_message // ⛔ 메시지 개수 확인 실패: {userid} 사용자")
             return False
 
-        # 메시지 내용 및 ID 추출
-        message_id = 0
-        message_content = ''
-        if message_count > 0:
-            dates = json_data.get('dates', [])
-            if dates:
-                messages = dates[0].get('messages', [])
-                if messages:
-                    # 가장 최근 메시지
-                    latest_message = messages[0]
-
-                    print(f"📦 json 최신 메세지 : {latest_message}")
-
-                    # 메세지 id
-                    kmong_message_id = latest_message.get('MID', 0)
-                    message_id = kmong_message_id
-
-                    # 메세지 내용
-                    message_content = latest_message.get('message', '')
-
-                    # 해시 처리
-                    message_content_hs = message_content + userid
-                    test_hash = hashlib.new('shake_256')
-                    test_hash.update(message_content_hs.encode('utf-8'))
-                    kmong_message_id = int(test_hash.hexdigest(3), 16)
-
-                    # 채팅룸 id
-                    chatroom_id = latest_message.get('inbox_group_id', 0)
-
-                    # 내 id
-                    admin_id = latest_message.get('MSGTO', 0)
-
-                    # 의뢰자 id
-                    client_id = latest_message.get('MSGFROM', 0)
-
-                    # client_id = latest_message.get('user', 0).get('USERID', 0)
-                    logging.info(f"kmongLib, check_unread_message // ⏫ 업데이트 : email={userid}, password={passwd}, admin_id={admin_id}, client_id={client_id}, message={message_content}")
-                    db_account.update_account(email= userid, password=passwd, login_cookie=cookie_str, user_id=admin_id)
-
-                    # chatroom_id로 된 테이블이 존재하는지?
-                    if db_message.check_chatroom_table_exists(table_id=chatroom_id):
-                        logging.info(f"kmongLib, migrationDB // ✅ account_table이 존재합니다.")
-                    else:
-                        logging.info(f"kmongLib, migrationDB // ⚠️ account_table이 존재하지 않아 테이블을 추가합니다.")
-
-                        # chatroom_id로 된 테이블이 없어 생성함.
-                        db_message.create_chatroom_table(table_id=chatroom_id)
-
-                    # chatroom 테이블에 메세지 모두 가져오기
-                    existing_messages = db_message.read_all_messages(table_id=chatroom_id)
-                    # 기존 메세지에서 kmong_message_id데이터들만 따로 뽑아 json리스트로 만들기.
-                    existing_ids = {msg['kmong_message_id'] for msg in existing_messages}
-
-                    # for문으로 돌려서 새로운 메세지의 kmong_message_id가 중복되지 않는 새로운 값인 경우
-                    if message_id not in existing_ids:
-                        # 새로운 메세지를 chatroom 테이블에 추가
-                        logging.info(f"kmongLib, check_unread_message // 🆕 새로운 메시지를 추가합니다: {message_id}")
-                        db_message.create_message(table_id=chatroom_id, message_dto=MessageDTO(
-                            admin_id=admin_id,
-                            text=message_content,
-                            client_id=client_id,
-                            sender_id=client_id,
-                            replied_kmong=0,
-                            replied_telegram=0,
-                            kmong_message_id=kmong_message_id,
-                            seen=0,
-                            date=datetime.today()
-                        ))
-                    else:
-                        # kmong_message_id값이 중복된경우
-                        logging.info(f"kmongLib, check_unread_message // 🔁 이미 존재하는 메시지: {message_id}")                 
-                   
-                    # 데이터베이스 업데이트
-                    dbLib.update_message(userid, passwd, cookie_str, message_count, kmong_message_id, message_content)
-                    
-                    # updateChatroomList 호출하여 UI를 갱신
-                    try:
-                        # UI 갱신을 위해 서버에 요청
-                        urls = ["http://127.0.0.1:7100/updateChatroomList", "http://172.30.1.22:7100/updateChatroomList"]
-                        for url in urls:
-                            try:
-                                response = requests.get(url, timeout=5)
-                                if response.status_code == 200:
-                                    logging.info(f"kmongLib, check_unread_message // ✅ updateChatroomList 호출 성공")
-                                    return response.json()  # 또는 response.text (필요에 따라 변경)
-                            except requests.exceptions.RequestException as e:
-                                logging.error(f"kmongLib, check_unread_message // ⛔ updateChatroomList 호출 실패: {response.status_code}")
-                        return None  # 모든 요청이 실패한 경우
-                    except Exception as e:
-                        logging.error(f"kmongLib, check_unread_message // ⛔ updateChatroomList 호출 중 오류 발생: {str(e)}")
+        if message_count == 0:
+            return True
+
+        latest_message = None
+        new_messages = []
+        ingest = None
+        page = 1
+        while json_data is not None:
+            messages = self._page_messages(json_data)
+            if not messages:
+                break
+            if latest_message is None:
+                latest_message = messages[0]
+                ingest = self._new_ingest_state(self._resolve_account_user_id(userid, messages))
+
+            page_messages, reached_stored = self._collect_new_messages(messages, ingest)
+            new_messages.extend(page_messages)
+
+            if reached_stored or page >= self.MAX_MESSAGE_PAGES:
+                break
+            page += 1
+            if pace is not None:
+                pace()
+            json_data = self._fetch_message_page(userid, cookies, page)
+
+        if latest_message is None:
+            return True
+
+        # 내 id로 계정 정보 갱신
+        db_account.update_account(email=userid, password=passwd, login_cookie=cookie_str,
+                                  user_id=ingest['account_user_id'])
+
+        if new_messages:
+            logging.info(f"KmongManager, check_unread_message // 🆕 새로운 메시지 {len(new_messages)}개를 추가합니다: {userid} ({page}페이지 확인)")
+            self._store_new_messages(new_messages)
+        else:
+            logging.info(f"KmongManager, check_unread_message // 🔁 새로운 메시지 없음: {userid}")
+
+        # 데이터베이스 업데이트
+        dbLib.update_message(userid, passwd, cookie_str, message_count,
+                             self._message_identity(latest_message), latest_message.get('message', ''))
         return True
-   
\ No newline at end of file
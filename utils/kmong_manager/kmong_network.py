@@ -7,8 +7,7 @@ import traceback
 import json
 import requests
 import logging
-from requests.adapters import HTTPAdapter
-from urllib3.util import Retry
+from utils.kmong_checker import networkLib
 
 
 
@@ -37,99 +36,57 @@ def get_fake_headers():
 
 
 
-def retry_req_get(url, header, cookie, proxy_server=None):
+# 사람처럼 보이기 위한 요청 간격은 호출하는 쪽(kmong_poller.RequestPacer)에서 계정/호스트별로 조절한다.
+# Session(keep-alive 연결, 계정별 쿠키)은 networkLib의 레지스트리를 함께 사용한다.
+def retry_req_get(url, header, cookie, proxy_server=None, session_key=None):
     res = False
 
-    with requests.Session() as s:
-        try:
-            retries = 3
-            backoff_factor = 0.3
-            status_forcelist = (500, 502, 504)
+    try:
+        s = networkLib.get_session(session_key, networkLib.GET_RETRIES)
 
-            retry = Retry(total=retries, read=retries, connect=retries, backoff_factor=backoff_factor,
-                          status_forcelist=status_forcelist)
+        # 헤더 설정
+        if header is None:
+            header = get_fake_headers()
 
-            adapter = HTTPAdapter(max_retries=retry)
-            s.mount('http://', adapter)
-            s.mount('https://', adapter)
-
-
-            # 헤더 설정
-            if header is None:
-                header = get_fake_headers()
-
-            # 랜덤 지연시간 적용 (사람처럼 보이도록)
-            time.sleep(random.uniform(1.5, 4.0))
-
-            res = s.get(url, headers=header, cookies=cookie, proxies=proxy_server)
-        except:
-            traceback.print_exc()
+        res = s.get(url, headers=header, cookies=cookie, proxies=proxy_server)
+    except:
+        traceback.print_exc()
 
     return res
 
-def retry_req_post(url, header, cookie, data, proxy_server=None):
+def retry_req_post(url, header, cookie, data, proxy_server=None, session_key=None):
     res = False
 
-    with requests.Session() as s:
-        try:
-            retries = 5
-            backoff_factor = 0.3
-            status_forcelist = (500, 502, 504)
-
-            retry = Retry(total=retries, read=retries, connect=retries, backoff_factor=backoff_factor,
-                          status_forcelist=status_forcelist)
-
-            adapter = HTTPAdapter(max_retries=retry)
-            s.mount('http://', adapter)
-            s.mount('https://', adapter)
-
-            # 헤더 설정
-            if header is None:
-                header = get_fake_headers()
+    try:
+        s = networkLib.get_session(session_key, networkLib.POST_RETRIES)
 
-            # 랜덤 지연시간 적용
-            time.sleep(random.uniform(1.5, 4.0))
+        # 헤더 설정
+        if header is None:
+            header = get_fake_headers()
 
-            res = s.post(url, data, headers=header, cookies=cookie, proxies=proxy_server)
-        except:
-            traceback.print_exc()
+        res = s.post(url, data, headers=header, cookies=cookie, proxies=proxy_server)
+    except:
+        traceback.print_exc()
 
     return res
 
-def retry_req_json(url, header, cookie, data, proxy_server=None):
+def retry_req_json(url, header, cookie, data, proxy_server=None, session_key=None):
     res = False
 
-    header['content-type'] = 'application/json'
+    try:
+        s = networkLib.get_session(session_key, networkLib.POST_RETRIES)
 
-    with requests.Session() as s:
-        try:
-            retries = 5
-            backoff_factor = 0.3
-            status_forcelist = (500, 502, 504)
+        # 헤더 설정
+        if header is None:
+            header = get_fake_headers()
+        header['Content-Type'] = 'application/json'
 
-            retry = Retry(total=retries, read=retries, connect=retries, backoff_factor=backoff_factor,
-                          status_forcelist=status_forcelist)
+        res = s.post(url, data=json.dumps(data), headers=header, cookies=cookie, proxies=proxy_server)
 
-            adapter = HTTPAdapter(max_retries=retry)
-            s.mount('http://', adapter)
-            s.mount('https://', adapter)
+        # 응답 후 디버깅 로그 추가
+        logging.info(f"응답 상태 코드: {res.status_code}")
+        logging.info(f"응답 헤더: {res.headers}")
+    except:
+        traceback.print_exc()
 
-
-            # 헤더 설정
-            if header is None:
-                header = get_fake_headers()
-            header['Content-Type'] = 'application/json'
-
-            # 랜덤 지연시간 적용
-            time.sleep(random.uniform(1.5, 4.0))
-
-
-            res = s.post(url, data=json.dumps(data), headers=header, cookies=cookie, proxies=proxy_server)
-
-            # 응답 후 디버깅 로그 추가
-            logging.info(f"응답 상태 코드: {res.status_code}")
-            logging.info(f"응답 헤더: {res.headers}")
-        except:
-            traceback.print_exc()
-
-    return res
\ No newline at end of file
+    return res
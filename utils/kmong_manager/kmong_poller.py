@@ -0,0 +1,289 @@
+import time
+import random
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from utils.kmong_manager import db_account
+from utils.kmong_manager.kmong_manger import KmongManager
+from utils.event_bus import event_bus
+from utils.event_bus.events import MessageStored, ReplySent
+
+# 로깅 설정
+logger = logging.getLogger(__name__)
+
+KMONG_HOST = "kmong.com"
+
+
+class RequestPacer:
+    """
+    키(계정, 목적지 호스트)별로 다음 요청 가능 시각을 예약해 요청 간격을 벌린다.
+    계정 하나의 연속 요청은 사람처럼 천천히, 같은 호스트로 가는 요청은 몰리지 않을 정도로만 띄운다.
+    """
+
+    def __init__(self, account_delay=(1.5, 4.0), host_delay=(0.05, 0.3)):
+        self.account_delay = account_delay
+        self.host_delay = host_delay
+        self._next_allowed = {}
+        self._lock = threading.Lock()
+
+    def _reserve(self, key, delay_range):
+        """key의 다음 슬롯을 예약하고, 그 슬롯까지 기다려야 하는 시간을 반환"""
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_allowed.get(key, now))
+            self._next_allowed[key] = slot + random.uniform(*delay_range)
+        return slot - now
+
+    def wait(self, account, host=KMONG_HOST):
+        """account, host 양쪽 간격을 모두 만족할 때까지 대기"""
+        wait_seconds = max(
+            self._reserve(("account", account), self.account_delay),
+            self._reserve(("host", host), self.host_delay),
+        )
+        if wait_seconds > 0:
+            time.sleep(wait_seconds)
+
+
+class PollingSchedule:
+    """
+    계정별 적응형 확인 주기.
+    새 문의가 들어오거나 답장을 보낸 계정은 floor 간격으로 자주 확인하고,
+    조용한 계정은 확인할 때마다 backoff배씩 늘려 ceiling까지 늦춘다.
+    """
+
+    def __init__(self, base_interval=30, floor=15, ceiling=600, backoff=2.0):
+        self._accounts = {}
+        self._lock = threading.Lock()
+        self.configure(base_interval, floor, ceiling, backoff)
+
+    def configure(self, base_interval, floor, ceiling, backoff):
+        with self._lock:
+            self.floor = floor
+            self.ceiling = max(floor, ceiling)
+            self.backoff = max(1.0, backoff)
+            self.base_interval = min(self.ceiling, max(self.floor, base_interval))
+            for state in self._accounts.values():
+                state["interval"] = min(self.ceiling, max(self.floor, state["interval"]))
+
+    def _state(self, email, now):
+        state = self._accounts.get(email)
+        if state is None:
+            # 처음 보는 계정은 바로 확인
+            state = {"interval": self.base_interval, "next_due": now, "last_activity": None, "last_checked": None}
+            self._accounts[email] = state
+        return state
+
+    def due_accounts(self, emails):
+        """emails 중 지금 확인할 차례인 계정 목록 (목록에 없는 계정의 상태는 정리)"""
+        now = time.time()
+        with self._lock:
+            for email in set(self._accounts) - set(emails):
+                del self._accounts[email]
+            return [email for email in emails if self._state(email, now)["next_due"] <= now]
+
+    def record_poll(self, email, active):
+        """확인 결과 반영: 활동이 있으면 floor로, 없으면 backoff"""
+        now = time.time()
+        with self._lock:
+            state = self._state(email, now)
+            if active:
+                state["interval"] = self.floor
+                state["last_activity"] = now
+            else:
+                state["interval"] = min(self.ceiling, max(self.floor, state["interval"] * self.backoff))
+            state["last_checked"] = now
+            state["next_due"] = now + state["interval"]
+
+    def mark_active(self, email):
+        """폴링 밖에서 생긴 활동(답장 전송 등): 다음 확인을 floor 안으로 당긴다"""
+        now = time.time()
+        with self._lock:
+            state = self._state(email, now)
+            state["interval"] = self.floor
+            state["last_activity"] = now
+            state["next_due"] = min(state["next_due"], now + self.floor)
+
+    def snapshot(self):
+        now = time.time()
+        with self._lock:
+            return [
+                {
+                    "email": email,
+                    "interval": round(state["interval"], 1),
+                    "next_check_in": max(0, round(state["next_due"] - now, 1)),
+                    "last_activity": state["last_activity"],
+                    "last_checked": state["last_checked"],
+                }
+                for email, state in sorted(self._accounts.items())
+            ]
+
+
+class KmongPoller:
+    """
+    여러 크몽 계정의 새 메시지를 제한된 워커 풀에서 동시에 확인한다.
+    poll_due()는 PollingSchedule에서 차례가 된 계정만, poll_all()은 모든 계정을 한 번에 확인한다.
+    """
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    @classmethod
+    def get_instance(cls):
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls()
+        return cls._instance
+
+    def __init__(self, max_workers=8, pacer=None, schedule=None):
+        self.kmong_manager = KmongManager()
+        self.pacer = pacer or RequestPacer()
+        self.schedule = schedule or PollingSchedule()
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="kmong-poller")
+        self._cycle_lock = threading.Lock()
+        self._in_flight = set()
+        self._in_flight_lock = threading.Lock()
+        self._email_by_admin = {}
+        # 폴링 스레드별 현재 계정과 그 계정에서 들어온 새 문의 수
+        self._local = threading.local()
+
+        event_bus.subscribe(MessageStored, self._on_message_stored)
+        event_bus.subscribe(ReplySent, self._on_reply_sent)
+
+    def _on_message_stored(self, event):
+        if event.sender_id != event.client_id:
+            return  # 내가 보낸 메시지
+
+        if getattr(self._local, "email", None) is not None:
+            self._local.activity += 1
+            return
+
+        email = self._email_by_admin.get(str(event.admin_id))
+        if email:
+            self.schedule.mark_active(email)
+
+    def _on_reply_sent(self, event):
+        # 답장을 보낸 대화는 곧 다시 답이 올 가능성이 높음
+        email = self._email_by_admin.get(str(event.admin_id))
+        if email:
+            self.schedule.mark_active(email)
+
+    def _remember_accounts(self, accounts):
+        self._email_by_admin = {
+            str(account.get("user_id")): account.get("email", "")
+            for account in accounts if account.get("user_id")
+        }
+
+    def poll_account(self, account):
+        """계정 하나 확인 후 결과(새 문의 유무)를 확인 주기에 반영"""
+        email = account.get("email", "")
+        self._local.email = email
+        self._local.activity = 0
+        ok = False
+        try:
+            ok = self._check_account(account)
+            return ok
+        finally:
+            self.schedule.record_poll(email, active=ok and self._local.activity > 0)
+            self._local.email = None
+
+    def _check_account(self, account):
+        """저장된 쿠키로 먼저 시도하고, 실패하면 로그인 후 다시 시도"""
+        email = account.get("email", "")
+        password = account.get("password", "")
+        login_cookie = account.get("login_cookie", "")
+        # 여러 페이지를 따라갈 때도 페이지마다 같은 간격을 둠
+        pace = lambda: self.pacer.wait(email)
+
+        self.pacer.wait(email)
+        if self.kmong_manager.check_unread_message(email, password, login_cookie, pace=pace):
+            return True
+
+        logger.info(f"kmong_poller, poll_account // ⛔ 쿠키로 로그인 실패, 새로 로그인 시도: {email}")
+        self.pacer.wait(email)
+        ret, login_cookie = self.kmong_manager.login(email, password)
+        if not ret:
+            logger.error(f"kmong_poller, poll_account // ⛔ 크몽 로그인 실패: {email}")
+            return False
+
+        self.pacer.wait(email)
+        return self.kmong_manager.check_unread_message(email, password, login_cookie, pace=pace)
+
+    def poll_all(self, accounts=None):
+        """
+        모든 계정을 동시에 한 번씩 확인한다.
+        :return: 성공한 계정 수 (이전 주기가 진행 중이면 None)
+        """
+        if not self._cycle_lock.acquire(blocking=False):
+            logger.warning("kmong_poller, poll_all // ⚠️ 이전 폴링 주기가 아직 진행 중이라 이번 주기는 건너뜁니다.")
+            return None
+
+        try:
+            if accounts is None:
+                accounts = db_account.read_all_accounts()
+                self._remember_accounts(accounts)
+
+            started = time.monotonic()
+            futures = {self.executor.submit(self.poll_account, account): account for account in accounts}
+
+            success_count = 0
+            for future in as_completed(futures):
+                email = futures[future].get("email", "")
+                try:
+                    if future.result():
+                        success_count += 1
+                except Exception as e:
+                    logger.error(f"kmong_poller, poll_all // ⛔ {email} 계정 확인 중 오류: {str(e)}")
+
+            elapsed = time.monotonic() - started
+            logger.info(f"kmong_poller, poll_all // ✅ 폴링 주기 완료: {success_count}/{len(accounts)} 계정, {elapsed:.1f}s")
+            return success_count
+        finally:
+            self._cycle_lock.release()
+
+    def poll_due(self):
+        """
+        확인 주기가 돌아온 계정만 워커 풀에 넘기고 바로 반환한다. (스케줄러에서 짧은 간격으로 호출)
+        :return: 이번에 확인을 시작한 계정 수
+        """
+        accounts = db_account.read_all_accounts()
+        self._remember_accounts(accounts)
+
+        accounts_by_email = {account.get("email", ""): account for account in accounts}
+        submitted = 0
+        for email in self.schedule.due_accounts(list(accounts_by_email)):
+            with self._in_flight_lock:
+                if email in self._in_flight:
+                    continue  # 이전 확인이 아직 진행 중
+                self._in_flight.add(email)
+
+            future = self.executor.submit(self.poll_account, accounts_by_email[email])
+            future.add_done_callback(lambda f, email=email: self._on_poll_done(email, f))
+            submitted += 1
+
+        if submitted:
+            logger.info(f"kmong_poller, poll_due // ▶️ 확인 시작: {submitted}/{len(accounts)} 계정")
+        return submitted
+
+    def _on_poll_done(self, email, future):
+        with self._in_flight_lock:
+            self._in_flight.discard(email)
+        error = future.exception()
+        if error is not None:
+            logger.error(f"kmong_poller, _on_poll_done // ⛔ {email} 계정 확인 중 오류: {str(error)}")
+
+    def configure_schedule(self, refresh_interval):
+        """settings의 refreshInterval로 확인 주기 설정"""
+        adaptive = refresh_interval.get("adaptive", {})
+        self.schedule.configure(
+            base_interval=refresh_interval.get("parseUnReadMessagesinDB", 120),
+            floor=adaptive.get("floor", 15),
+            ceiling=adaptive.get("ceiling", 600),
+            backoff=adaptive.get("backoff", 2.0),
+        )
+
+    def get_cadences(self):
+        """계정별 현재 확인 주기"""
+        return self.schedule.snapshot()
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False)
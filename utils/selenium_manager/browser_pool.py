@@ -0,0 +1,192 @@
+import time
+import logging
+import threading
+from contextlib import contextmanager
+
+from utils.kmong_manager import db_account
+from utils.selenium_manager.selenium_manager import SeleniumManager
+from utils.selenium_manager.browser_profile import BrowserProfile
+from static.js.service.settings_service import SettingsService
+
+# 로깅 설정
+logger = logging.getLogger(__name__)
+
+
+class PooledBrowser:
+    """계정 하나에 묶인 로그인된 브라우저와 사용 기록"""
+
+    def __init__(self, email, profile=None):
+        self.email = email
+        self.manager = SeleniumManager(profile)
+        self.lock = threading.Lock()
+        self.uses = 0
+        self.created_at = time.time()
+        self.last_used = self.created_at
+        self.baseline_memory = 0
+        self.logged_in = False
+
+    def close(self):
+        try:
+            self.manager.close_driver()
+        except Exception as e:
+            logger.warning(f"browser_pool, PooledBrowser.close // ⚠️ {self.email} 브라우저 종료 중 오류: {str(e)}")
+
+
+class BrowserPool:
+    """
+    계정별로 로그인된 Selenium 브라우저를 띄워두고 재사용하는 풀.
+
+    - 같은 계정의 요청은 하나의 브라우저를 차례로 사용한다.
+    - 사용 전 브라우저 응답/로그인 상태를 확인하고, 끊겼으면 다시 로그인한다.
+      (account_table에 저장된 쿠키를 먼저 넣어보고, 거부되면 로그인 폼 사용)
+    - max_uses회 사용했거나 메모리가 시작 시점보다 max_memory_growth_mb 이상 늘면 브라우저를 새로 띄운다.
+    - 브라우저 수는 max_size를 넘지 않으며, 넘으면 가장 오래 쉬고 있는 브라우저를 닫는다.
+    """
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    @classmethod
+    def get_instance(cls):
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls()
+        return cls._instance
+
+    def __init__(self, max_size=3, max_uses=50, max_memory_growth_mb=300, idle_timeout=1800, profile=None):
+        self.max_size = max_size
+        self.max_uses = max_uses
+        self.max_memory_growth = max_memory_growth_mb * 1024 * 1024
+        self.idle_timeout = idle_timeout
+        self.profile = profile or BrowserProfile.from_dict(SettingsService().get_settings().get('browser'))
+        self._browsers = {}
+        self._condition = threading.Condition()
+
+    def _reap_idle(self):
+        """idle_timeout 동안 쓰이지 않은 브라우저 정리 (self._condition 잠금 상태에서 호출)"""
+        now = time.time()
+        for email, browser in list(self._browsers.items()):
+            if now - browser.last_used > self.idle_timeout and browser.lock.acquire(blocking=False):
+                del self._browsers[email]
+                browser.lock.release()
+                browser.close()
+                logger.info(f"browser_pool, _reap_idle // 💤 오래 쓰지 않은 브라우저 종료: {email}")
+
+    def _evict_one(self):
+        """사용 중이 아닌 브라우저 중 가장 오래 쉰 것을 닫는다. 닫았으면 True"""
+        idle = sorted((b for b in self._browsers.values() if not b.lock.locked()), key=lambda b: b.last_used)
+        for browser in idle:
+            if browser.lock.acquire(blocking=False):
+                del self._browsers[browser.email]
+                browser.lock.release()
+                browser.close()
+                logger.info(f"browser_pool, _evict_one // ♻️ 풀이 가득 차 브라우저 종료: {browser.email}")
+                return True
+        return False
+
+    def _checkout(self, email):
+        """email 계정의 브라우저를 잠가서 반환 (없으면 자리를 만들어 생성)"""
+        while True:
+            with self._condition:
+                self._reap_idle()
+                while True:
+                    browser = self._browsers.get(email)
+                    if browser is not None:
+                        break
+                    if len(self._browsers) < self.max_size or self._evict_one():
+                        browser = PooledBrowser(email, self.profile)
+                        self._browsers[email] = browser
+                        break
+                    # 모든 브라우저가 사용 중: 하나가 반납될 때까지 대기
+                    self._condition.wait(timeout=5)
+
+            browser.lock.acquire()
+            with self._condition:
+                if self._browsers.get(email) is browser:
+                    return browser
+            # 잠금을 기다리는 사이 풀에서 빠졌으면 다시 시도
+            browser.lock.release()
+
+    def _ensure_ready(self, browser, password):
+        """브라우저가 살아있고 로그인된 상태로 만든다"""
+        manager = browser.manager
+        if browser.logged_in and manager.is_alive() and manager.is_logged_in():
+            return
+
+        if not manager.is_alive():
+            manager.close_driver()
+            browser.logged_in = False
+
+        account = db_account.read_account_by_email(browser.email) or {}
+        stored_cookie = account.get("login_cookie") or ""
+        if not manager.login_with_cookies(stored_cookie):
+            manager.login(browser.email, password)
+        browser.logged_in = True
+
+        # 서버가 쿠키를 갱신했으면 저장 (HTTP 폴러와 다음 브라우저가 같은 세션을 사용)
+        login_cookie = manager.get_login_cookie()
+        if login_cookie and login_cookie != stored_cookie:
+            db_account.update_account(email=browser.email, login_cookie=login_cookie)
+            logger.info(f"browser_pool, _ensure_ready // 🍪 {browser.email} 로그인 쿠키 갱신")
+
+        if not browser.baseline_memory:
+            browser.baseline_memory = manager.get_memory_usage()
+
+    def _needs_recycle(self, browser):
+        if browser.uses >= self.max_uses:
+            return f"사용 횟수 {browser.uses}회"
+        if browser.baseline_memory:
+            growth = browser.manager.get_memory_usage() - browser.baseline_memory
+            if growth > self.max_memory_growth:
+                return f"메모리 {growth // (1024 * 1024)}MB 증가"
+        return None
+
+    def _discard(self, browser):
+        with self._condition:
+            if self._browsers.get(browser.email) is browser:
+                del self._browsers[browser.email]
+        browser.close()
+
+    @contextmanager
+    def session(self, email, password):
+        """
+        with pool.session(email, password) as selenium: 형태로 사용.
+        블록 안에서 오류가 나면 브라우저 상태를 알 수 없으므로 닫고 다음 요청에서 새로 띄운다.
+        """
+        browser = self._checkout(email)
+        try:
+            try:
+                self._ensure_ready(browser, password)
+                yield browser.manager
+            except Exception:
+                self._discard(browser)
+                raise
+
+            browser.uses += 1
+            browser.last_used = time.time()
+            reason = self._needs_recycle(browser)
+            if reason:
+                logger.info(f"browser_pool, session // ♻️ {email} 브라우저 재시작 ({reason})")
+                self._discard(browser)
+        finally:
+            browser.lock.release()
+            with self._condition:
+                self._condition.notify_all()
+
+    def status(self):
+        """계정별 브라우저 상태"""
+        with self._condition:
+            return [
+                {
+                    "email": browser.email,
+                    "uses": browser.uses,
+                    "busy": browser.lock.locked(),
+                    "idle_seconds": round(time.time() - browser.last_used, 1),
+                }
+                for browser in self._browsers.values()
+            ]
+
+    def close_all(self):
+        with self._condition:
+            browsers, self._browsers = list(self._browsers.values()), {}
+        for browser in browsers:
+            browser.close()
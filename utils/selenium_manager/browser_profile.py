@@ -0,0 +1,70 @@
+from dataclasses import dataclass, field, fields
+from typing import List
+
+# 크몽 페이지 동작에 필요 없는 분석/광고/채팅위젯 호스트
+DEFAULT_BLOCKED_HOSTS = [
+    "google-analytics.com",
+    "googletagmanager.com",
+    "doubleclick.net",
+    "googlesyndication.com",
+    "facebook.net",
+    "facebook.com",
+    "connect.facebook.net",
+    "analytics.tiktok.com",
+    "hotjar.com",
+    "clarity.ms",
+    "channel.io",
+    "amplitude.com",
+    "braze.com",
+    "criteo.com",
+    "wcs.naver.net",
+]
+
+IMAGE_PATTERNS = ["*.png*", "*.jpg*", "*.jpeg*", "*.gif*", "*.webp*", "*.svg*", "*.ico*"]
+MEDIA_PATTERNS = ["*.mp4*", "*.webm*", "*.mp3*", "*.m3u8*"]
+FONT_PATTERNS = ["*.woff*", "*.ttf*", "*.otf*", "*.eot*"]
+
+
+@dataclass
+class BrowserProfile:
+    """
+    Selenium 브라우저 성능 설정.
+    settings.json의 'browser' 항목으로 바꿀 수 있다. (BrowserProfile.from_dict)
+    """
+    headless: bool = True
+    page_load_strategy: str = "eager"  # DOM만 준비되면 진행 (이미지/광고 스크립트 로딩을 기다리지 않음)
+    window_width: int = 1280
+    window_height: int = 900
+    block_images: bool = True
+    block_media: bool = True
+    block_fonts: bool = True
+    block_third_party: bool = True
+    blocked_hosts: List[str] = field(default_factory=lambda: list(DEFAULT_BLOCKED_HOSTS))
+
+    @classmethod
+    def from_dict(cls, data):
+        """알 수 없는 키는 무시하고 나머지는 기본값 사용"""
+        names = {f.name for f in fields(cls)}
+        return cls(**{key: value for key, value in (data or {}).items() if key in names})
+
+    def blocked_url_patterns(self):
+        """CDP Network.setBlockedURLs에 넘길 URL 패턴 목록"""
+        patterns = []
+        if self.block_images:
+            patterns += IMAGE_PATTERNS
+        if self.block_media:
+            patterns += MEDIA_PATTERNS
+        if self.block_fonts:
+            patterns += FONT_PATTERNS
+        if self.block_third_party:
+            patterns += [f"*{host}*" for host in self.blocked_hosts]
+        return patterns
+
+    def content_prefs(self):
+        """Chrome 환경설정으로 막을 수 있는 것 (CDP보다 먼저, 요청 자체를 만들지 않음)"""
+        prefs = {}
+        if self.block_images:
+            prefs["profile.managed_default_content_settings.images"] = 2
+        if self.block_media:
+            prefs["profile.managed_default_content_settings.media_stream"] = 2
+        return prefs
@@ -0,0 +1,43 @@
+import re
+from datetime import date, timedelta
+
+# 크몽 채팅 화면의 메시지 시각 표시(CHAT_HISTORY_SCRIPT의 timestamp) -> 날짜
+# 오늘 메시지는 시각만("오후 3:21"), 이전 메시지는 날짜가 함께 표시된다.
+
+# 2024.03.05 / 2024. 3. 5. / 2024-03-05 / 2024/03/05 / 2024년 3월 5일
+_FULL_DATE = re.compile(r"(\d{4})\s*(?:[./-]|년)\s*(\d{1,2})\s*(?:[./-]|월)\s*(\d{1,2})")
+# 3월 5일 / 03.05 / 3/5 (연도 없음)
+_MONTH_DAY = re.compile(r"(?<![\d.:])(\d{1,2})\s*(?:[./]|월)\s*(\d{1,2})(?![\d:])")
+
+
+def parse_chat_timestamp(text, today=None):
+    """
+    메시지 시각 표시를 날짜로 변환
+    :param today: 기준 날짜 (테스트용, 기본값은 오늘)
+    :return: date (읽을 수 없거나 비어 있으면 None)
+    """
+    if not text:
+        return None
+    today = today or date.today()
+    text = text.strip()
+
+    try:
+        match = _FULL_DATE.search(text)
+        if match:
+            return date(int(match.group(1)), int(match.group(2)), int(match.group(3)))
+
+        if "어제" in text:
+            return today - timedelta(days=1)
+
+        match = _MONTH_DAY.search(text)
+        if match:
+            parsed = date(today.year, int(match.group(1)), int(match.group(2)))
+            # 연도가 없으면 오늘 이후일 수 없으므로 작년
+            return parsed if parsed <= today else parsed.replace(year=today.year - 1)
+    except ValueError:
+        return None
+
+    # 시각만 있으면 오늘 메시지
+    if "오늘" in text or re.search(r"\d{1,2}:\d{2}", text):
+        return today
+    return None
@@ -0,0 +1,172 @@
+import os
+import socket
+import logging
+import threading
+from datetime import date
+
+from model.message_dto import MessageDTO
+from utils.kmong_manager import db_account
+from utils.kmong_manager import db_connection
+from utils.kmong_manager import db_message
+from utils.kmong_manager import db_outbox
+from utils.event_bus import event_bus
+from utils.event_bus.events import ReplySent
+from utils.selenium_manager.browser_pool import BrowserPool
+
+# 로깅 설정
+logger = logging.getLogger(__name__)
+
+
+class OutboxWorker:
+    """
+    outbox 테이블의 작업을 꺼내 크몽 웹으로 보내는 백그라운드 워커.
+    실패하면 RETRY_BASE_SECONDS * 2^(시도횟수-1) 뒤에 다시 보내고, MAX_ATTEMPTS번 실패하면 failed로 둔다.
+    같은 채팅방의 작업은 들어온 순서대로 하나씩 처리된다. (db_outbox.claim_next_job)
+    가져간 작업에는 워커 이름과 시각(lease)을 남겨, 리로더처럼 두 프로세스가 떠 있어도 보내는 중인 작업을 다시 보내지 않는다.
+    크몽 전송이 끝나면 바로 sent로 기록하고 로컬 저장은 따로 하므로, 저장이 실패하면 저장만 다시 한다. (고객에게 두 번 보내지 않음)
+    """
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    MAX_ATTEMPTS = 4
+    RETRY_BASE_SECONDS = 10
+    IDLE_WAIT_SECONDS = 2
+
+    @classmethod
+    def get_instance(cls):
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls()
+        return cls._instance
+
+    def __init__(self, worker_count=2):
+        self.worker_count = worker_count
+        self.browser_pool = BrowserPool.get_instance()
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._threads = []
+
+        db_outbox.create_outbox_table()
+
+    def start(self):
+        if self._threads:
+            return
+        requeued = db_outbox.requeue_interrupted_jobs()
+        if requeued:
+            logger.warning(f"outbox_worker, start // ⚠️ 보내는 중 중단된 작업 {requeued}개를 다시 대기열에 넣습니다.")
+
+        self._stop.clear()
+        for i in range(self.worker_count):
+            thread = threading.Thread(target=self._run, name=f"outbox-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        logger.info(f"outbox_worker, start // ✅ 전송 워커 {self.worker_count}개 시작")
+
+    def stop(self):
+        self._stop.set()
+        self._wakeup.set()
+        self._threads = []
+
+    def enqueue(self, chatroom_id, admin_id, client_id, text, channel="web"):
+        """메시지를 대기열에 넣고 job_id 반환 (전송은 워커가 처리)"""
+        job_id = db_outbox.enqueue_message(chatroom_id, admin_id, client_id, text, channel)
+        self._wakeup.set()
+        return job_id
+
+    def get_job(self, job_id):
+        """작업 상태 (job_id, chatroom_id, status, attempts, last_error ...)"""
+        return db_outbox.read_job(job_id)
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                job = db_outbox.claim_next_job(self._worker_id())
+            except Exception as e:
+                logger.error(f"outbox_worker, _run // ⛔ 작업 조회 중 오류: {str(e)}")
+                job = None
+
+            if job is None:
+                self._wakeup.wait(timeout=self.IDLE_WAIT_SECONDS)
+                self._wakeup.clear()
+                continue
+
+            try:
+                self._process(job)
+            except Exception as e:
+                # 상태 기록 실패 등: 작업은 lease가 끝나면 다시 가져감
+                logger.error(f"outbox_worker, _run // ⛔ 작업 {job['job_id']} 처리 중 오류: {str(e)}")
+
+    @staticmethod
+    def _worker_id():
+        """작업을 가져간 워커 이름 (프로세스/스레드별)"""
+        return f"{socket.gethostname()}:{os.getpid()}:{threading.current_thread().name}"
+
+    def _process(self, job):
+        job_id = job['job_id']
+        chatroom_id = job['chatroom_id']
+        if job['status'] != db_outbox.STATUS_SENT:
+            try:
+                self._send(job)
+            except Exception as e:
+                error = str(e)
+                if job['attempts'] >= self.MAX_ATTEMPTS:
+                    db_outbox.mark_failed(job_id, chatroom_id, error)
+                    logger.error(f"outbox_worker, _process // ⛔ 작업 {job_id} 전송 실패 ({job['attempts']}회): {error}")
+                else:
+                    delay = self.RETRY_BASE_SECONDS * 2 ** (job['attempts'] - 1)
+                    db_outbox.mark_retry(job_id, chatroom_id, error, delay)
+                    logger.warning(f"outbox_worker, _process // ⚠️ 작업 {job_id} 전송 실패, {delay}초 후 재시도: {error}")
+                return
+
+            # 크몽에는 이미 보냈으므로 이후 실패는 저장만 다시 함
+            db_outbox.mark_sent(job_id, chatroom_id)
+            logger.info(f"outbox_worker, _process // ✅ 작업 {job_id} 전송 완료 (채팅방 {chatroom_id})")
+
+        try:
+            self._store(job)
+        except Exception as e:
+            db_outbox.mark_store_retry(job_id, str(e), self.RETRY_BASE_SECONDS)
+            logger.warning(f"outbox_worker, _process // ⚠️ 작업 {job_id} 저장 실패, {self.RETRY_BASE_SECONDS}초 후 저장만 재시도: {str(e)}")
+
+    def _send(self, job):
+        account = self._find_account(job['admin_id'])
+        if account is None:
+            raise ValueError(f"admin_id {job['admin_id']}의 계정을 찾을 수 없음")
+
+        with self.browser_pool.session(account['email'], account['password']) as selenium:
+            selenium.getClientChatRoom(chatroom_id=job['chatroom_id'], client_id=job['client_id'])
+            selenium.send_message(message=job['text'])
+
+    @staticmethod
+    def _store(job):
+        """보낸 메시지를 로컬 messages에 저장 (저장 완료 표시와 같은 트랜잭션이라 두 번 저장되지 않음)"""
+        from_telegram = job['channel'] == 'telegram'
+        dto = MessageDTO(
+            admin_id=job['admin_id'],
+            text=job['text'],
+            client_id=job['client_id'],
+            sender_id=job['admin_id'],
+            replied_kmong=1,
+            replied_telegram=1 if from_telegram else 0,
+            seen=1 if from_telegram else 0,
+            kmong_message_id=0,
+            date=date.today()
+        )
+
+        with db_connection.transaction():
+            db_message.create_message(table_id=job['chatroom_id'], message_dto=dto)
+            db_outbox.mark_stored(job['job_id'])
+            db_connection.on_commit(lambda: event_bus.publish(ReplySent(
+                chatroom_id=job['chatroom_id'],
+                admin_id=job['admin_id'],
+                client_id=job['client_id'],
+                text=job['text'],
+                channel=job['channel']
+            )))
+
+    @staticmethod
+    def _find_account(admin_id):
+        for account in db_account.read_all_accounts():
+            if str(account.get('user_id', '')) == str(admin_id):
+                return account
+        return None
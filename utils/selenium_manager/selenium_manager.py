@@ -4,6 +4,7 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException
 from webdriver_manager.chrome import ChromeDriverManager
 from urllib.parse import urlparse, parse_qs
 
@@ -14,21 +15,78 @@ import time
 import json
 import re
 import weakref
-import utils.kmong_manager.db_message as db_message
-
+import threading
+import psutil
+from utils.selenium_manager.browser_profile import BrowserProfile
+from utils.selenium_manager.chat_timestamp import parse_chat_timestamp
+
+
+# chromedriver 경로 (프로세스당 한 번만 설치/확인)
+_driver_path = None
+_driver_path_lock = threading.Lock()
+
+def get_driver_path():
+    global _driver_path
+    with _driver_path_lock:
+        if _driver_path is None:
+            _driver_path = ChromeDriverManager().install()
+        return _driver_path
+
+# 채팅방 메시지 목록 (li 하나가 메시지 하나, 내 메시지는 items-end)
+CHAT_LIST_SELECTOR = 'ul.flex.flex-col.overflow-y-auto'
+CHAT_SCROLL_WAIT_SECONDS = 3
+
+CHAT_ITEM_COUNT_SCRIPT = """
+const list = document.querySelector(arguments[0]);
+return list ? list.children.length : 0;
+"""
+
+CHAT_SCROLL_TOP_SCRIPT = """
+const list = document.querySelector(arguments[0]);
+if (list) list.scrollTop = 0;
+"""
+
+# 목록 전체를 한 번에 [{side, text, timestamp}]로 변환 (본문이 없는 li는 제외)
+CHAT_HISTORY_SCRIPT = """
+const list = document.querySelector(arguments[0]);
+if (!list) return [];
+const result = [];
+for (const item of list.querySelectorAll(':scope > li')) {
+    const body = item.querySelector('div[role="presentation"]');
+    if (!body) continue;
+    const time = item.querySelector('p[class*="text-[10px]"]');
+    result.push({
+        side: item.classList.contains('items-end') ? 'admin' : 'client',
+        text: body.innerText.trim(),
+        timestamp: time ? time.innerText.trim() : null
+    });
+}
+return result;
+"""
 
 
 class SeleniumManager:
-    def __init__(self):
+    def __init__(self, profile=None):
         self.driver = None
+        self.profile = profile or BrowserProfile()
 
     def _init_driver(self):
-        """WebDriver 초기화 메소드"""
+        """WebDriver 초기화 메소드 (self.profile 설정 적용)"""
+        profile = self.profile
         options = webdriver.ChromeOptions()
+        options.page_load_strategy = profile.page_load_strategy
+        if profile.headless:
+            options.add_argument("--headless=new")
         options.add_argument("--disable-gpu")  # GPU 비활성화
         options.add_argument("--no-sandbox")   # 샌드박스 모드 비활성화
-        options.add_argument("--start-maximized")  # 창 최대화
+        options.add_argument("--disable-dev-shm-usage")  # /dev/shm이 작은 서버에서 크래시 방지
+        options.add_argument("--disable-extensions")
+        options.add_argument("--mute-audio")
+        options.add_argument(f"--window-size={profile.window_width},{profile.window_height}")  # 고정 창 크기
         options.add_argument("--disable-blink-features=AutomationControlled")  # 자동화 탐지 방지
+        prefs = profile.content_prefs()
+        if prefs:
+            options.add_experimental_option("prefs", prefs)
 
         # User-Agent 설정 (브라우저처럼 보이게)
         options.add_argument("user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36")
@@ -38,7 +96,16 @@ class SeleniumManager:
         options.add_argument("Accept-Encoding: gzip, deflate, br")
         options.add_argument("Connection: keep-alive")
 
-        self.driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
+        self.driver = webdriver.Chrome(service=Service(get_driver_path()), options=options)
+
+        # 이미지/폰트/미디어/외부 추적 스크립트 요청 차단
+        patterns = profile.blocked_url_patterns()
+        if patterns:
+            try:
+                self.driver.execute_cdp_cmd("Network.enable", {})
+                self.driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": patterns})
+            except Exception as e:
+                print(f"⚠️ 요청 차단 설정 실패: {e}")
         print("✅ WebDriver 초기화 완료.")
 
     def switch_to_main_tab(self):
@@ -96,9 +163,10 @@ class SeleniumManager:
             return None
 
     def login(self, username, password):
-        """크몽 로그인 메소드"""
+        """크몽 로그인 메소드 (이미 열린 브라우저가 있으면 재사용)"""
         try:
-            self._init_driver()
+            if self.driver is None:
+                self._init_driver()
 
             self.driver.get("https://kmong.com/")
 
@@ -123,15 +191,99 @@ class SeleniumManager:
             password_input.send_keys(password)
             password_input.send_keys(Keys.RETURN)  # 로그인 버튼 대신 엔터 입력
 
+            # 로그인 모달이 닫힐 때까지 대기 (고정 sleep 대신)
+            WebDriverWait(self.driver, 10).until(
+                EC.invisibility_of_element_located((By.NAME, "password"))
+            )
             print(f"🔑 {username} 로그인 완료.")
 
             # ✅ 로그인 후 메인 탭 찾기
-            time.sleep(2)  # 크몽에서 자동으로 탭을 띄우는 시간 확보
             self.switch_to_main_tab()
         except Exception as e:
             print(f"❌ 로그인 중 오류 발생: {e}")
             raise
 
+    def login_with_cookies(self, login_cookie):
+        """
+        저장된 로그인 쿠키(account_table.login_cookie, {name: value} JSON)를 브라우저에 넣고 로그인 상태인지 확인.
+        로그인 폼을 거치지 않으므로 훨씬 빠르다. 쿠키가 없거나 만료됐으면 False.
+        """
+        if not login_cookie:
+            return False
+        try:
+            cookies = json.loads(login_cookie)
+        except (TypeError, ValueError):
+            return False
+        if not cookies:
+            return False
+
+        try:
+            if self.driver is None:
+                self._init_driver()
+
+            # 쿠키는 해당 도메인 페이지에서만 넣을 수 있음
+            if "kmong.com" not in self.driver.current_url:
+                self.driver.get("https://kmong.com/")
+            self.driver.delete_all_cookies()
+            for name, value in cookies.items():
+                self.driver.add_cookie({"name": name, "value": str(value), "domain": ".kmong.com", "path": "/"})
+            self.driver.refresh()
+
+            # 아바타(로그인됨) 또는 '로그인' 버튼(로그아웃됨) 중 하나가 뜰 때까지 대기
+            WebDriverWait(self.driver, 10).until(
+                lambda driver: driver.find_elements(By.XPATH, '//img[@alt="avatar"]')
+                or driver.find_elements(By.XPATH, "//*[text()='로그인']")
+            )
+            if self.is_logged_in():
+                print("🍪 저장된 쿠키로 로그인 완료.")
+                self.switch_to_main_tab()
+                return True
+            print("⚠️ 저장된 쿠키가 만료되었습니다.")
+            return False
+        except Exception as e:
+            print(f"❌ 쿠키 로그인 중 오류 발생: {e}")
+            return False
+
+    def get_login_cookie(self):
+        """현재 브라우저의 크몽 쿠키를 account_table.login_cookie 형식({name: value} JSON)으로 반환"""
+        try:
+            cookies = {
+                cookie["name"]: cookie["value"]
+                for cookie in self.driver.get_cookies()
+                if "kmong.com" in cookie.get("domain", "")
+            }
+        except Exception:
+            return ""
+        return json.dumps(cookies) if cookies else ""
+
+    def is_alive(self):
+        """브라우저가 아직 응답하는지 확인"""
+        if self.driver is None:
+            return False
+        try:
+            self.driver.current_url
+            return True
+        except Exception:
+            return False
+
+    def is_logged_in(self):
+        """현재 페이지에 '로그인' 버튼이 없으면 로그인 상태로 본다"""
+        try:
+            if "kmong.com" not in self.driver.current_url:
+                self.driver.get("https://kmong.com/")
+            return len(self.driver.find_elements(By.XPATH, "//*[text()='로그인']")) == 0
+        except Exception:
+            return False
+
+    def get_memory_usage(self):
+        """chromedriver와 브라우저 프로세스들의 메모리 사용량(RSS, byte)"""
+        try:
+            process = psutil.Process(self.driver.service.process.pid)
+            processes = [process] + process.children(recursive=True)
+            return sum(p.memory_info().rss for p in processes if p.is_running())
+        except Exception:
+            return 0
+
     def closeModalIfExists(self):
         """모달이 존재하면 닫기"""
         try:
@@ -176,71 +328,75 @@ class SeleniumManager:
             print(f"❌ 채팅 페이지 이동 중 오류 발생: {e}")
             raise
 
-    def getChatHistory(self, admin_id):
-            """채팅 메시지 추출 메소드"""
+    def _chat_item_count(self):
+        return self.driver.execute_script(CHAT_ITEM_COUNT_SCRIPT, CHAT_LIST_SELECTOR)
+
+    def _load_older_chat_history(self, max_rounds):
+        """채팅 목록을 맨 위로 스크롤해 이전 메시지를 덩어리 단위로 불러온다 (더 늘지 않으면 중단)"""
+        count = self._chat_item_count()
+        for _ in range(max_rounds):
+            self.driver.execute_script(CHAT_SCROLL_TOP_SCRIPT, CHAT_LIST_SELECTOR)
+            try:
+                WebDriverWait(self.driver, CHAT_SCROLL_WAIT_SECONDS, poll_frequency=0.2).until(
+                    lambda driver: self._chat_item_count() > count
+                )
+            except TimeoutException:
+                break  # 더 불러올 메시지 없음
+            count = self._chat_item_count()
+        return count
+
+    def getChatHistory(self, admin_id, load_older=True, max_scroll_rounds=20):
+            """
+            채팅 메시지 추출 메소드
+            메시지마다 WebDriver를 호출하지 않고 execute_script 한 번으로 전체 목록을 [{side, text, timestamp}]로 가져온다.
+            timestamp(화면의 시각 표시)는 메시지 날짜로 저장한다.
+            load_older가 True면 먼저 위로 스크롤해 이전 메시지를 max_scroll_rounds번까지 불러온다.
+            """
             try:
                 # ✅ 실행 전 메인 탭 유지
                 self.switch_to_main_tab()
     
                 # ul과 그 내부의 div가 로드될 때까지 대기
                 WebDriverWait(self.driver, 10).until(
-                    EC.presence_of_element_located((By.CSS_SELECTOR, 'ul.flex.flex-col.overflow-y-auto'))
+                    EC.presence_of_element_located((By.CSS_SELECTOR, CHAT_LIST_SELECTOR))
                 )
                 WebDriverWait(self.driver, 10).until(
                     EC.presence_of_element_located((By.CSS_SELECTOR, 'div.my-5.flex.flex-col.items-center.gap-y-2.text-center'))
                 )
                 print("✅ ul과 주변 div 요소 로드 완료.")
 
-                # ul 내부의 li 요소들 찾기
-                chat_items = self.driver.find_elements(By.CSS_SELECTOR, 'ul.flex.flex-col.overflow-y-auto > li')
-
-                # li가 1개 이상인지 확인
-                if len(chat_items) > 0:
-                    print(f"✅ {len(chat_items)}개의 채팅 메시지 발견.")
-                    chat_history = []
-
-                   
-                    for item in chat_items:
-                        try:
-                            # 발신자 확인 (내 메시지인지 상대방 메시지인지)
-                            sender_class = item.get_attribute("class")
-                            sender_id = admin_id if "items-end" in sender_class else self.getClientIdByURL()
-
-
-                            # 메시지 텍스트 추출
-                            text_element = item.find_element(By.CSS_SELECTOR, 'div[role="presentation"]')
-                            text = text_element.text.strip() if text_element else "내용 없음"
-
-                            # # 타임스탬프 추출
-                            # timestamp_element = item.find_element(By.CSS_SELECTOR, 'p.text-[10px].font-normal.text-gray-500')
-                            # timestamp = timestamp_element.text.strip() if timestamp_element else "시간 없음"
-
-                            # print(f" 💥 테스트용 어드민계정 : {self.getAdminId()}")
-
-                            chat_history.append(MessageDTO(
-                                admin_id=admin_id,
-                                text=text, 
-                                client_id=self.getClientIdByURL(), 
-                                sender_id=sender_id, 
-                                replied_kmong=1, 
-                                replied_telegram=1, 
-                                seen=1,
-                                kmong_message_id=0,
-                                date=date.today()
-                            ))
-                        except Exception as e:
-                            print(f"⚠️ 메시지 추출 오류 발생: {e}")
-                    return chat_history
-                else:
+                if load_older:
+                    self._load_older_chat_history(max_scroll_rounds)
+
+                items = self.driver.execute_script(CHAT_HISTORY_SCRIPT, CHAT_LIST_SELECTOR) or []
+                if not items:
                     print("⚠️ 채팅 메시지가 없습니다.")
                     return []
 
+                print(f"✅ {len(items)}개의 채팅 메시지 발견.")
+                client_id = self.getClientIdByURL()
+                chat_history = []
+                for item in items:
+                    chat_history.append(MessageDTO(
+                        admin_id=admin_id,
+                        text=item['text'],
+                        client_id=client_id,
+                        sender_id=admin_id if item['side'] == 'admin' else client_id,
+                        replied_kmong=1,
+                        replied_telegram=1,
+                        seen=1,
+                        kmong_message_id=0,
+                        # 화면에 표시된 날짜 (시각 표시가 없거나 읽을 수 없을 때만 오늘)
+                        date=parse_chat_timestamp(item.get('timestamp')) or date.today()
+                    ))
+                return chat_history
+
             except Exception as e:
                 print(f"❌ 채팅 메시지 추출 중 오류 발생: {e}")
                 raise
 
-    def send_message(self, message = str, dto = MessageDTO, chatroomID = int):
-        # 메시지를 전송하는 메소드
+    def send_message(self, message = str):
+        # 메시지를 전송하는 메소드 (로컬 저장은 호출하는 쪽(OutboxWorker)에서 따로 처리)
         try:
             # ✅ 실행 전 메인 탭 유지
             self.switch_to_main_tab()
@@ -279,24 +435,19 @@ class SeleniumManager:
                 send_button.click()
 
                 print("✅ 메시지가 성공적으로 전송되었습니다.")
-
-                # ✅ 약한 참조를 사용하여 외부 콜백 실행
-
-                db_message.create_message(
-                    table_id=chatroomID,
-                    message_dto=dto
-                )
             else:    
-                print("⚠️ 채팅 메시지가 없어 메세지를 보낼 수 없음")
+                # 조용히 넘어가면 워커가 전송 완료로 처리하므로 예외로 알려서 재시도하게 함
+                raise RuntimeError("채팅 메시지가 없어 메세지를 보낼 수 없음")
         except Exception as e:
             print(f"메시지 전송 중 오류 발생: {e}")
             raise
-        finally :
-            self.close_driver()
 
 
     def close_driver(self):
         # WebDriver 종료 메소드
         if self.driver:
-            self.driver.quit()  # WebDriver 종료
+            try:
+                self.driver.quit()  # WebDriver 종료
+            finally:
+                self.driver = None
             print("WebDriver 종료 완료.")
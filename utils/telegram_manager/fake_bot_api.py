@@ -0,0 +1,207 @@
+"""
+오프라인 테스트용 텔레그램 Bot API 대역.
+
+실제 api.telegram.org 대신 로컬에서 getMe / sendMessage / getUpdates / setWebhook / deleteWebhook 을 흉내낸다.
+settings.json 의 telegram.apiBaseUrl 을 이 서버 주소로 바꾸면 LegacyTelegramManager가 그대로 사용한다.
+
+    api = FakeBotApi(port=8081).start()
+    ...  # 앱이 알림을 보내면 api.sent_messages 에 쌓임
+    api.flood(count=3, retry_after=2)  # 다음 sendMessage 3번은 429
+    api.reply("답장 내용", reply_to_message_id=api.sent_messages[-1]['message_id'])
+
+webhook이 등록돼 있으면 reply()는 등록된 주소로 secret_token 헤더와 함께 바로 POST하고,
+없으면 getUpdates 로 가져갈 수 있게 쌓아둔다.
+
+    python -m utils.telegram_manager.fake_bot_api --port 8081
+"""
+import json
+import time
+import argparse
+import threading
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+WEBHOOK_SECRET_HEADER = "X-Telegram-Bot-Api-Secret-Token"
+
+
+class FakeBotApi:
+    def __init__(self, host="127.0.0.1", port=8081, chat_id=1000):
+        self.host = host
+        self.port = port
+        self.chat_id = chat_id
+        self.sent_messages = []
+        self.webhook_url = ""
+        self.webhook_secret = ""
+        self._pending_updates = []
+        self._next_message_id = 1
+        self._next_update_id = 1
+        self._flood_count = 0
+        self._flood_retry_after = 0
+        self._lock = threading.Lock()
+        self._server = None
+
+    @property
+    def base_url(self):
+        return f"http://{self.host}:{self.port}"
+
+    # ---- 서버 ----
+    def start(self):
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                self._handle()
+
+            def do_POST(self):
+                self._handle()
+
+            def _handle(self):
+                parsed = urlparse(self.path)
+                parts = parsed.path.strip("/").split("/")
+                if len(parts) != 2 or not parts[0].startswith("bot"):
+                    self._reply(404, {"ok": False, "error_code": 404, "description": "Not Found"})
+                    return
+                params = {key: values[-1] for key, values in parse_qs(parsed.query).items()}
+                params.update(self._body())
+                status, payload = api.call(parts[1], params)
+                self._reply(status, payload)
+
+            def _body(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                if not length:
+                    return {}
+                raw = self.rfile.read(length).decode("utf-8")
+                if "json" in (self.headers.get("Content-Type") or ""):
+                    return json.loads(raw or "{}")
+                return {key: values[-1] for key, values in parse_qs(raw).items()}
+
+            def _reply(self, status, payload):
+                body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self.port = self._server.server_address[1]
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    # ---- Bot API 메소드 ----
+    def call(self, method, params):
+        handler = getattr(self, f"_api_{method}", None)
+        if handler is None:
+            return 404, {"ok": False, "error_code": 404, "description": f"Method {method} not found"}
+        return handler(params)
+
+    def _api_getMe(self, params):
+        return 200, {"ok": True, "result": {"id": 1, "is_bot": True, "username": "fake_kmong_bot"}}
+
+    def _api_sendMessage(self, params):
+        with self._lock:
+            if self._flood_count > 0:
+                self._flood_count -= 1
+                return 429, {"ok": False, "error_code": 429,
+                             "description": f"Too Many Requests: retry after {self._flood_retry_after}",
+                             "parameters": {"retry_after": self._flood_retry_after}}
+            message = {
+                "message_id": self._next_message_id,
+                "date": int(time.time()),
+                "chat": {"id": int(params.get("chat_id", self.chat_id))},
+                "from": {"id": 1, "is_bot": True, "username": "fake_kmong_bot"},
+                "text": params.get("text", ""),
+            }
+            self._next_message_id += 1
+            self.sent_messages.append(message)
+        return 200, {"ok": True, "result": message}
+
+    def _api_getUpdates(self, params):
+        if self.webhook_url:
+            return 409, {"ok": False, "error_code": 409,
+                         "description": "Conflict: can't use getUpdates method while webhook is active"}
+        offset = int(params.get("offset", 0) or 0)
+        with self._lock:
+            # offset 이전 업데이트는 확인된 것으로 보고 버림 (실제 API와 동일)
+            self._pending_updates = [u for u in self._pending_updates if u["update_id"] >= offset]
+            return 200, {"ok": True, "result": list(self._pending_updates)}
+
+    def _api_setWebhook(self, params):
+        self.webhook_url = params.get("url", "")
+        self.webhook_secret = params.get("secret_token", "")
+        return 200, {"ok": True, "result": True, "description": "Webhook was set"}
+
+    def _api_deleteWebhook(self, params):
+        self.webhook_url = ""
+        self.webhook_secret = ""
+        return 200, {"ok": True, "result": True, "description": "Webhook was deleted"}
+
+    # ---- 테스트용: 전송 제한(429) 흉내 ----
+    def flood(self, count=1, retry_after=1):
+        """ 다음 sendMessage count번을 429 Too Many Requests (retry_after초)로 거절 """
+        with self._lock:
+            self._flood_count = count
+            self._flood_retry_after = retry_after
+
+    # ---- 테스트용: 사용자가 텔레그램에서 답장한 것처럼 ----
+    def reply(self, text, reply_to_message_id, chat_id=None):
+        """
+        사용자 답장 업데이트 생성. webhook이 있으면 바로 전달하고 HTTP 상태 코드를 반환, 없으면 getUpdates 대기열에 넣고 None 반환
+        """
+        chat_id = chat_id if chat_id is not None else self.chat_id
+        with self._lock:
+            original = next((m for m in self.sent_messages if m["message_id"] == reply_to_message_id), None)
+            update = {
+                "update_id": self._next_update_id,
+                "message": {
+                    "message_id": self._next_message_id,
+                    "date": int(time.time()),
+                    "chat": {"id": chat_id},
+                    "from": {"id": 42, "is_bot": False, "first_name": "Tester", "username": "tester"},
+                    "text": text,
+                    "reply_to_message": original or {"message_id": reply_to_message_id},
+                },
+            }
+            self._next_update_id += 1
+            self._next_message_id += 1
+            if not self.webhook_url:
+                self._pending_updates.append(update)
+                return None
+
+        request = urllib.request.Request(
+            self.webhook_url,
+            data=json.dumps(update).encode("utf-8"),
+            headers={"Content-Type": "application/json", WEBHOOK_SECRET_HEADER: self.webhook_secret},
+            method="POST",
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=10) as response:
+                return response.status
+        except urllib.error.HTTPError as e:
+            return e.code
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="오프라인 테스트용 텔레그램 Bot API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    args = parser.parse_args()
+
+    api = FakeBotApi(host=args.host, port=args.port).start()
+    print(f"✅ Fake Bot API 실행 중: {api.base_url} (settings.json telegram.apiBaseUrl 에 입력)")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        api.stop()
@@ -3,14 +3,21 @@ import telebot
 import logging
 import threading
 import time
+import secrets
 import traceback
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, wait
 from datetime import datetime, date
+from itertools import groupby
 from utils.kmong_checker import dbLib
 from utils.kmong_checker import kmongLib
 from utils.kmong_manager import kmong_manger
 from utils.kmong_manager import db_message
 from utils.kmong_manager import db_account
+from utils.kmong_manager import db_telegram
+from utils.kmong_manager import db_connection
 from static.js.service.settings_service import SettingsService
+from utils.telegram_manager.telegram_sender import TelegramSender
 
 
 
@@ -23,6 +30,17 @@ logger = logging.getLogger(__name__)
 
 # 전역 봇 인스턴스
 bot = None
+
+# 텔레그램 메시지 최대 길이
+TELEGRAM_MESSAGE_LIMIT = 4096
+
+TELEGRAM_API_BASE_URL = "https://api.telegram.org"
+
+# webhook 요청에 텔레그램이 붙여주는 secret_token 헤더
+WEBHOOK_SECRET_HEADER = "X-Telegram-Bot-Api-Secret-Token"
+
+# 서로 다른 채팅방의 답장을 동시에 처리할 스레드 수
+REPLY_LANE_WORKERS = 4
  
 class LegacyTelegramManager:
     _instance = None
@@ -49,14 +67,35 @@ class LegacyTelegramManager:
         # 인자 값이 없으면 설정에서 불러오기
         self.token = token or settings.get('telegram', {}).get('botToken', '')
         self.chat_id = chat_id or settings.get('telegram', {}).get('chatId', '')
+        # 채팅방별 새 메시지를 하나로 묶어서 보낼지 여부
+        self.digest = settings.get('telegram', {}).get('digest', True)
         
-        self.base_url = f"https://api.telegram.org/bot{self.token}" if self.token else ""
-        self.last_update_id = 0  # 마지막으로 처리한 update_id
+        # Bot API 주소 (오프라인 테스트 시 fake_bot_api 주소로 변경)
+        self.api_base_url = settings.get('telegram', {}).get('apiBaseUrl', '') or TELEGRAM_API_BASE_URL
+        self.base_url = f"{self.api_base_url}/bot{self.token}" if self.token else ""
+        self.bot_id = self.token.split(':')[0] if self.token else ""
         self.polling_thread = None
         self.stop_polling = False
         self.polling_lock = threading.Lock()
         self.is_polling = False
+
+        # webhook 모드: /api/telegram/webhook 으로 받은 업데이트도 같은 lane으로 처리
+        # 토큰/채팅 ID 변경으로 인스턴스를 다시 만들어도 저장된 설정으로 webhook 요청을 계속 받는다.
+        webhook = settings.get('telegram', {}).get('webhook', {}) or {}
+        self.webhook_mode = bool(webhook.get('enabled') and webhook.get('url') and webhook.get('secret'))
+        self.webhook_secret = webhook.get('secret', '') if self.webhook_mode else ""
+
+        # 답장 처리 lane: 같은 채팅방의 답장은 순서대로, 다른 채팅방끼리는 동시에
+        self._lanes = {}
+        self._lanes_lock = threading.Lock()
+        self._lane_executor = ThreadPoolExecutor(max_workers=REPLY_LANE_WORKERS, thread_name_prefix="telegram-reply")
         
+        # 텔레그램 메시지 → 채팅방 매핑, getUpdates offset, 알림 전송 큐 테이블
+        db_telegram.create_telegram_message_map_table()
+        db_telegram.create_telegram_update_tables()
+        db_telegram.create_telegram_send_queue_table()
+        self.last_update_id = db_telegram.read_last_update_id(self.bot_id)  # 마지막으로 처리한 update_id (재시작해도 유지)
+
         # 봇 초기화
         self._initialize_bot()
         
@@ -80,7 +119,9 @@ class LegacyTelegramManager:
                 except:
                     pass
 
-            # 새 봇 인스턴스 생성
+            # 새 봇 인스턴스 생성 (Bot API 주소를 바꾼 경우 telebot에도 적용)
+            if self.api_base_url != TELEGRAM_API_BASE_URL:
+                telebot.apihelper.API_URL = f"{self.api_base_url}/bot{{0}}/{{1}}"
             bot = telebot.TeleBot(self.token)
             
             # 명령어 핸들러 등록
@@ -194,11 +235,7 @@ class LegacyTelegramManager:
             logger.error("legacy_telegram_manager, send_message // ⛔ 채팅 ID가 설정되지 않았습니다.")
             return False
             
-        message_text = (
-            f"🔔 Kmong 새 메세지 알림({chatroom_id}) 🔔\n"
-            f"✉️ {email} ({messageCount}/{messageTotalCount}) \n"
-            f"💬 {message}"
-        )
+        message_text = self._format_message(email, messageCount, messageTotalCount, message, chatroom_id)
         
         try:
             # 메시지 전송
@@ -215,61 +252,87 @@ class LegacyTelegramManager:
             traceback.print_exc()
             return False
 
-    # 새 메시지 모두 텔레그램으로 전송   
+    # 알림 한 개의 본문
+    @staticmethod
+    def _format_message(email, messageCount, messageTotalCount, message, chatroom_id):
+        return (
+            f"🔔 Kmong 새 메세지 알림({chatroom_id}) 🔔\n"
+            f"✉️ {email} ({messageCount}/{messageTotalCount}) \n"
+            f"💬 {message}"
+        )
+
+    # 채팅방 하나의 새 메시지를 한 알림으로 묶음 (텔레그램 길이 제한을 넘으면 나눔)
+    @staticmethod
+    def _digest_chunks(email, chatroom_id, messages):
+        """
+        :return: [(본문, 그 본문에 들어간 메시지 목록), ...]
+        """
+        header = (
+            f"🔔 Kmong 새 메세지 알림({chatroom_id}) 🔔\n"
+            f"✉️ {email} (새 메시지 {len(messages)}개)"
+        )
+        chunks = []
+        current, current_messages = header, []
+        for message in messages:
+            line = f"\n💬 {message.get('text', '')}"
+            if len(current) + len(line) > TELEGRAM_MESSAGE_LIMIT and current_messages:
+                chunks.append((current, current_messages))
+                current, current_messages = header, []
+            current += line[:TELEGRAM_MESSAGE_LIMIT - len(header)]
+            current_messages.append(message)
+        chunks.append((current, current_messages))
+        return chunks
+
+    # 새 메시지 모두 텔레그램 전송 큐에 넣음 (실제 전송은 TelegramSender가 속도 제한에 맞춰 처리)
     def sendNewMessageByTelegram(self):  
         try:
             logger.info("lagacy_telegram_manager, sendNewMessageByTelegram // ▶️ 새 메시지 텔레그램 전송 시작")
-            # 전송된 메시지 수 추적
-            getMessageCount = 0
 
-            # 1. 모든 테이브의 데이터를 가져오기 위해 user_id부터 접근                                                                                                                                                                                                                                                                                                                                                                                                                
-            accountList = self.kmongLibInstance.readAccountList()
-            sent_count = 0
-            
-            for account in accountList:
-                try:
-                    user_id = account.get("user_id", "")
-                    getEmail = account.get("email", "")
-
-                    # user_id가 없는 계정은 건너뜀
-                    if not user_id:
-                        continue  
-
-                    # 2. user_id로 모든 테이블에 접근하여 seen이 0인 모델을 가져온다.
-                    messages = db_message.read_all_messages(table_id=user_id)
-
-                    getMessageTotalCount = 0
-                    for message in messages:
-                        if(message.get("seen", 0) == 0 and message.get("replied_telegram", 0) == 0):
-                            getMessageTotalCount += 1
-
-                    for message in messages:
-                        if(message.get("seen", 0) == 0 and message.get("replied_telegram", 0) == 0):
-                            getMessageCount += 1
-                            getMessage = message.get("text", "")
-                            # 3. 메세지 보내기
-                            result = self.send_message(
-                                email=getEmail, 
-                                messageCount=getMessageCount, 
-                                messageTotalCount=getMessageTotalCount, 
-                                chatroom_id=user_id,
-                                message=getMessage
-                                )
-
-                            if result:
-                                sent_count += 1
-                                # 4. replied_telegram = 1 으로 변경
-                                db_message.update_message(
-                                    table_id=user_id,
-                                    message_id=message.get("idx"),  # idx가 메시지 ID
-                                    replied_telegram=1  # telegram으로 응답 상태를 1로 설정
-                                )
-                                logger.info(f"lagacy_telegram_manager, sendNewMessageByTelegram // ✅ 메시지 ID `{message.get('idx')}`의 텔레그램 응답 상태 업데이트 완료")
-                except Exception as e:
-                    logger.error(f"lagacy_telegram_manager, sendNewMessageByTelegram // ⛔ 계정 {account.get('email', '알 수 없음')} 처리 중 오류: {str(e)}")
-                    continue
-            
-            logger.info(f"lagacy_telegram_manager, sendNewMessageByTelegram // ✅ 총 {sent_count}개의 메시지 전송 완료")
+            if not self.chat_id:
+                logger.error("legacy_telegram_manager, sendNewMessageByTelegram // ⛔ 채팅 ID가 설정되지 않았습니다.")
+                return False
+
+            # 1. 모든 채팅방에서 보낼 고객 메시지(seen = 0, replied_telegram = 0, 내가 보낸 답장 제외)를 한 번에 조회 (chatroom_id, idx 순)
+            pending_messages = db_message.read_unread_messages()
+            if not pending_messages:
+                return True
+
+            email_by_admin = {
+                str(account.get("user_id", "")): account.get("email", "")
+                for account in self.kmongLibInstance.readAccountList()
+            }
+
+            # 2. 채팅방별로 알림 작성 (digest 설정이 꺼져 있으면 메시지마다 알림 하나)
+            jobs = []
+            for chatroom_id, room_messages in groupby(pending_messages, key=lambda m: m.get("chatroom_id")):
+                room_messages = list(room_messages)
+                email = email_by_admin.get(str(room_messages[0].get("admin_id", "")), "")
+                if self.digest:
+                    chunks = self._digest_chunks(email, chatroom_id, room_messages)
+                else:
+                    chunks = [
+                        (self._format_message(email, count, len(room_messages), message.get("text", ""), chatroom_id), [message])
+                        for count, message in enumerate(room_messages, start=1)
+                    ]
+                for text, chunk_messages in chunks:
+                    jobs.append({
+                        "chat_id": self.chat_id,
+                        "text": text,
+                        "chatroom_id": chatroom_id,
+                        "message_idxs": [message.get("idx") for message in chunk_messages],
+                        "admin_id": chunk_messages[-1].get("admin_id", 0),
+                        "client_id": chunk_messages[-1].get("client_id", 0)
+                    })
+
+            # 3. 큐에 넣고 replied_telegram = 1 로 변경 (같은 트랜잭션: 다음 주기에 같은 메시지를 다시 넣지 않음)
+            queued_idxs = [idx for job in jobs for idx in job["message_idxs"]]
+            with db_connection.transaction():
+                db_telegram.enqueue_telegram_messages(jobs)
+                db_message.update_messages(table_id=None, message_ids=queued_idxs, replied_telegram=1)
+
+            TelegramSender.get_instance().wake()
+
+            logger.info(f"lagacy_telegram_manager, sendNewMessageByTelegram // ✅ 알림 {len(jobs)}개 (메시지 {len(queued_idxs)}개) 전송 대기열에 추가")
             return True
         except Exception as e:
             logger.error(f"lagacy_telegram_manager, sendNewMessageByTelegram // ⛔ 메시지 전송 중 오류 발생: {str(e)}")
@@ -277,10 +340,11 @@ class LegacyTelegramManager:
             return False
 
     # 텔레그램 답장 처리 및 DB 업데이트
-    def replyByTelegram(self):
+    def replyByTelegram(self, reply_info=None):
         try:
-            # 텔레그램에서 답장 확인
-            reply_info = self.listen_for_replies()
+            # 인자가 없으면 텔레그램에서 답장을 가져와 모두 처리 (스케줄러에서 호출)
+            if reply_info is None:
+                return bool(self.listen_for_replies())
             
             if not reply_info:
                 # 새 답장이 없으면 종료
@@ -295,71 +359,22 @@ class LegacyTelegramManager:
             logger.info(f"원본 메시지 ID: {reply_info['reply_to_message_id']}")
             logger.info("=" * 20)
             
-            # 원본 메시지 ID
-            original_message_id = reply_info['reply_to_message_id']
-            
-            # 모든 채팅방 테이블 조회
-            chatroom_tables = db_message.read_all_chatroom_tables()
-            
-            found = False
-            admin_id = None
-            client_id = None
-            original_message = None
-            found_table_id = None
-
-            # 각 채팅방에서 원본 메시지 찾기
-            for table_name in chatroom_tables:
-                # 테이블 ID 추출 (chatroom_123 => 123)
-                if not table_name.startswith('chatroom_'):
-                    continue
-                    
-                table_id = int(table_name.split('_')[1])
-                
-                # 테이블이 존재하는지 확인
-                if not db_message.check_chatroom_table_exists(table_id):
-                    continue
-                
-                # 해당 테이블의 모든 메시지 조회
-                try:
-                    messages = db_message.read_all_messages(table_id)
-                    
-                    # kmong_message_id가 원본 메시지 ID와 일치하는 메시지 찾기
-                    for message in messages:
-                        # 메시지 ID 매칭 (여러 가능한 필드 확인)
-                        if (message.get('kmong_message_id') == original_message_id or 
-                            message.get('idx') == original_message_id):
-                            
-                            # 메시지 찾음 - 상태 업데이트 및 정보 저장
-                            admin_id = message.get('admin_id')
-                            client_id = message.get('client_id')
-                            original_message = message
-                            found_table_id = table_id
-                            found = True
-                            
-                            # 원본 메시지 상태 업데이트
-                            db_message.update_message(
-                                table_id=table_id,
-                                message_id=message.get('idx'),
-                                seen=1,                   # 읽음 표시
-                                replied_telegram=1        # 텔레그램 답장 표시
-                            )
-                            
-                            logger.info(f"lagacy_telegram_manager, replyByTelegram // ✅ 메시지 상태 업데이트 완료: 테이블 ID {table_id}, 메시지 ID {message.get('idx')}")
-                            break
-                    
-                    if found:
-                        break
-                        
-                except Exception as e:
-                    logger.error(f"lagacy_telegram_manager, replyByTelegram // ⛔ 테이블 {table_name} 처리 중 오류: {str(e)}")
-                    continue
-            
-            if found:
-                logger.info(f"lagacy_telegram_manager, replyByTelegram // ✅ 텔레그램 답장 처리 완료: {reply_info['text']}")
-                return True
-            else:
-                logger.warning(f"lagacy_telegram_manager, replyByTelegram // ⛔ 원본 메시지를 찾을 수 없습니다. 메시지 ID: {original_message_id}")
+            # listen_for_replies에서 매핑 테이블로 찾은 원본 메시지
+            chatroom_id = reply_info.get('chatroom_id')
+            message_idx = reply_info.get('message_idx')
+            if not chatroom_id or not message_idx:
+                logger.warning(f"lagacy_telegram_manager, replyByTelegram // ⛔ 원본 메시지를 찾을 수 없습니다. 메시지 ID: {reply_info['reply_to_message_id']}")
                 return False
+
+            # 원본 메시지 상태 업데이트 (읽음, 텔레그램 답장 표시)
+            db_message.update_messages(
+                table_id=chatroom_id,
+                message_ids=[message_idx],
+                seen=1,
+                replied_telegram=1
+            )
+            logger.info(f"lagacy_telegram_manager, replyByTelegram // ✅ 텔레그램 답장 처리 완료: 채팅방 ID {chatroom_id}, 메시지 ID {message_idx}")
+            return True
                 
         except Exception as e:
             logger.error(f"lagacy_telegram_manager, replyByTelegram // ⛔ 텔레그램 답장 처리 중 오류 발생: {str(e)}")
@@ -369,13 +384,24 @@ class LegacyTelegramManager:
     # 텔레그램 답장 모니터링 시작
     def prepareObserving(self):
         try:
+            # webhook 설정이 켜져 있으면 폴링 대신 webhook으로 받음
+            settings_service = SettingsService()
+            webhook = settings_service.get_settings().get('telegram', {}).get('webhook', {})
+            if webhook.get('enabled') and webhook.get('url'):
+                ok, secret = self.set_webhook(webhook['url'], webhook.get('secret'))
+                if ok:
+                    if secret != webhook.get('secret'):
+                        settings_service.update_telegram_webhook(True, webhook['url'], secret)
+                    logger.info("lagacy_telegram_manager, prepareObserving // ▶️ 텔레그램 답장 모니터링 시작 (webhook)")
+                    return True
+                logger.warning("lagacy_telegram_manager, prepareObserving // ⚠️ webhook 설정 실패, 폴링으로 진행합니다.")
+                self.webhook_mode = False
+                self.webhook_secret = ""
+
             # 답장 처리 폴링 시작
             def on_reply_received(reply_info):
-                try:
-                    self.replyByTelegram()
-                except Exception as e:
-                    logger.error(f"lagacy_telegram_manager, prepareObserving // ⛔ 답장 처리 콜백 오류: {str(e)}")
-                    traceback.print_exc()
+                # 답장 처리(크몽 전송 예약, 원본 메시지 갱신)는 listen_for_replies에서 끝난 상태
+                logger.info(f"lagacy_telegram_manager, prepareObserving // ✅ 답장 처리 완료: 채팅방 ID {reply_info.get('chatroom_id')}")
             
             # 답장 폴링 시작 (10초 간격으로 변경 - 더 넓은 간격으로 설정해 충돌 가능성 감소)
             self.start_reply_polling(interval=10, callback=on_reply_received)
@@ -427,14 +453,15 @@ class LegacyTelegramManager:
     
     def listen_for_replies(self):
         """
-        텔레그램 봇에 대한 답장을 확인합니다.
+        텔레그램 봇에 대한 답장을 확인하고, 가져온 업데이트를 모두 순서대로 처리합니다.
+        채팅방별 lane에서 처리가 끝난 뒤에 offset을 DB에 저장하므로 재시작해도 답장을 잃거나 다시 읽지 않습니다.
         
         Returns:
-            dict or None: 답장 메시지 정보 (없으면 None)
+            list: 처리한 답장 정보 목록 (없으면 빈 리스트)
         """
         if self.is_polling:
             logger.debug("이미 폴링 중입니다. 건너뜁니다.")
-            return None
+            return []
            
         try:
             self.is_polling = True
@@ -443,116 +470,184 @@ class LegacyTelegramManager:
             updates = self.get_updates()
             
             if not updates:
-                self.is_polling = False
-                return None
-            
-            # 마지막 업데이트 처리
-            latest_update = updates[-1]
-            self.last_update_id = latest_update.get('update_id', self.last_update_id)
-            
-            # 메시지가 없으면 처리 중단
-            if 'message' not in latest_update:
-                self.is_polling = False
-                return None
-            
-            message = latest_update['message']
-            
-            # 답장이 아니면 None 반환
-            if 'reply_to_message' not in message:
-                self.is_polling = False
-                return None
-            
-            # 사용자 정보 추출
-            from_user = message.get('from', {})
-            
-            # 답장 정보 추출
-            reply_info = {
-                'message_id': message.get('message_id'),
-                'chat_id': message.get('chat', {}).get('id'),
-                'user_id': from_user.get('id'),
-                'username': from_user.get('username', ""),
-                'first_name': from_user.get('first_name', ""),
-                'last_name': from_user.get('last_name', ""),
-                'text': message.get('text', ""),
-                'date': message.get('date'),
-                'reply_to_message_id': message.get('reply_to_message', {}).get('message_id')
-            }
-            
-            # 로그 출력
-            logger.info(f"lagacy_telegram_manager, listen_for_replies // 🔍 답장 정보: {reply_info}")
-
-            # 원본 메시지 텍스트 가져오기
-            original_message_text = message.get('reply_to_message', {}).get('text', "")
+                return []
             
-            # 메타데이터 추출
-            # 원본 메시지에서 이메일과 채팅방 ID 추출
-            # 형식: "🔔 Kmong 새 메세지 알림 🔔\n\n✉️ email@example.com\n💬 (1): 메시지 내용\n\n채팅방 ID: 123"
-
-            import re
-            chatroom_id_match = re.search(r"🔔 Kmong 새 메세지 알림\((\d+)\) 🔔", original_message_text)
+            dispatched = [self.dispatch_update(update) for update in updates]
+            wait([future for future in dispatched if future is not None])
 
-            if chatroom_id_match:
-                chatroom_id = int(chatroom_id_match.group(1))
-                
-                # 해당 채팅방의 메시지 가져오기
-                messages = db_message.read_all_messages(table_id=chatroom_id)
-                if messages:
-                    # 최신 메시지에서 필요한 정보 추출
-                    recent_messages = sorted(messages, key=lambda m: m.get('idx', 0), reverse=True)
-                    latest_message = recent_messages[0]
-                    
-                    admin_id = latest_message.get('admin_id')
-                    client_id = latest_message.get('client_id')
-                    
-                    # 새 메시지 DTO 생성
-                    from datetime import date
-                    from model.message_dto import MessageDTO
-                    
-                    reply_dto = MessageDTO(
-                        admin_id=admin_id,
-                        text=reply_info['text'],
-                        client_id=client_id,
-                        sender_id=admin_id,  # 답장은 관리자가 보낸 것으로 설정
-                        replied_kmong=0,     # 아직 크몽에는 반영되지 않음
-                        replied_telegram=1,  # 텔레그램으로 응답함
-                        seen=1,              # 이미 읽은 상태
-                        kmong_message_id=0,  # 크몽 메시지 ID는 0으로 설정
-                        date=date.today()    # 현재 날짜
-                    )
-
-            # 셀레니움 웹으로도 보내기
-            from utils.selenium_manager.selenium_manager import SeleniumManager
-            selenium = SeleniumManager()
-
-            accounts = db_account.read_all_accounts()
-            for account in accounts:
-                if(account.get("user_id", "") == chatroom_id):
-                    # 1) Login to Kmong
-                    selenium.login(
-                        account.get("email"), 
-                        account.get("password")
-                    )
-
-                    # 2) Navigate to chatroom
-                    selenium.getClientChatRoom(chatroom_id=chatroom_id, client_id=client_id)
-
-                    # 3) Create message DTO and send message
-                    selenium.send_message(
-                        message=reply_dto.text, 
-                        dto=reply_dto,
-                        chatroomID=chatroom_id
-                    )
-            
-            logger.info(f"lagacy_telegram_manager, listen_for_replies // ✅ 텔레그램 답장이 DB에 저장되었습니다. 채팅방 ID: {chatroom_id}")
+            # 배치 전체가 처리된 뒤 offset 저장
+            self.last_update_id = max(update.get('update_id', 0) for update in updates)
+            db_telegram.save_last_update_id(self.bot_id, self.last_update_id)
 
-            self.is_polling = False
-            return reply_info
+            replies = [future.result() for future in dispatched if future is not None and future.result()]
+            if replies:
+                logger.info(f"lagacy_telegram_manager, listen_for_replies // ✅ 업데이트 {len(updates)}개 중 답장 {len(replies)}개 처리")
+            return replies
         except Exception as e:
             logger.error(f"답장 확인 중 오류 발생: {str(e)}")
             traceback.print_exc()
+            return []
+        finally:
             self.is_polling = False
+
+    def dispatch_update(self, update):
+        """
+        업데이트를 답장 대상 채팅방의 lane에 넣습니다.
+        :return: 처리 결과(답장 정보 또는 None)를 담을 Future, 처리할 답장이 아니면 None
+        """
+        reply_info = self._parse_reply(update)
+        if not reply_info or not reply_info.get('chatroom_id'):
             return None
 
+        future = Future()
+        chatroom_id = reply_info['chatroom_id']
+        with self._lanes_lock:
+            lane = self._lanes.get(chatroom_id)
+            start_lane = lane is None
+            if start_lane:
+                lane = self._lanes[chatroom_id] = deque()
+            lane.append((update.get('update_id'), reply_info, future))
+        if start_lane:
+            self._lane_executor.submit(self._drain_lane, chatroom_id)
+        return future
+
+    def _drain_lane(self, chatroom_id):
+        """채팅방 하나의 답장을 들어온 순서대로 처리 (lane이 비면 종료)"""
+        while True:
+            with self._lanes_lock:
+                lane = self._lanes[chatroom_id]
+                if not lane:
+                    del self._lanes[chatroom_id]
+                    return
+                update_id, reply_info, future = lane.popleft()
+            try:
+                future.set_result(self._handle_reply(update_id, reply_info))
+            except Exception as e:
+                logger.error(f"lagacy_telegram_manager, _drain_lane // ⛔ 업데이트 {update_id} 처리 중 오류: {str(e)}")
+                traceback.print_exc()
+                future.set_result(None)
+
+    def _handle_reply(self, update_id, reply_info):
+        """답장 하나 처리: 크몽 전송 예약 + 원본 메시지 갱신 (같은 업데이트는 한 번만)"""
+        with db_connection.transaction():
+            if not db_telegram.mark_update_processed(self.bot_id, update_id):
+                logger.info(f"lagacy_telegram_manager, _handle_reply // ⏭️ 이미 처리한 업데이트: {update_id}")
+                return None
+            self._forward_reply_to_kmong(reply_info)
+            self.replyByTelegram(reply_info)
+        return reply_info
+
+    def _parse_reply(self, update):
+        """
+        업데이트가 알림 메시지에 대한 답장이면 답장 정보를 반환합니다. (아니면 None)
+        매핑된 알림이면 chatroom_id, message_idx, admin_id, client_id가 채워집니다.
+        """
+        # 메시지가 없으면 처리 중단
+        message = update.get('message')
+        if not message:
+            return None
+        
+        # 답장이 아니면 None 반환
+        if 'reply_to_message' not in message:
+            return None
+        
+        # 사용자 정보 추출
+        from_user = message.get('from', {})
+        
+        # 답장 정보 추출
+        reply_info = {
+            'message_id': message.get('message_id'),
+            'chat_id': message.get('chat', {}).get('id'),
+            'user_id': from_user.get('id'),
+            'username': from_user.get('username', ""),
+            'first_name': from_user.get('first_name', ""),
+            'last_name': from_user.get('last_name', ""),
+            'text': message.get('text', ""),
+            'date': message.get('date'),
+            'reply_to_message_id': message.get('reply_to_message', {}).get('message_id')
+        }
+        
+        # 로그 출력
+        logger.info(f"lagacy_telegram_manager, _parse_reply // 🔍 답장 정보: {reply_info}")
+
+        # 답장한 알림 메시지 → 채팅방 (기본키 조회)
+        target = db_telegram.read_telegram_message(reply_info['chat_id'], reply_info['reply_to_message_id'])
+        if target is None:
+            logger.warning(f"lagacy_telegram_manager, _parse_reply // ⚠️ 알림 매핑이 없는 메시지에 대한 답장입니다: {reply_info['reply_to_message_id']}")
+            return reply_info
+
+        reply_info['chatroom_id'] = target['chatroom_id']
+        reply_info['message_idx'] = target['message_idx']
+        reply_info['admin_id'] = target['admin_id']
+        reply_info['client_id'] = target['client_id']
+        return reply_info
+
+    def _forward_reply_to_kmong(self, reply_info):
+        """답장을 크몽 채팅방으로 보냄 (전송은 outbox 워커가 처리하므로 바로 반환)"""
+        from utils.selenium_manager.outbox_worker import OutboxWorker
+        job_id = OutboxWorker.get_instance().enqueue(
+            chatroom_id=reply_info['chatroom_id'],
+            admin_id=reply_info['admin_id'],
+            client_id=reply_info['client_id'],
+            text=reply_info['text'],
+            channel="telegram"
+        )
+        reply_info['job_id'] = job_id
+        logger.info(f"lagacy_telegram_manager, _forward_reply_to_kmong // 📤 크몽 전송 대기열 등록: 채팅방 ID {reply_info['chatroom_id']}, job_id={job_id}")
+        return job_id
+
+    # ---- webhook 모드 ----
+    def enqueue_update(self, update):
+        """webhook으로 받은 업데이트를 채팅방 lane에 넣음 (요청 스레드는 바로 응답)"""
+        return self.dispatch_update(update)
+
+    def verify_webhook_secret(self, token):
+        """webhook 요청 헤더의 secret_token 확인"""
+        return bool(self.webhook_secret) and secrets.compare_digest(token or "", self.webhook_secret)
+
+    def set_webhook(self, url, secret=None):
+        """
+        getUpdates 폴링 대신 webhook으로 업데이트를 받도록 설정합니다.
+        url은 외부에서 접근 가능한 /api/telegram/webhook 주소여야 합니다.
+        :return: (성공 여부, 사용한 secret)
+        """
+        secret = secret or secrets.token_urlsafe(32)
+        try:
+            response = requests.post(f"{self.base_url}/setWebhook", json={
+                'url': url,
+                'secret_token': secret,
+                'allowed_updates': ['message']
+            }, timeout=10)
+            data = response.json()
+            if not data.get('ok'):
+                logger.error(f"legacy_telegram_manager, set_webhook // ⛔ webhook 설정 실패: {data}")
+                return False, secret
+        except Exception as e:
+            logger.error(f"legacy_telegram_manager, set_webhook // ⛔ webhook 설정 중 오류: {str(e)}")
+            return False, secret
+
+        # webhook이 설정되면 getUpdates는 409를 반환하므로 폴링 중지
+        if self.polling_thread and self.polling_thread.is_alive():
+            self.stop_reply_polling()
+        self.webhook_mode = True
+        self.webhook_secret = secret
+        logger.info(f"legacy_telegram_manager, set_webhook // ✅ webhook 모드 시작: {url}")
+        return True, secret
+
+    def delete_webhook(self):
+        """webhook을 해제하고 getUpdates 폴링으로 돌아갈 수 있게 합니다."""
+        try:
+            response = requests.post(f"{self.base_url}/deleteWebhook", timeout=10)
+            ok = response.json().get('ok', False)
+        except Exception as e:
+            logger.error(f"legacy_telegram_manager, delete_webhook // ⛔ webhook 해제 중 오류: {str(e)}")
+            return False
+        if ok:
+            self.webhook_mode = False
+            self.webhook_secret = ""
+            logger.info("legacy_telegram_manager, delete_webhook // ⏹️ webhook 모드 해제")
+        return ok
+
     def start_reply_polling(self, interval=10, callback=None):
         """
         주기적으로 답장을 확인하는 폴링을 시작합니다.
@@ -575,11 +670,12 @@ class LegacyTelegramManager:
             while not self.stop_polling:
                 try:
                     with self.polling_lock:
-                        reply_info = self.listen_for_replies()
+                        replies = self.listen_for_replies()
                     
-                    if reply_info and callback:
-                        # 콜백 함수 호출
-                        callback(reply_info)
+                    if callback:
+                        # 처리된 답장마다 콜백 함수 호출
+                        for reply_info in replies:
+                            callback(reply_info)
                     
                     time.sleep(interval)
                 except Exception as e:
@@ -0,0 +1,199 @@
+import time
+import logging
+import threading
+
+from utils.kmong_manager import db_telegram
+from utils.event_bus import event_bus
+from utils.event_bus.events import TelegramForwarded
+
+# 로깅 설정
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """
+    rate개/초로 채워지고 최대 capacity개까지 쌓이는 토큰 버킷.
+    reserve()는 토큰 하나를 예약하고 그 토큰을 쓸 수 있을 때까지 기다려야 하는 시간을 반환한다.
+    """
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self):
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1  # 음수면 그만큼 미래의 토큰을 당겨 쓴 것
+            wait = 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+            return max(wait, self._paused_until - now)
+
+    def pause(self, seconds):
+        """429 retry_after 동안 이 버킷으로는 보내지 않음"""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self._tokens = min(self._tokens, 0)
+
+
+class TelegramSender:
+    """
+    telegram_send_queue의 알림을 Bot API 제한에 맞춰 보내는 백그라운드 전송기.
+
+    - 전체 초당 GLOBAL_RATE개, 채팅별로는 개인 채팅 초당 1개 / 그룹 분당 20개까지 보낸다.
+    - 429를 받으면 retry_after 동안 해당 채팅(과 전체) 전송을 멈추고 같은 작업을 그 뒤에 다시 보낸다. (시도 횟수에는 넣지 않음)
+    - 그 밖의 오류는 RETRY_BASE_SECONDS * 2^(시도횟수-1) 뒤에 재시도하고, MAX_ATTEMPTS번 실패하면 failed로 둔다.
+    - 보낸 알림은 답장 매핑(telegram_message_map)에 기록한다.
+    """
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    GLOBAL_RATE = 30
+    PRIVATE_CHAT_RATE = 1.0
+    GROUP_CHAT_RATE = 20 / 60
+    MAX_ATTEMPTS = 5
+    RETRY_BASE_SECONDS = 5
+    IDLE_WAIT_SECONDS = 5
+
+    @classmethod
+    def get_instance(cls):
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls()
+        return cls._instance
+
+    def __init__(self):
+        self._global_bucket = TokenBucket(self.GLOBAL_RATE, self.GLOBAL_RATE)
+        self._chat_buckets = {}
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+        db_telegram.create_telegram_send_queue_table()
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        requeued = db_telegram.requeue_interrupted_telegram_jobs()
+        if requeued:
+            logger.warning(f"telegram_sender, start // ⚠️ 보내는 중 중단된 알림 {requeued}개를 다시 대기열에 넣습니다.")
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="telegram-sender", daemon=True)
+        self._thread.start()
+        logger.info("telegram_sender, start // ✅ 텔레그램 전송기 시작")
+
+    def stop(self):
+        self._stop.set()
+        self._wakeup.set()
+
+    def wake(self):
+        """새 알림이 큐에 들어왔음을 알림"""
+        self._wakeup.set()
+
+    def status(self, chatroom_id=None):
+        """상태별 알림 수와 최근 알림 목록"""
+        return db_telegram.read_telegram_send_status(chatroom_id)
+
+    def _chat_bucket(self, chat_id):
+        bucket = self._chat_buckets.get(chat_id)
+        if bucket is None:
+            # 그룹/채널 chat_id는 음수
+            rate = self.GROUP_CHAT_RATE if str(chat_id).startswith('-') else self.PRIVATE_CHAT_RATE
+            bucket = self._chat_buckets[chat_id] = TokenBucket(rate, 1)
+        return bucket
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                job = db_telegram.claim_next_telegram_job()
+            except Exception as e:
+                logger.error(f"telegram_sender, _run // ⛔ 알림 조회 중 오류: {str(e)}")
+                job = None
+
+            if job is None:
+                due_in = None
+                try:
+                    due_in = db_telegram.next_telegram_job_due_in()
+                except Exception:
+                    pass
+                timeout = self.IDLE_WAIT_SECONDS if due_in is None else min(self.IDLE_WAIT_SECONDS, max(due_in, 0.05))
+                self._wakeup.wait(timeout=timeout)
+                self._wakeup.clear()
+                continue
+
+            self._process(job)
+
+    def _process(self, job):
+        job_id = job['job_id']
+        chat_bucket = self._chat_bucket(job['chat_id'])
+        wait = max(chat_bucket.reserve(), self._global_bucket.reserve())
+        if wait > 0:
+            time.sleep(wait)
+
+        try:
+            telegram_message_id = self._send(job)
+        except Exception as e:
+            self._on_error(job, chat_bucket, e)
+            return
+
+        db_telegram.mark_telegram_job_sent(job_id, telegram_message_id)
+        self._on_sent(job, telegram_message_id)
+        logger.info(f"telegram_sender, _process // ✅ 알림 {job_id} 전송 완료 (채팅방 {job['chatroom_id']}, 메시지 {len(job['message_idxs'])}개)")
+
+    @staticmethod
+    def _send(job):
+        from utils.telegram_manager import legacy_telegram_manager
+        bot = legacy_telegram_manager.bot
+        if bot is None:
+            raise RuntimeError("텔레그램 봇이 초기화되지 않았습니다.")
+        sent_message = bot.send_message(chat_id=job['chat_id'], text=job['text'], parse_mode=job['parse_mode'])
+        return sent_message.message_id
+
+    def _on_sent(self, job, telegram_message_id):
+        if not job['chatroom_id'] or not job['message_idxs']:
+            return
+        # 알림에 답장하면 해당 채팅방으로 연결 (알림에 포함된 가장 최신 메시지 기준)
+        db_telegram.save_telegram_messages([(
+            job['chat_id'], telegram_message_id, job['chatroom_id'],
+            job['message_idxs'][-1], job['admin_id'], job['client_id']
+        )])
+        event_bus.publish(TelegramForwarded(
+            chatroom_id=job['chatroom_id'],
+            message_idxs=job['message_idxs']
+        ))
+
+    def _on_error(self, job, chat_bucket, error):
+        job_id = job['job_id']
+        retry_after = self._retry_after(error)
+        if retry_after is not None:
+            # flood control: 시도 횟수에 넣지 않고 retry_after 뒤에 다시 보냄
+            chat_bucket.pause(retry_after)
+            self._global_bucket.pause(retry_after)
+            db_telegram.mark_telegram_job_retry(job_id, str(error), retry_after, count_attempt=False)
+            logger.warning(f"telegram_sender, _on_error // ⚠️ 429 전송 제한, {retry_after}초 후 재시도: 알림 {job_id}")
+            return
+
+        if job['attempts'] >= self.MAX_ATTEMPTS:
+            db_telegram.mark_telegram_job_failed(job_id, str(error))
+            logger.error(f"telegram_sender, _on_error // ⛔ 알림 {job_id} 전송 실패 ({job['attempts']}회): {str(error)}")
+        else:
+            delay = self.RETRY_BASE_SECONDS * 2 ** (job['attempts'] - 1)
+            db_telegram.mark_telegram_job_retry(job_id, str(error), delay)
+            logger.warning(f"telegram_sender, _on_error // ⚠️ 알림 {job_id} 전송 실패, {delay}초 후 재시도: {str(error)}")
+
+    @staticmethod
+    def _retry_after(error):
+        """telebot ApiTelegramException(429)의 retry_after (아니면 None)"""
+        if getattr(error, 'error_code', None) != 429:
+            return None
+        result = getattr(error, 'result_json', None) or {}
+        retry_after = (result.get('parameters') or {}).get('retry_after')
+        if retry_after is None:
+            logger.warning(f"telegram_sender, _retry_after // ⚠️ 429 응답에 retry_after가 없어 1초 후 재시도합니다: {str(error)}")
+            return 1
+        return retry_after